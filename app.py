@@ -1,13 +1,162 @@
-from dash import Dash, html, dcc, Input, Output, dash_table
+from dash import Dash, html, dcc, Input, Output, State, ClientsideFunction, dash_table
+from flask import jsonify, request
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import os
-import unicodedata
 from datetime import datetime
 import dash_auth  # Importação para autenticação
-import re
+import sys
+import bisect
+import contextlib
+import gzip
+import hashlib
+import json
+import logging
+import math
+import multiprocessing
+import operator
+import pickle
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import TimeoutError as TempoEsgotado
+from dataclasses import dataclass, field, replace
+from itertools import combinations
+from types import MappingProxyType
 
-print("🚀 Iniciando Dashboard de Auditoria...")
+from carga_abas import (DICIONARIO_SIGLAS, STATUS_CANONICOS, abrir_planilha, calcular_status_prazo_em_lote,
+                        carregar_aba, encontrar_colunas_prazo, para_datetime)
+import carga_abas
+
+# Brotli (opcional): sem o pacote, as respostas saem só em gzip
+try:
+    import brotli
+    BROTLI_DISPONIVEL = True
+except ImportError:
+    brotli = None
+    BROTLI_DISPONIVEL = False
+
+# Trava entre processos para publicar os dados compartilhados (não existe no Windows)
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# ========== LOGS ==========
+# Diagnósticos detalhados ficam em DEBUG; por requisição só sai um resumo em INFO
+LOG_LEVEL = os.environ.get('DASHBOARD_LOG_LEVEL', 'INFO').upper()
+FORMATO_LOG = '%(asctime)s %(levelname)s [%(process)d] %(message)s'
+
+logger = logging.getLogger('dashboard_auditoria')
+if not logger.handlers:
+    _handler_log = logging.StreamHandler(sys.stdout)
+    _handler_log.setFormatter(logging.Formatter(FORMATO_LOG))
+    logger.addHandler(_handler_log)
+    logger.propagate = False
+logger.setLevel(LOG_LEVEL)
+
+logger.info('🚀 Iniciando Dashboard de Auditoria...')
+
+# ========== MÉTRICAS ==========
+# Contadores e histogramas em memória, expostos em /metrics no formato texto do Prometheus.
+# Cada processo tem os seus: com vários workers, cada um responde pelo que atendeu.
+LIMITES_DURACAO_S = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+LIMITES_BYTES = (1e3, 5e3, 1e4, 5e4, 1e5, 2.5e5, 5e5, 1e6, 5e6)
+
+def _escapar_rotulo(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _formatar_rotulos(rotulos):
+    if not rotulos:
+        return ''
+    return '{' + ','.join(f'{nome}="{_escapar_rotulo(valor)}"' for nome, valor in rotulos) + '}'
+
+class RegistroMetricas:
+    """Contadores, gauges e histogramas com rótulos, seguros entre threads"""
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        self._metricas = {}
+
+    def registrar(self, nome, tipo, ajuda, limites=None):
+        self._metricas[nome] = {'tipo': tipo, 'ajuda': ajuda, 'limites': limites, 'series': {}}
+
+    def incrementar(self, nome, valor=1, **rotulos):
+        chave = tuple(sorted(rotulos.items()))
+        with self._trava:
+            series = self._metricas[nome]['series']
+            series[chave] = series.get(chave, 0) + valor
+
+    def definir(self, nome, valor, **rotulos):
+        with self._trava:
+            self._metricas[nome]['series'][tuple(sorted(rotulos.items()))] = valor
+
+    def observar(self, nome, valor, **rotulos):
+        metrica = self._metricas[nome]
+        chave = tuple(sorted(rotulos.items()))
+        # Primeiro limite >= valor: o mesmo critério "le" do Prometheus
+        posicao = bisect.bisect_left(metrica['limites'], valor)
+        with self._trava:
+            serie = metrica['series'].get(chave)
+            if serie is None:
+                serie = metrica['series'][chave] = {'baldes': [0] * len(metrica['limites']), 'soma': 0.0, 'contagem': 0}
+            if posicao < len(serie['baldes']):
+                serie['baldes'][posicao] += 1
+            serie['soma'] += valor
+            serie['contagem'] += 1
+
+    def exportar(self):
+        """Texto no formato de exposição do Prometheus (baldes acumulados, +Inf, _sum e _count)"""
+        linhas = []
+        with self._trava:
+            for nome, metrica in self._metricas.items():
+                linhas.append(f"# HELP {nome} {metrica['ajuda']}")
+                linhas.append(f"# TYPE {nome} {metrica['tipo']}")
+                for chave, serie in sorted(metrica['series'].items()):
+                    if metrica['tipo'] != 'histogram':
+                        linhas.append(f"{nome}{_formatar_rotulos(chave)} {serie}")
+                        continue
+                    acumulado = 0
+                    for limite, quantidade in zip(metrica['limites'], serie['baldes']):
+                        acumulado += quantidade
+                        linhas.append(f"{nome}_bucket{_formatar_rotulos(chave + (('le', repr(float(limite))),))} {acumulado}")
+                    linhas.append(f"{nome}_bucket{_formatar_rotulos(chave + (('le', '+Inf'),))} {serie['contagem']}")
+                    linhas.append(f"{nome}_sum{_formatar_rotulos(chave)} {serie['soma']}")
+                    linhas.append(f"{nome}_count{_formatar_rotulos(chave)} {serie['contagem']}")
+        return '\n'.join(linhas) + '\n'
+
+metricas = RegistroMetricas()
+metricas.registrar('dashboard_etapa_duracao_segundos', 'histogram',
+                   'Duração de cada etapa da carga e da renderização', LIMITES_DURACAO_S)
+metricas.registrar('dashboard_secao_servida_total', 'counter',
+                   'Seções entregues, por origem (pre_calculo, cache ou renderizacao)')
+metricas.registrar('dashboard_requisicoes_total', 'counter', 'Requisições HTTP atendidas')
+metricas.registrar('dashboard_requisicao_duracao_segundos', 'histogram',
+                   'Duração das requisições HTTP, incluindo autenticação', LIMITES_DURACAO_S)
+metricas.registrar('dashboard_resposta_bytes', 'histogram', 'Tamanho do corpo das respostas HTTP', LIMITES_BYTES)
+metricas.registrar('dashboard_dados_versao', 'gauge', 'Versão do snapshot de dados em uso')
+metricas.registrar('dashboard_dados_linhas', 'gauge', 'Linhas carregadas por aba')
+metricas.registrar('dashboard_cache_itens', 'gauge', 'Itens nos caches de conteúdo')
+metricas.registrar('dashboard_cache_consultas_total', 'counter', 'Consultas aos caches de conteúdo, por resultado')
+metricas.registrar('dashboard_respostas_comprimidas_total', 'counter', 'Respostas HTTP comprimidas, por codificação')
+metricas.registrar('dashboard_compressao_bytes_economizados_total', 'counter',
+                   'Bytes a menos enviados graças à compressão das respostas')
+
+def registrar_etapa(etapa, alvo, duracao_s):
+    metricas.observar('dashboard_etapa_duracao_segundos', duracao_s, etapa=etapa, alvo=alvo)
+
+@contextlib.contextmanager
+def medir_etapa(etapa, alvo='-'):
+    """Mede o bloco e registra a duração em dashboard_etapa_duracao_segundos"""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        registrar_etapa(etapa, alvo, time.perf_counter() - inicio)
 
 # ========== CONFIGURAÇÃO DE AUTENTICAÇÃO ==========
 USUARIOS_VALIDOS = {
@@ -16,35 +165,6 @@ USUARIOS_VALIDOS = {
 }
 
 # ========== DICIONÁRIO DE SIGLAS FORNECIDAS PELO USUÁRIO ==========
-DICIONARIO_SIGLAS = {
-    'BM': 'Baixas Manuais',
-    'BO': 'Bonificações',
-    'FF': 'Faturamento sem Financeiro',
-    'PR': 'Prorrogação',
-    'PM': 'Pagamento Manual',
-    'TM': 'Títulos Pagos a Menor',
-    'RJ': 'Recebimento sem Juros',
-    'VD': 'Vendas',
-    'DC': 'Descontos Concedidos',
-    
-    # SIGLAS ADICIONAIS PARA COMPLETAR
-    'CL': 'Checklist',
-    'AU': 'Auditoria',
-    'NC': 'Não Conformidade',
-    'MT': 'Monitoramento',
-    'AD': 'Análise Documental',
-    'RE': 'Relatório',
-    'CH': 'Check',
-    'IN': 'Inspeção',
-    'VI': 'Visita',
-    'RA': 'Risco Alto',
-    'RM': 'Risco Médio',
-    'RB': 'Risco Baixo',
-    'RP': 'Risco Potencial',
-    'RC': 'Risco Crítico',
-    'RV': 'Risco Vulnerabilidade'
-}
-
 def obter_significado_sigla(sigla):
     """Retorna o significado de uma sigla, ou a própria sigla se não encontrada"""
     sigla_upper = str(sigla).strip().upper()
@@ -63,197 +183,277 @@ def obter_significado_sigla(sigla):
     return sigla_upper
 
 # ========== HELPERS ==========
-def normalize_colname(name: str) -> str:
-    if not isinstance(name, str):
-        return name
-    nfkd = unicodedata.normalize('NFKD', name)
-    only_ascii = ''.join([c for c in nfkd if not unicodedata.combining(c)])
-    clean = only_ascii.replace(' ', '').replace('-', '').replace('.', '').strip()
-    return clean
-
-def normalize_df_columns(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
-    mapping = {col: normalize_colname(col) for col in df.columns}
-    df.rename(columns=mapping, inplace=True)
-    return df
-
-def canonical_status(s):
-    if pd.isna(s):
-        return "Não Iniciado"
-    
-    s = str(s).strip()
-    s_lower = s.lower()
-    
-    if s_lower in ['conforme', 'c']:
-        return "Conforme"
-    elif s_lower in ['conforme parcialmente', 'parcialmente', 'parcial', 'conforme parcial']:
-        return "Conforme Parcialmente"
-    elif s_lower in ['não conforme', 'nao conforme', 'não', 'nao', 'nc', 'não conf', 'nao conf']:
-        return "Não Conforme"
-    elif s_lower in ['finalizado', 'finalizada', 'fim']:
-        return "Finalizado"
-    elif s_lower in ['pendente', 'pendencia', 'pend']:
-        return "Pendente"
-    elif s_lower in ['não iniciado', 'nao iniciado', '']:
-        return "Não Iniciado"
-    else:
-        return s.title()
+# Estilo de cada classe CSS de status (somente leitura: o mesmo objeto é compartilhado por todas as siglas)
+ESTILOS_CLASSE_STATUS = MappingProxyType({
+    classe: MappingProxyType({'bg_color': fundo, 'text_color': texto, 'border_color': borda, 'classe': classe})
+    for classe, fundo, texto, borda in [
+        ('status-critico', '#fdecea', '#c0392b', '#c0392b'),
+        ('status-atencao', '#fff8e1', '#f39c12', '#f39c12'),
+        ('status-ok', '#eafaf1', '#27ae60', '#27ae60'),
+        ('status-neutro', '#f8f9fa', '#2c3e50', '#95a5a6')
+    ]
+})
 
-def get_status_color(status):
-    """Retorna cor baseada no status"""
+def classe_status(status):
+    """Classe CSS do status (regras por trecho do texto, testadas em ordem)"""
     status_str = str(status).strip().lower()
     
     if 'não iniciado' in status_str or 'nao iniciado' in status_str:
-        return {
-            'bg_color': '#fdecea',
-            'text_color': '#c0392b',
-            'border_color': '#c0392b'
-        }
+        return 'status-critico'
     elif 'pendente' in status_str:
-        return {
-            'bg_color': '#fff8e1',
-            'text_color': '#f39c12',
-            'border_color': '#f39c12'
-        }
+        return 'status-atencao'
     elif 'finalizado' in status_str:
-        return {
-            'bg_color': '#eafaf1',
-            'text_color': '#27ae60',
-            'border_color': '#27ae60'
-        }
+        return 'status-ok'
     elif 'conforme' in status_str:
-        return {
-            'bg_color': '#eafaf1',
-            'text_color': '#27ae60',
-            'border_color': '#27ae60'
-        }
+        return 'status-ok'
     elif 'conforme parcialmente' in status_str or 'parcial' in status_str:
-        return {
-            'bg_color': '#fff8e1',
-            'text_color': '#f39c12',
-            'border_color': '#f39c12'
-        }
+        return 'status-atencao'
     elif 'não conforme' in status_str or 'nao conforme' in status_str:
-        return {
-            'bg_color': '#fdecea',
-            'text_color': '#c0392b',
-            'border_color': '#c0392b'
-        }
+        return 'status-critico'
     else:
-        return {
-            'bg_color': '#f8f9fa',
-            'text_color': '#2c3e50',
-            'border_color': '#95a5a6'
-        }
+        return 'status-neutro'
 
-def calcular_status_prazo(prazo_str, finalizacao_str):
-    """Calcula o status baseado no prazo e data de finalização"""
-    try:
-        if pd.isna(finalizacao_str) or str(finalizacao_str).strip() in ['', 'NaT', 'None']:
-            return "Não Concluído"
-        
-        prazo = pd.to_datetime(prazo_str, errors='coerce', dayfirst=True)
-        finalizacao = pd.to_datetime(finalizacao_str, errors='coerce', dayfirst=True)
-        
-        if pd.isna(prazo) or pd.isna(finalizacao):
-            return "Não Concluído"
-        
-        if finalizacao <= prazo:
-            return "Concluído no Prazo"
-        else:
-            return "Concluído Fora do Prazo"
-            
-    except:
-        return "Não Concluído"
+# Status canônico -> estilo, resolvido uma vez na importação
+ESTILOS_STATUS = MappingProxyType({
+    status: ESTILOS_CLASSE_STATUS[classe_status(status)] for status in STATUS_CANONICOS
+})
 
-def formatar_data(data_str):
-    """Formata a data para DD/MM/YYYY (formato brasileiro)"""
-    try:
-        if pd.isna(data_str) or str(data_str).strip() in ['', 'NaT', 'None']:
-            return ""
-        
-        if isinstance(data_str, (pd.Timestamp, datetime)):
-            return data_str.strftime('%d/%m/%Y')
-        
-        data = pd.to_datetime(data_str, errors='coerce', dayfirst=True)
-        if pd.isna(data):
-            return str(data_str)
-        
-        return data.strftime('%d/%m/%Y')
-    except Exception as e:
-        print(f"Erro ao formatar data '{data_str}': {e}")
-        return str(data_str)
+def get_status_color(status):
+    """Retorna cores (e a classe CSS correspondente) baseadas no status; o dicionário é compartilhado, não copiar para alterar"""
+    estilo = ESTILOS_STATUS.get(status) if isinstance(status, str) else None
+    return estilo if estilo is not None else ESTILOS_CLASSE_STATUS[classe_status(status)]
 
-def criar_sigla_relatorio(relatorio, index):
-    """Cria uma sigla para o relatório - versão simplificada para usar siglas do dicionário"""
-    if pd.isna(relatorio) or str(relatorio).strip() == '':
-        return f"R{index:03d}"
-    
-    relatorio_str = str(relatorio).strip().upper()
-    
-    # Procura por palavras-chave que correspondam às siglas conhecidas
-    palavras_chave = {
-        'BAIXA': 'BM',
-        'MANUAL': 'BM',
-        'BONIF': 'BO',
-        'BONIFICA': 'BO',
-        'FATURAMENTO': 'FF',
-        'FINANCEIRO': 'FF',
-        'PRORROGA': 'PR',
-        'PAGAMENTO': 'PM',
-        'MANUAL': 'PM',
-        'TITULO': 'TM',
-        'MENOR': 'TM',
-        'RECEBIMENTO': 'RJ',
-        'JUROS': 'RJ',
-        'VENDA': 'VD',
-        'DESCONTO': 'DC',
-        'CONCEDIDO': 'DC',
-        'CHECKLIST': 'CL',
-        'AUDITORIA': 'AU',
-        'NÃO CONFORME': 'NC',
-        'NAO CONFORME': 'NC',
-        'MONITORAMENTO': 'MT',
-        'ANALISE': 'AD',
-        'ANÁLISE': 'AD',
-        'RELATORIO': 'RE',
-        'RELATÓRIO': 'RE',
-        'CHECK': 'CH',
-        'INSPECAO': 'IN',
-        'INSPEÇÃO': 'IN',
-        'VISITA': 'VI'
+def estilos_por_codigo(status):
+    """Estilo de cada linha de uma coluna de status: resolve as categorias uma vez e indexa pelos códigos"""
+    if isinstance(status.dtype, pd.CategoricalDtype):
+        codigos, categorias = status.cat.codes.to_numpy(), status.cat.categories
+    else:
+        codigos, categorias = pd.factorize(status)
+    # Última posição atende os nulos (código -1)
+    estilos = np.array([get_status_color(c) for c in categorias] + [get_status_color(np.nan)], dtype=object)
+    return estilos[codigos]
+
+# Cor de fundo das linhas das tabelas de melhorias/políticas por status canônico
+CORES_TABELA_STATUS = (
+    ('Conforme', '#d4edda'),
+    ('Conforme Parcialmente', '#fff3cd'),
+    ('Não Conforme', '#f8d7da'),
+    ('Pendente', '#fff8e1'),
+    ('Finalizado', '#d1ecf1')
+)
+
+# (coluna de status, fundo ímpar, fundo par) -> style_data_conditional já montado
+_estilos_condicionais_tabela = {}
+
+def estilo_condicional_status(coluna_status, fundo_impar, fundo_par):
+    """style_data_conditional das tabelas zebradas com cor por status (montado uma vez por combinação)"""
+    chave = (coluna_status, fundo_impar, fundo_par)
+    estilo = _estilos_condicionais_tabela.get(chave)
+    if estilo is None:
+        estilo = [
+            {'if': {'row_index': 'odd'}, 'backgroundColor': fundo_impar},
+            {'if': {'row_index': 'even'}, 'backgroundColor': fundo_par}
+        ] + [
+            {'if': {'filter_query': f'{{{coluna_status}}} = "{status_val}"'}, 'backgroundColor': cor}
+            for status_val, cor in CORES_TABELA_STATUS
+        ]
+        _estilos_condicionais_tabela[chave] = estilo
+    return estilo
+
+def formatar_datas_em_lote(serie):
+    """Formata uma coluna de datas para DD/MM/YYYY (formato brasileiro).
+
+    Vazios viram ''; textos que não são datas são mantidos como estão.
+    """
+    datas = para_datetime(serie)
+    formatadas = datas.dt.strftime('%d/%m/%Y')
+    if datas is serie:
+        return formatadas.fillna('')
+
+    texto = serie.astype(str)
+    vazio = serie.isna() | texto.str.strip().isin(['', 'NaT', 'None'])
+    return formatadas.where(datas.notna(), texto.where(~vazio, ''))
+
+def calcular_kpis(df):
+    """Calcula todos os KPIs do checklist numa única passada de agrupamento.
+
+    Agrupa por Status (e Status_Prazo, quando existir) e classifica cada rótulo
+    distinto uma única vez. Retorna um dicionário com contagens e percentuais.
+    """
+    total = len(df)
+    kpis = {
+        'total': total, 'conforme': 0, 'parcial': 0, 'nao': 0,
+        'nao_conforme': 0, 'dentro_prazo': 0, 'fora_prazo': 0, 'nao_concluido': 0,
     }
+
+    if total > 0 and 'Status' in df.columns:
+        status = df['Status']
+        if not isinstance(status.dtype, pd.CategoricalDtype):
+            status = status.astype('category')
+
+        chaves = [status]
+        if 'Status_Prazo' in df.columns:
+            chaves.append(df['Status_Prazo'])
+        contagens = df.groupby(chaves, observed=True, dropna=False).size()
+
+        for chave, quantidade in contagens.items():
+            rotulo, prazo = (chave if len(chaves) > 1 else (chave, None))
+            rotulo = str(rotulo).strip()
+            rotulo_lower = rotulo.lower()
+            if rotulo_lower == 'conforme':
+                kpis['conforme'] += quantidade
+            if 'parcial' in rotulo_lower:
+                kpis['parcial'] += quantidade
+            if 'não' in rotulo_lower or 'nao' in rotulo_lower:
+                kpis['nao'] += quantidade
+            if rotulo == 'Não Conforme':
+                kpis['nao_conforme'] += quantidade
+                if prazo == 'Concluído no Prazo':
+                    kpis['dentro_prazo'] += quantidade
+                elif prazo == 'Concluído Fora do Prazo':
+                    kpis['fora_prazo'] += quantidade
+                elif prazo == 'Não Concluído':
+                    kpis['nao_concluido'] += quantidade
+
+    for nome in ('conforme', 'parcial', 'nao'):
+        kpis[f'pct_{nome}'] = kpis[nome] / total * 100 if total > 0 else 0
+    return kpis
+
+def agrupar_siglas_por_celula(df_risco_filtrado):
+    """Agrupa as siglas da matriz de risco por (Unidade, Mes) com um único groupby.
+
+    Retorna {(unidade, mes): [itens]}, com os itens de cada célula ordenados por sigla
+    (ordenação estável: siglas iguais mantêm a ordem das linhas).
+    """
+    colunas = df_risco_filtrado.columns
+    if 'Status' in colunas:
+        cores = estilos_por_codigo(df_risco_filtrado['Status'])
+    else:
+        # O estilo é um mapeamento: passado direto, o DataFrame o leria como colunas, não como valor
+        cores = pd.Series([get_status_color('Sem Status')] * len(df_risco_filtrado),
+                          index=df_risco_filtrado.index, dtype=object)
+    registros = pd.DataFrame({
+        'unidade': df_risco_filtrado['Unidade'],
+        'mes': pd.to_numeric(df_risco_filtrado['Mes'], errors='coerce'),
+        'sigla': df_risco_filtrado['Sigla'].astype(str).str.strip().str.upper() if 'Sigla' in colunas else '',
+        'status': df_risco_filtrado['Status'].astype(str) if 'Status' in colunas else 'Sem Status',
+        'cor': cores,
+        'relatorio': df_risco_filtrado['Relatorio'] if 'Relatorio' in colunas else ''
+    }, index=df_risco_filtrado.index)
+
+    registros = registros[
+        registros['unidade'].notna() & registros['mes'].isin(range(1, 13)) & (registros['sigla'] != '')
+    ]
+    if len(registros) == 0:
+        return {}
+
+    registros = registros.assign(mes=registros['mes'].astype(int)).sort_values('sigla', kind='stable')
+    agrupado = registros.groupby(['unidade', 'mes'], sort=False, observed=True).agg(list)
+
+    celulas = {}
+    for chave, siglas, status_lista, cores, relatorios in zip(
+        agrupado.index, agrupado['sigla'], agrupado['status'], agrupado['cor'], agrupado['relatorio']
+    ):
+        celulas[chave] = [
+            {'sigla': sigla, 'status': status, 'cor': cor, 'relatorio': relatorio}
+            for sigla, status, cor, relatorio in zip(siglas, status_lista, cores, relatorios)
+        ]
+    return celulas
+
+# Modo compacto da matriz (opcional): acima deste número de relatórios numa célula, as siglas
+# repetidas viram um resumo com contagem (ex.: 12). 0, o padrão, mostra todas as siglas
+LIMITE_SIGLAS_CELULA = int(os.environ.get('DASHBOARD_MATRIZ_LIMITE_CELULA', '0'))
+
+# Ordem de gravidade usada para colorir uma sigla resumida (a pior cor vence)
+GRAVIDADE_CLASSES_STATUS = {'status-critico': 0, 'status-atencao': 1, 'status-neutro': 2, 'status-ok': 3}
+
+def resumir_siglas_celula(siglas_no_mes):
+    """Agrupa os itens de uma célula por sigla, com contagem por status e a cor mais grave"""
+    resumo = {}
+    for item in siglas_no_mes:
+        grupo = resumo.setdefault(item['sigla'], {'quantidade': 0, 'status': {}, 'cor': item['cor']})
+        grupo['quantidade'] += 1
+        grupo['status'][item['status']] = grupo['status'].get(item['status'], 0) + 1
+        if GRAVIDADE_CLASSES_STATUS[item['cor']['classe']] < GRAVIDADE_CLASSES_STATUS[grupo['cor']['classe']]:
+            grupo['cor'] = item['cor']
+    
+    return [
+        {
+            'sigla': sigla,
+            'status': ', '.join(f"{quantidade} {status}" for status, quantidade in grupo['status'].items()),
+            'cor': grupo['cor'],
+            'relatorio': '',
+            'quantidade': grupo['quantidade']
+        }
+        for sigla, grupo in resumo.items()
+    ]
+
+if LIMITE_SIGLAS_CELULA:
+    TEXTO_CELULAS_MATRIZ = (f"Cada célula mostra as siglas dos relatórios daquela unidade/mês; acima de "
+                            f"{LIMITE_SIGLAS_CELULA} relatórios, cada sigla aparece uma vez com a quantidade "
+                            f"(passe o mouse para ver quantos há de cada status)")
+else:
+    TEXTO_CELULAS_MATRIZ = "Cada célula mostra TODAS as siglas dos relatórios daquela unidade/mês"
+
+def renderizar_celula_siglas(siglas_no_mes):
+    """Monta a célula de um mês da matriz; o tamanho das siglas depende de quantas existem"""
+    if LIMITE_SIGLAS_CELULA and len(siglas_no_mes) > LIMITE_SIGLAS_CELULA:
+        siglas_no_mes = resumir_siglas_celula(siglas_no_mes)
+    num_siglas = len(siglas_no_mes)
     
-    # Verifica se alguma palavra-chave está no nome do relatório
-    for palavra, sigla in palavras_chave.items():
-        if palavra in relatorio_str:
-            return sigla
+    if num_siglas <= 3:
+        # Para poucas siglas, mostrar em linha horizontal
+        tamanho = 'p'
+        classe_celula = 'matriz-celula matriz-celula-linha'
+        estilo_celula = None
+    elif num_siglas <= 6:
+        # Para quantidade moderada, usar grid 2xN
+        tamanho = 'm'
+        grid_cols = 2
+        rows_needed = (num_siglas + grid_cols - 1) // grid_cols
+        cell_height = max(45, rows_needed * 22)
+        classe_celula = 'matriz-celula matriz-celula-grade-m'
+        estilo_celula = {'height': f'{cell_height}px', 'minHeight': f'{cell_height}px'}
+    else:
+        # Para muitas siglas, usar grid com 3 ou 4 colunas
+        tamanho = 'g'
+        grid_cols = min(4, max(3, (num_siglas + 2) // 3))
+        rows_needed = (num_siglas + grid_cols - 1) // grid_cols
+        cell_height = max(60, rows_needed * 18)
+        classe_celula = f'matriz-celula matriz-celula-grade-g matriz-colunas-{grid_cols}'
+        estilo_celula = {'height': f'{cell_height}px', 'minHeight': f'{cell_height}px'}
     
-    # Se não encontrou palavra-chave, tenta extrair sigla do início do nome
-    palavras = relatorio_str.split()
-    if palavras:
-        # Tenta combinar primeiras letras com siglas conhecidas
-        primeira_palavra = palavras[0]
-        if len(primeira_palavra) >= 2:
-            sigla_tentativa = primeira_palavra[:2].upper()
-            if sigla_tentativa in DICIONARIO_SIGLAS:
-                return sigla_tentativa
+    siglas_html = []
+    for item in siglas_no_mes:
+        title_text = f"{item['sigla']}: {item['status']}"
+        if item['relatorio']:
+            title_text += f"\n{item['relatorio'][:50]}..."
         
-        # Tenta criar sigla com iniciais
-        if len(palavras) >= 2:
-            sigla_tentativa = ''.join([p[0] for p in palavras[:2]])
-            if sigla_tentativa in DICIONARIO_SIGLAS:
-                return sigla_tentativa
-    
-    # Se nada funcionou, usa as 2 primeiras letras da primeira palavra
-    if palavras:
-        return palavras[0][:2].upper()
+        quantidade = item.get('quantidade', 1)
+        if quantidade > 1:
+            siglas_html.append(html.Div(
+                f"{item['sigla']} {quantidade}",
+                className=f"matriz-sigla matriz-sigla-{tamanho} matriz-sigla-resumo {item['cor']['classe']}",
+                title=title_text
+            ))
+        else:
+            siglas_html.append(html.Div(
+                item['sigla'],
+                className=f"matriz-sigla matriz-sigla-{tamanho} {item['cor']['classe']}",
+                title=title_text
+            ))
     
-    # Último recurso
-    return f"R{index:03d}"
+    if estilo_celula is None:
+        return html.Div(siglas_html, className=classe_celula)
+    return html.Div(siglas_html, className=classe_celula, style=estilo_celula)
 
 def criar_matriz_risco_anual(df_risco_filtrado, ano_filtro):
-    """Cria matriz de risco com TODAS as siglas VISÍVEIS, sem cortes"""
+    """Cria a matriz de risco do ano com as siglas de cada unidade/mês.
+
+    No modo compacto (LIMITE_SIGLAS_CELULA > 0), uma célula com mais relatórios que o
+    limite mostra cada sigla uma vez, com a quantidade; a contagem por status fica no
+    title (ao passar o mouse). Para ver a lista completa, DASHBOARD_MATRIZ_LIMITE_CELULA=0.
+    """
     
     if df_risco_filtrado is None or len(df_risco_filtrado) == 0:
         return html.Div([
@@ -262,9 +462,13 @@ def criar_matriz_risco_anual(df_risco_filtrado, ano_filtro):
                    style={'textAlign':'center', 'color':'#7f8c8d', 'padding': '20px', 'fontSize': '12px'})
         ], style={'marginTop':'20px'})
     
-    # Obter unidades únicas
+    # Uma única passada agrupada por (Unidade, Mes) no lugar de filtrar a cada célula
+    celulas = agrupar_siglas_por_celula(df_risco_filtrado)
     unidades = sorted(df_risco_filtrado['Unidade'].dropna().unique())
-    
+    return montar_matriz_risco(celulas, unidades, len(df_risco_filtrado), ano_filtro)
+
+def montar_matriz_risco(celulas, unidades, total_registros, ano_filtro):
+    """Componentes da matriz a partir das células já agrupadas ({(unidade, mes): [itens]})"""
     # Lista de meses do ano (1 a 12)
     meses_ano = list(range(1, 13))
     nomes_meses = {
@@ -272,360 +476,63 @@ def criar_matriz_risco_anual(df_risco_filtrado, ano_filtro):
         7: 'JUL', 8: 'AGO', 9: 'SET', 10: 'OUT', 11: 'NOV', 12: 'DEZ'
     }
     
-    print(f"\n📊 CRIANDO MATRIZ DE RISCO COM SIGLAS VISÍVEIS PARA O ANO {ano_filtro}")
-    print(f"  Unidades: {len(unidades)}")
-    print(f"  Total de registros: {len(df_risco_filtrado)}")
+    logger.debug('📊 CRIANDO MATRIZ DE RISCO COM SIGLAS VISÍVEIS PARA O ANO %s', ano_filtro)
+    logger.debug('  Unidades: %s', len(unidades))
+    logger.debug('  Total de registros: %s', total_registros)
     
-    # Conjunto para armazenar TODAS as siglas únicas encontradas
-    siglas_encontradas = set()
+    # Conjunto com TODAS as siglas únicas encontradas
+    siglas_encontradas = {item['sigla'] for itens in celulas.values() for item in itens}
     
     # Criar estrutura de dados para a matriz
     matriz_data = []
     
     for unidade_nome in unidades:
         linha = {'Unidade': unidade_nome}
-        df_unidade = df_risco_filtrado[df_risco_filtrado['Unidade'] == unidade_nome]
         
         for mes in meses_ano:
-            # Filtrar por mês
-            df_unidade['Mes'] = pd.to_numeric(df_unidade['Mes'], errors='coerce')
-            df_mes = df_unidade[df_unidade['Mes'] == mes]
+            siglas_no_mes = celulas.get((unidade_nome, mes))
             
-            if len(df_mes) > 0:
-                # Para cada relatório no mês
-                siglas_no_mes = []
-                
-                for _, row in df_mes.iterrows():
-                    sigla = str(row.get('Sigla', '')).strip().upper()
-                    status = str(row.get('Status', 'Sem Status'))
-                    
-                    if sigla:  # Só adiciona se tiver sigla
-                        # Adicionar ao conjunto de siglas encontradas
-                        siglas_encontradas.add(sigla)
-                        
-                        # Obter cor baseada no status
-                        cores = get_status_color(status)
-                        
-                        # Armazenar sigla para este mês
-                        siglas_no_mes.append({
-                            'sigla': sigla,
-                            'status': status,
-                            'cor': cores,
-                            'relatorio': row.get('Relatorio', '')
-                        })
-                
-                if siglas_no_mes:
-                    # Ordenar siglas alfabeticamente
-                    siglas_no_mes.sort(key=lambda x: x['sigla'])
-                    
-                    print(f"  Unidade: {unidade_nome}, Mês: {mes}, Siglas: {len(siglas_no_mes)}")
-                    
-                    # Determinar layout baseado na quantidade de siglas
-                    num_siglas = len(siglas_no_mes)
-                    
-                    # Cálculo FLEXÍVEL da largura das células baseado no número de siglas
-                    if num_siglas <= 3:
-                        # Para poucas siglas, mostrar em linha horizontal
-                        siglas_html = []
-                        for item in siglas_no_mes:
-                            title_text = f"{item['sigla']}: {item['status']}"
-                            if item['relatorio']:
-                                title_text += f"\n{item['relatorio'][:50]}..."
-                            
-                            siglas_html.append(html.Div(
-                                item['sigla'],
-                                style={
-                                    'fontSize': '8px',
-                                    'fontWeight': '600',
-                                    'color': item['cor']['text_color'],
-                                    'textAlign': 'center',
-                                    'backgroundColor': item['cor']['bg_color'],
-                                    'padding': '3px 4px',
-                                    'margin': '1px',
-                                    'borderRadius': '3px',
-                                    'border': f'1px solid {item["cor"]["border_color"]}',
-                                    'minWidth': '26px',
-                                    'width': '26px',
-                                    'height': '20px',
-                                    'display': 'flex',
-                                    'alignItems': 'center',
-                                    'justifyContent': 'center',
-                                    'cursor': 'default',
-                                    'boxShadow': '0 0.5px 1px rgba(0,0,0,0.05)',
-                                    'overflow': 'visible',
-                                    'whiteSpace': 'nowrap',
-                                    'flexShrink': '0'
-                                },
-                                title=title_text
-                            ))
-                        
-                        linha[mes] = html.Div(
-                            siglas_html,
-                            style={
-                                'display': 'flex',
-                                'flexWrap': 'wrap',
-                                'gap': '2px',
-                                'padding': '3px',
-                                'justifyContent': 'center',
-                                'alignItems': 'center',
-                                'minHeight': '35px',
-                                'height': 'auto',
-                                'borderRadius': '3px',
-                                'backgroundColor': '#f8fafc',
-                                'width': '100%',
-                                'boxSizing': 'border-box',
-                                'overflow': 'visible'
-                            }
-                        )
-                    elif num_siglas <= 6:
-                        # Para quantidade moderada, usar grid 2xN
-                        siglas_html = []
-                        for item in siglas_no_mes:
-                            title_text = f"{item['sigla']}: {item['status']}"
-                            if item['relatorio']:
-                                title_text += f"\n{item['relatorio'][:50]}..."
-                            
-                            siglas_html.append(html.Div(
-                                item['sigla'],
-                                style={
-                                    'fontSize': '7px',
-                                    'fontWeight': '600',
-                                    'color': item['cor']['text_color'],
-                                    'textAlign': 'center',
-                                    'backgroundColor': item['cor']['bg_color'],
-                                    'padding': '2px 3px',
-                                    'margin': '1px',
-                                    'borderRadius': '2px',
-                                    'border': f'1px solid {item["cor"]["border_color"]}',
-                                    'minWidth': '24px',
-                                    'width': '24px',
-                                    'height': '18px',
-                                    'display': 'flex',
-                                    'alignItems': 'center',
-                                    'justifyContent': 'center',
-                                    'cursor': 'default',
-                                    'boxShadow': '0 0.5px 1px rgba(0,0,0,0.05)',
-                                    'overflow': 'visible',
-                                    'whiteSpace': 'nowrap',
-                                    'flexShrink': '0'
-                                },
-                                title=title_text
-                            ))
-                        
-                        # Calcular número de colunas (máximo 2)
-                        grid_cols = min(2, num_siglas)
-                        rows_needed = (num_siglas + grid_cols - 1) // grid_cols
-                        cell_height = max(45, rows_needed * 22)
-                        
-                        linha[mes] = html.Div(
-                            siglas_html,
-                            style={
-                                'display': 'grid',
-                                'gridTemplateColumns': f'repeat({grid_cols}, 1fr)',
-                                'gap': '1px',
-                                'padding': '2px',
-                                'justifyContent': 'center',
-                                'alignItems': 'center',
-                                'minHeight': f'{cell_height}px',
-                                'height': f'{cell_height}px',
-                                'borderRadius': '2px',
-                                'backgroundColor': '#f8fafc',
-                                'width': '100%',
-                                'boxSizing': 'border-box',
-                                'overflow': 'visible'
-                            }
-                        )
-                    else:
-                        # Para muitas siglas, usar grid com mais colunas
-                        siglas_html = []
-                        for item in siglas_no_mes:
-                            title_text = f"{item['sigla']}: {item['status']}"
-                            if item['relatorio']:
-                                title_text += f"\n{item['relatorio'][:50]}..."
-                            
-                            siglas_html.append(html.Div(
-                                item['sigla'],
-                                style={
-                                    'fontSize': '6px',
-                                    'fontWeight': '600',
-                                    'color': item['cor']['text_color'],
-                                    'textAlign': 'center',
-                                    'backgroundColor': item['cor']['bg_color'],
-                                    'padding': '1px 2px',
-                                    'margin': '0.5px',
-                                    'borderRadius': '2px',
-                                    'border': f'1px solid {item["cor"]["border_color"]}',
-                                    'minWidth': '22px',
-                                    'width': '22px',
-                                    'height': '16px',
-                                    'display': 'flex',
-                                    'alignItems': 'center',
-                                    'justifyContent': 'center',
-                                    'cursor': 'default',
-                                    'boxShadow': '0 0.5px 1px rgba(0,0,0,0.05)',
-                                    'overflow': 'visible',
-                                    'whiteSpace': 'nowrap',
-                                    'flexShrink': '0'
-                                },
-                                title=title_text
-                            ))
-                        
-                        # Para muitas siglas, usar 3 ou mais colunas
-                        grid_cols = min(4, max(3, (num_siglas + 2) // 3))
-                        rows_needed = (num_siglas + grid_cols - 1) // grid_cols
-                        cell_height = max(60, rows_needed * 18)
-                        
-                        linha[mes] = html.Div(
-                            siglas_html,
-                            style={
-                                'display': 'grid',
-                                'gridTemplateColumns': f'repeat({grid_cols}, 1fr)',
-                                'gap': '0.5px',
-                                'padding': '1px',
-                                'justifyContent': 'center',
-                                'alignItems': 'center',
-                                'minHeight': f'{cell_height}px',
-                                'height': f'{cell_height}px',
-                                'borderRadius': '2px',
-                                'backgroundColor': '#f8fafc',
-                                'width': '100%',
-                                'boxSizing': 'border-box',
-                                'overflow': 'visible'
-                            }
-                        )
-                else:
-                    linha[mes] = html.Div("-", 
-                        style={
-                            'color': '#bdc3c7', 
-                            'fontSize': '9px', 
-                            'padding': '5px 0',
-                            'textAlign': 'center',
-                            'fontStyle': 'italic',
-                            'height': '35px',
-                            'display': 'flex',
-                            'alignItems': 'center',
-                            'justifyContent': 'center'
-                        })
+            if siglas_no_mes:
+                logger.debug('  Unidade: %s, Mês: %s, Siglas: %s', unidade_nome, mes, len(siglas_no_mes))
+                linha[mes] = renderizar_celula_siglas(siglas_no_mes)
             else:
-                linha[mes] = html.Div("-", 
-                    style={
-                        'color': '#bdc3c7', 
-                        'fontSize': '9px', 
-                        'padding': '5px 0',
-                        'textAlign': 'center',
-                        'fontStyle': 'italic',
-                        'height': '35px',
-                        'display': 'flex',
-                        'alignItems': 'center',
-                        'justifyContent': 'center'
-                    })
+                linha[mes] = html.Div("-", className='matriz-celula-vazia')
         
         matriz_data.append(linha)
     
     # DEBUG: Mostrar todas as siglas encontradas
-    print(f"\n📋 SIGLAS ENCONTRADAS ({len(siglas_encontradas)} total):")
-    for i, sigla in enumerate(sorted(siglas_encontradas)):
-        print(f"  {i+1}. {sigla}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug('📋 SIGLAS ENCONTRADAS (%s total):', len(siglas_encontradas))
+        for i, sigla in enumerate(sorted(siglas_encontradas)):
+            logger.debug('  %s. %s', i + 1, sigla)
     
     # Ordenar siglas encontradas alfabeticamente
     siglas_ordenadas = sorted(siglas_encontradas)
     
-    # Criar tabela HTML com design ajustado
-    tabela_cabecalho = [html.Th("UNIDADE", style={
-        'backgroundColor': '#2c3e50',
-        'color': 'white',
-        'padding': '6px 8px',
-        'textAlign': 'center',
-        'fontWeight': '600',
-        'border': '1px solid #1a252f',
-        'minWidth': '100px',
-        'width': '100px',
-        'fontSize': '10px',
-        'position': 'sticky',
-        'left': '0',
-        'zIndex': '2',
-        'boxShadow': '1px 0 1px rgba(0,0,0,0.1)',
-        'height': '30px'
-    })]
+    # Criar tabela HTML; a aparência fica em assets/matriz_risco.css
+    tabela_cabecalho = [html.Th("UNIDADE", className='matriz-th-unidade')]
     
     for mes in meses_ano:
         tabela_cabecalho.append(html.Th(
             html.Div([
-                html.Div(nomes_meses[mes], style={'fontSize': '9px', 'fontWeight': '600', 'marginBottom': '1px'}),
-                html.Div(str(mes), style={'fontSize': '7px', 'opacity': '0.8', 'fontWeight': '400'})
-            ], style={'display': 'flex', 'flexDirection': 'column', 'alignItems': 'center'}),
-            style={
-                'backgroundColor': '#2c3e50',
-                'color': 'white',
-                'padding': '4px 2px',
-                'textAlign': 'center',
-                'fontWeight': '600',
-                'border': '1px solid #1a252f',
-                'minWidth': '55px',  # AUMENTADO de 45px para 55px
-                'width': '55px',     # AUMENTADO de 45px para 55px
-                'fontSize': '9px',
-                'height': '30px',
-                'verticalAlign': 'middle'
-            }
+                html.Div(nomes_meses[mes], className='matriz-th-mes-nome'),
+                html.Div(str(mes), className='matriz-th-mes-numero')
+            ], className='matriz-th-mes-conteudo'),
+            className='matriz-th-mes'
         ))
     
     tabela_linhas = []
     
     for i, linha in enumerate(matriz_data):
-        bg_color = '#ffffff' if i % 2 == 0 else '#f8f9fa'
-        
-        celulas = [html.Td(
-            html.Div([
-                html.Div(linha['Unidade'], style={
-                    'fontSize': '9px',
-                    'fontWeight': '600',
-                    'overflow': 'hidden',
-                    'textOverflow': 'ellipsis',
-                    'whiteSpace': 'nowrap',
-                    'color': '#2c3e50',
-                    'textAlign': 'left',
-                    'padding': '0 5px'
-                })
-            ]),
-            style={
-                'backgroundColor': bg_color,
-                'padding': '6px 5px',
-                'textAlign': 'left',
-                'border': '1px solid #dde1e6',
-                'fontSize': '9px',
-                'minWidth': '100px',
-                'width': '100px',
-                'height': 'auto',
-                'minHeight': '40px',
-                'position': 'sticky',
-                'left': '0',
-                'zIndex': '1',
-                'boxShadow': '1px 0 1px rgba(0,0,0,0.05)',
-                'verticalAlign': 'top'
-            }
+        celulas_linha = [html.Td(
+            html.Div(html.Div(linha['Unidade'], className='matriz-unidade-nome')),
+            className='matriz-td-unidade'
         )]
         
         for mes in meses_ano:
-            conteudo = linha.get(mes, html.Div("-", style={'color': '#bdc3c7', 'fontSize': '9px', 'padding': '5px 0', 'textAlign': 'center'}))
-            celulas.append(html.Td(
-                conteudo,
-                style={
-                    'backgroundColor': bg_color,
-                    'padding': '2px',
-                    'textAlign': 'center',
-                    'border': '1px solid #dde1e6',
-                    'verticalAlign': 'top',
-                    'minHeight': '40px',
-                    'minWidth': '55px',  # AUMENTADO de 45px para 55px
-                    'width': '55px',     # AUMENTADO de 45px para 55px
-                    'height': 'auto',
-                    'maxHeight': '120px',
-                    'overflow': 'visible',  # ALTERADO de 'hidden' para 'visible'
-                    'wordWrap': 'break-word'
-                }
-            ))
+            celulas_linha.append(html.Td(linha[mes], className='matriz-td-mes'))
         
-        tabela_linhas.append(html.Tr(celulas))
+        tabela_linhas.append(html.Tr(celulas_linha, className='linha-par' if i % 2 == 0 else 'linha-impar'))
     
     tabela_html = html.Table([
         html.Thead(html.Tr(tabela_cabecalho)),
@@ -798,7 +705,7 @@ def criar_matriz_risco_anual(df_risco_filtrado, ano_filtro):
             'fontSize': '12px',
             'fontWeight': '600'
         }),
-        html.P(f"{len(df_risco_filtrado)} registros • {len(unidades)} unidades • {len(siglas_encontradas)} siglas", 
+        html.P(f"{total_registros} registros • {len(unidades)} unidades • {len(siglas_encontradas)} siglas", 
                style={'color': '#7f8c8d', 'margin': '0', 'fontSize': '8px'})
     ], style={
         'marginBottom': '8px',
@@ -810,17 +717,17 @@ def criar_matriz_risco_anual(df_risco_filtrado, ano_filtro):
     })
     
     # DEBUG: Mostrar quantos registros estão sendo processados
-    print(f"\n📊 RESUMO DA MATRIZ:")
-    print(f"  Unidades processadas: {len(unidades)}")
-    print(f"  Registros totais: {len(df_risco_filtrado)}")
-    print(f"  Siglas únicas: {len(siglas_ordenadas)}")
-    print(f"  Tamanho da matriz: {len(unidades)} linhas x 13 colunas")
-    print(f"  Largura das células dos meses: 55px (aumentada para visibilidade)")
+    logger.debug('📊 RESUMO DA MATRIZ:')
+    logger.debug('  Unidades processadas: %s', len(unidades))
+    logger.debug('  Registros totais: %s', total_registros)
+    logger.debug('  Siglas únicas: %s', len(siglas_ordenadas))
+    logger.debug('  Tamanho da matriz: %s linhas x 13 colunas', len(unidades))
+    logger.debug('  Largura das células dos meses: 55px (aumentada para visibilidade)')
     
     return html.Div([
         titulo_matriz,
         legenda_cores,
-        html.P("Cada célula mostra TODAS as siglas dos relatórios daquela unidade/mês", 
+        html.P(TEXTO_CELULAS_MATRIZ, 
                style={'color': '#7f8c8d', 'marginBottom': '6px', 'fontSize': '8px', 'textAlign': 'center'}),
         html.P(f"Dica: Passe o mouse sobre uma sigla para ver detalhes", 
                style={'color': '#3498db', 'marginBottom': '3px', 'fontSize': '7px', 'textAlign': 'center', 'fontStyle': 'italic'}),
@@ -835,326 +742,266 @@ def criar_matriz_risco_anual(df_risco_filtrado, ano_filtro):
         'overflow': 'visible'  # Garantir que nada seja cortado
     })
 
-def carregar_dados_da_planilha():
-    planilha_path = 'base_auditoria.xlsx'
+# ========== CACHE DA PLANILHA ==========
+PLANILHA_PATH = 'base_auditoria.xlsx'
+DIRETORIO_CACHE = os.environ.get('DASHBOARD_CACHE_DIR', '.cache_planilha')
+
+# Incrementar sempre que o processamento das abas mudar, para invalidar caches antigos
+VERSAO_CACHE = 6
+
+def calcular_hash_arquivo(caminho):
+    """Calcula o SHA-256 do conteúdo de um arquivo, lendo em blocos"""
+    sha256 = hashlib.sha256()
+    with open(caminho, 'rb') as arquivo:
+        for bloco in iter(lambda: arquivo.read(1024 * 1024), b''):
+            sha256.update(bloco)
+    return sha256.hexdigest()
+
+def _caminhos_cache(planilha_path):
+    nome_base = os.path.splitext(os.path.basename(planilha_path))[0]
+    caminho_dados = os.path.join(DIRETORIO_CACHE, f"{nome_base}.pkl")
+    caminho_meta = os.path.join(DIRETORIO_CACHE, f"{nome_base}.json")
+    return caminho_dados, caminho_meta
+
+def _escrever_arquivo_atomico(caminho, conteudo):
+    """Grava em arquivo temporário e renomeia, para que outros workers nunca leiam um arquivo pela metade"""
+    fd, caminho_tmp = tempfile.mkstemp(dir=os.path.dirname(caminho), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as arquivo:
+            arquivo.write(conteudo)
+        os.replace(caminho_tmp, caminho)
+    except BaseException:
+        if os.path.exists(caminho_tmp):
+            os.remove(caminho_tmp)
+        raise
+
+def ler_cache_planilha(planilha_path):
+    """Retorna (dados, sha256, stat) do cache se ele corresponder à planilha atual, ou (None, sha256, stat).
+
+    O stat é tirado antes do hash e vai junto com ele para os metadados: se a planilha
+    mudar no meio do caminho, o mtime gravado é o antigo e a próxima leitura recalcula o hash.
+    """
+    caminho_dados, caminho_meta = _caminhos_cache(planilha_path)
+    stat = os.stat(planilha_path)
+
+    meta = None
+    try:
+        with open(caminho_meta, 'r', encoding='utf-8') as arquivo:
+            meta = json.load(arquivo)
+    except (OSError, ValueError):
+        pass
+
+    if meta is not None and meta.get('versao_cache') != VERSAO_CACHE:
+        meta = None
+
+    # mtime e tamanho iguais: confia no hash gravado sem reler a planilha
+    if meta is not None and meta.get('mtime_ns') == stat.st_mtime_ns and meta.get('tamanho') == stat.st_size:
+        sha256 = meta['sha256']
+    else:
+        sha256 = calcular_hash_arquivo(planilha_path)
+
+    if meta is None or meta.get('sha256') != sha256:
+        return None, sha256, stat
+
+    try:
+        with open(caminho_dados, 'rb') as arquivo:
+            conteudo = pickle.load(arquivo)
+    except Exception as e:
+        logger.warning('⚠️ Cache da planilha ilegível, reprocessando: %s', e)
+        return None, sha256, stat
+
+    if conteudo.get('sha256') != sha256 or conteudo.get('versao_cache') != VERSAO_CACHE:
+        return None, sha256, stat
+
+    # Mesmo conteúdo com mtime diferente (ex.: checkout de um novo deploy): atualiza só o metadado
+    if meta.get('mtime_ns') != stat.st_mtime_ns or meta.get('tamanho') != stat.st_size:
+        _gravar_meta_cache(caminho_meta, stat, sha256)
+
+    return conteudo['dados'], sha256, stat
+
+def _gravar_meta_cache(caminho_meta, stat, sha256):
+    meta = {
+        'versao_cache': VERSAO_CACHE,
+        'mtime_ns': stat.st_mtime_ns,
+        'tamanho': stat.st_size,
+        'sha256': sha256
+    }
+    try:
+        _escrever_arquivo_atomico(caminho_meta, json.dumps(meta).encode('utf-8'))
+    except OSError as e:
+        logger.warning('⚠️ Não foi possível gravar metadados do cache: %s', e)
+
+def salvar_cache_planilha(planilha_path, dados, sha256, stat):
+    """Grava os DataFrames normalizados no cache em disco, com o stat tirado junto com o sha256"""
+    caminho_dados, caminho_meta = _caminhos_cache(planilha_path)
+    conteudo = {
+        'versao_cache': VERSAO_CACHE,
+        'sha256': sha256,
+        'dados': dados
+    }
+    try:
+        os.makedirs(DIRETORIO_CACHE, exist_ok=True)
+        # Dados primeiro, metadados depois: metadados novos sempre apontam para dados novos
+        _escrever_arquivo_atomico(caminho_dados, pickle.dumps(conteudo, protocol=pickle.HIGHEST_PROTOCOL))
+        _gravar_meta_cache(caminho_meta, stat, sha256)
+        logger.info('💾 Cache da planilha gravado em: %s', caminho_dados)
+    except OSError as e:
+        logger.warning('⚠️ Não foi possível gravar o cache da planilha: %s', e)
+
+def carregar_dados_da_planilha(planilha_path=PLANILHA_PATH):
+    dados, _, _ = _carregar_dados_com_hash(planilha_path)
+    return dados
+
+def _carregar_dados_com_hash(planilha_path):
+    """Carrega as abas (do cache ou da planilha) e retorna também o SHA-256 do arquivo e o stat tirado com ele"""
     if not os.path.exists(planilha_path):
-        print("❌ Planilha não encontrada:", planilha_path)
-        return None, None, None, None
+        logger.error('❌ Planilha não encontrada: %s', planilha_path)
+        return (None, None, None, None), None, None
+
+    inicio = time.perf_counter()
+    with medir_etapa('leitura_cache', 'planilha'):
+        dados, sha256, stat = ler_cache_planilha(planilha_path)
+    if dados is not None:
+        logger.info('⚡ Dados carregados do cache em %.1f ms', (time.perf_counter() - inicio) * 1000)
+        return dados, sha256, stat
+
+    dados = processar_planilha(planilha_path)
+    if dados[0] is not None:
+        # Compactado antes de ir para o cache: as próximas cargas já saem compactas
+        dados = compactar_dados(dados)
+        with medir_etapa('gravacao_cache', 'planilha'):
+            salvar_cache_planilha(planilha_path, dados, sha256, stat)
+    logger.info('⏱️ Planilha processada em %.2f s', time.perf_counter() - inicio)
+    return dados, sha256, stat
+
+# ========== COMPACTAÇÃO DE TIPOS ==========
+# Texto com até esta fração de valores distintos vira categoria (códigos inteiros + um dicionário)
+LIMITE_CARDINALIDADE_CATEGORIA = 0.5
+TIPOS_COLUNAS_INTEIRAS = {'Ano': 'Int16', 'Mes': 'Int8'}
+
+def memoria_mb(df):
+    return df.memory_usage(deep=True).sum() / 1024 / 1024
+
+def compactar_tipos(df):
+    """Ano/Mes em inteiros anuláveis pequenos e textos repetitivos em categorias"""
+    for coluna, tipo in TIPOS_COLUNAS_INTEIRAS.items():
+        if coluna in df.columns:
+            df[coluna] = pd.to_numeric(df[coluna], errors='coerce').astype(tipo)
+    for coluna in df.columns:
+        serie = df[coluna]
+        if serie.dtype != object or len(serie) == 0:
+            continue
+        # Só colunas de texto (ou totalmente vazias); o infer_dtype percorre os valores em C
+        if pd.api.types.infer_dtype(serie, skipna=True) not in ('string', 'empty'):
+            continue
+        if serie.nunique() <= len(serie) * LIMITE_CARDINALIDADE_CATEGORIA:
+            df[coluna] = serie.astype('category')
+    return df
+
+def compactar_dados(dados):
+    """Aplica compactar_tipos nas quatro abas e registra a memória antes e depois"""
+    antes = sum(memoria_mb(df) for df in dados)
+    with medir_etapa('compactacao', 'planilha'):
+        dados = tuple(compactar_tipos(df) for df in dados)
+    depois = sum(memoria_mb(df) for df in dados)
+    logger.info('🗜️ Memória dos dados: %.1f MB -> %.1f MB (%.0f%% menor)',
+                antes, depois, (1 - depois / antes) * 100 if antes else 0)
+    return dados
 
+# ========== CARGA DAS ABAS ==========
+ABAS_PLANILHA = ['Checklist_Unidades', 'Politicas', 'Auditoria_Risco', 'Melhorias_Logistica']
+# Cada aba é lida e normalizada em um processo próprio (com mais de um núcleo disponível; senão, em série)
+CARGA_PARALELA = os.environ.get('DASHBOARD_CARGA_PARALELA', '1') == '1'
+# Processos da carga paralela (0 = núcleos disponíveis) e prazo para todas as abas ficarem prontas
+CARGA_PROCESSOS = int(os.environ.get('DASHBOARD_CARGA_PROCESSOS', '0'))
+CARGA_TIMEOUT_S = float(os.environ.get('DASHBOARD_CARGA_TIMEOUT', '600'))
+# Cada filho sobe um interpretador e importa pandas/openpyxl (~0,55 s) e reabre a planilha: o
+# paralelo só ganha quando as abas além da mais lenta levam mais que isso, a partir de ~0,5 MB
+# (base_auditoria.xlsx, 187 KB: 0,19 s fora da maior aba) a ~2 MB (sintética de 100 mil linhas)
+CARGA_PARALELA_MINIMO_BYTES = int(os.environ.get('DASHBOARD_CARGA_PARALELA_MINIMO', str(1024 * 1024)))
+# Executado como script (python app.py), os filhos por spawn reimportam o __main__, que é
+# este módulo: neles não há carga inicial nem threads
+PROCESSO_AUXILIAR = multiprocessing.parent_process() is not None
+
+def nucleos_disponiveis():
+    """Núcleos que este processo pode usar (afinidade/cpuset do container), não os da máquina"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+def carregar_abas_em_paralelo(conteudo, processos):
+    """Uma tarefa por aba em um pool de processos; o total se aproxima da aba mais lenta.
+
+    Os filhos nascem por spawn: um fork com threads vivas no pai (servidor, observador)
+    pode herdar travas presas. Cada filho importa só carga_abas e reabre a planilha a
+    partir dos mesmos bytes lidos pelo pai. Se as abas não ficarem prontas em
+    CARGA_TIMEOUT_S (inclusive quando um filho morre, já que o pool só o substitui),
+    TempoEsgotado sobe para o chamador; ao sair do bloco o pool encerra os filhos.
+    """
+    contexto = multiprocessing.get_context('spawn')
+    with contexto.Pool(processos, initializer=carga_abas.configurar_log_filho,
+                       initargs=(logger.getEffectiveLevel(), FORMATO_LOG)) as pool:
+        tarefas = {aba: pool.apply_async(carga_abas.carregar_aba_de_bytes, (conteudo, aba)) for aba in ABAS_PLANILHA}
+        prazo = time.monotonic() + CARGA_TIMEOUT_S
+        return {aba: tarefa.get(timeout=max(0, prazo - time.monotonic())) for aba, tarefa in tarefas.items()}
+
+def processar_planilha(planilha_path):
+    """Lê e normaliza as quatro abas da planilha (caminho lento, sem cache)"""
     try:
-        print(f"📁 Carregando dados da planilha: {planilha_path}")
+        logger.info('📁 Carregando dados da planilha: %s', planilha_path)
+        inicio = time.perf_counter()
 
-        # Leitura das planilhas
-        print("  Lendo aba Checklist_Unidades...")
-        df_checklist = pd.read_excel(planilha_path, sheet_name='Checklist_Unidades', engine='openpyxl')
-        
-        print("  Lendo aba Politicas...")
-        df_politicas = pd.read_excel(planilha_path, sheet_name='Politicas', engine='openpyxl')
-        
-        print("  Lendo aba Auditoria_Risco...")
-        df_risco = pd.read_excel(planilha_path, sheet_name='Auditoria_Risco', engine='openpyxl')
-        
-        print("  Lendo aba Melhorias_Logistica...")
-        df_melhorias = pd.read_excel(planilha_path, sheet_name='Melhorias_Logistica', engine='openpyxl')
-
-        print("✅ Leitura inicial da planilha concluída. Processando dados...")
-
-        for i, df in enumerate([df_checklist, df_politicas, df_risco, df_melhorias]):
-            if df is not None:
-                print(f"\n{'='*50}")
-                print(f"Processando aba {i}:")
-                print(f"Colunas originais: {df.columns.tolist()}")
-                print(f"Total de registros: {len(df)}")
-                
-                df = normalize_df_columns(df)
-                print(f"Colunas após normalização: {df.columns.tolist()}")
-                
-                # CORREÇÃO ESPECÍFICA PARA CADA ABA
-                if i == 0:  # df_checklist
-                    print("📋 Processando CHECKLIST...")
-                    
-                    # Normalizar Status
-                    if 'Status' in df.columns:
-                        df['Status'] = df['Status'].astype(str).str.strip()
-                        print(f"  Status únicos antes: {df['Status'].unique()[:10]}")
-                        df['Status'] = df['Status'].apply(canonical_status)
-                        print(f"  Status únicos depois: {df['Status'].unique()[:10]}")
-                    
-                    # Processar datas
-                    if 'Data' in df.columns:
-                        print(f"  Processando coluna Data...")
-                        print(f"  Tipo da coluna Data: {df['Data'].dtype}")
-                        print(f"  Amostra de datas: {df['Data'].head(5).tolist()}")
-                        
-                        # Converter a coluna Data para datetime
-                        df['Data_DT'] = pd.to_datetime(df['Data'], errors='coerce', dayfirst=True)
-                        
-                        falhas = df['Data_DT'].isna().sum()
-                        if falhas > 0:
-                            print(f"  ⚠️ {falhas} datas não puderam ser convertidas")
-                        
-                        # Extrair Ano e Mes
-                        df['Ano'] = df['Data_DT'].dt.year
-                        df['Mes'] = df['Data_DT'].dt.month
-                        
-                        df['Ano'] = df['Ano'].fillna(0).astype(int)
-                        df['Mes'] = df['Mes'].fillna(0).astype(int)
-                        df['Ano'] = df['Ano'].replace(0, pd.NA)
-                        df['Mes'] = df['Mes'].replace(0, pd.NA)
-                        
-                        print(f"  Ano únicos: {df['Ano'].dropna().unique()}")
-                        print(f"  Mês únicos: {df['Mes'].dropna().unique()}")
-                        
-                        df['Data'] = df['Data_DT'].apply(
-                            lambda x: x.strftime('%d/%m/%Y') if pd.notna(x) else ''
-                        )
-                        
-                        df = df.drop(columns=['Data_DT'])
-                
-                elif i == 1:  # df_politicas
-                    print("📑 Processando POLÍTICAS...")
-                    if 'Status' in df.columns:
-                        df['Status'] = df['Status'].apply(canonical_status)
-                
-                elif i == 2:  # df_risco
-                    print("🔄 Processando dados de RISCO...")
-                    print(f"  🔍 Colunas disponíveis: {df.columns.tolist()}")
-                    
-                    # 1. Encontrar e processar coluna de Status
-                    coluna_status = None
-                    for col in df.columns:
-                        if 'status' in col.lower():
-                            coluna_status = col
-                            break
-                    
-                    if coluna_status:
-                        print(f"  ✅ Coluna de Status encontrada: '{coluna_status}'")
-                        df[coluna_status] = df[coluna_status].astype(str).str.strip()
-                        df['Status'] = df[coluna_status].apply(canonical_status)
-                        print(f"  Status únicos: {df['Status'].unique()[:10]}")
-                    else:
-                        print(f"  ⚠️ Coluna de Status não encontrada")
-                        df['Status'] = "Não Iniciado"
-                    
-                    # 2. Encontrar e processar coluna de Data
-                    coluna_data = None
-                    for col in df.columns:
-                        if col.lower() == 'data':
-                            coluna_data = col
-                            break
-                    
-                    if coluna_data:
-                        print(f"\n  ✅ Coluna de Data encontrada: '{coluna_data}'")
-                        print(f"  Tipo da coluna Data: {df[coluna_data].dtype}")
-                        
-                        # Converter datas para datetime
-                        print(f"\n  🔍 Convertendo datas para datetime...")
-                        
-                        # Primeiro, converter tudo para string para análise
-                        df['Data_Str'] = df[coluna_data].astype(str)
-                        
-                        # Tentar extrair datas de diferentes formatos
-                        def converter_data_agressiva(data_str):
-                            if pd.isna(data_str) or data_str in ['nan', 'NaT', 'None', '']:
-                                return pd.NaT
-                            
-                            data_str = str(data_str).strip()
-                            
-                            # Padrões comuns
-                            padroes = [
-                                r'(\d{1,2})/(\d{1,2})/(\d{4})',
-                                r'(\d{1,2})-(\d{1,2})-(\d{4})',
-                                r'(\d{1,2})\.(\d{1,2})\.(\d{4})',
-                                r'(\d{4})-(\d{1,2})-(\d{1,2})',
-                            ]
-                            
-                            for padrao in padroes:
-                                match = re.search(padrao, data_str)
-                                if match:
-                                    grupos = match.groups()
-                                    if len(grupos) == 3:
-                                        try:
-                                            if '/' in data_str or '-' in data_str:
-                                                if int(grupos[0]) <= 31:
-                                                    dia, mes, ano = grupos
-                                                    dia = int(dia)
-                                                    mes = int(mes)
-                                                    ano = int(ano)
-                                                    return pd.Timestamp(year=ano, month=mes, day=dia)
-                                                else:
-                                                    ano, mes, dia = grupos
-                                                    dia = int(dia)
-                                                    mes = int(mes)
-                                                    ano = int(ano)
-                                                    return pd.Timestamp(year=ano, month=mes, day=dia)
-                                        except:
-                                            continue
-                            
-                            # Se não encontrou padrão, tentar pandas diretamente
-                            try:
-                                data_dt = pd.to_datetime(data_str, dayfirst=True, errors='coerce')
-                                if pd.notna(data_dt):
-                                    return data_dt
-                                
-                                data_dt = pd.to_datetime(data_str, dayfirst=False, errors='coerce')
-                                if pd.notna(data_dt):
-                                    return data_dt
-                                
-                                data_dt = pd.to_datetime(data_str, errors='coerce')
-                                return data_dt
-                            except:
-                                return pd.NaT
-                        
-                        # Aplicar conversão agressiva
-                        df['Data_DT'] = df['Data_Str'].apply(converter_data_agressiva)
-                        
-                        # Verificar resultados
-                        total = len(df)
-                        sucesso = df['Data_DT'].notna().sum()
-                        falhas = total - sucesso
-                        
-                        print(f"\n  ✅ Resultado da conversão:")
-                        print(f"     Total de registros: {total}")
-                        print(f"     Conversões bem-sucedidas: {sucesso} ({sucesso/total*100:.1f}%)")
-                        print(f"     Falhas: {falhas}")
-                        
-                        if falhas > 0:
-                            print(f"  ⚠️ Exemplos de datas que falharam:")
-                            falhas_df = df[df['Data_DT'].isna()]
-                            for j, data in enumerate(falhas_df['Data_Str'].head(5).tolist()):
-                                print(f"      {j+1}. '{data}'")
-                        
-                        # Extrair mês e ano
-                        df['Mes'] = df['Data_DT'].dt.month
-                        df['Ano'] = df['Data_DT'].dt.year
-                        
-                        # Converter para inteiros
-                        df['Mes'] = df['Mes'].fillna(0).astype(int)
-                        df['Ano'] = df['Ano'].fillna(0).astype(int)
-                        df['Mes'] = df['Mes'].replace(0, pd.NA)
-                        df['Ano'] = df['Ano'].replace(0, pd.NA)
-                        
-                        # Criar Mes_Ano para exibição
-                        df['Mes_Ano'] = df.apply(
-                            lambda row: f"{int(row['Mes']):02d}/{int(row['Ano'])}" 
-                            if pd.notna(row['Mes']) and pd.notna(row['Ano']) 
-                            else "Sem Data", 
-                            axis=1
-                        )
-                        
-                        # Formatar data para exibição
-                        df['Data_Formatada'] = df['Data_DT'].apply(
-                            lambda x: x.strftime('%d/%m/%Y') if pd.notna(x) else ''
-                        )
-                        
-                        # Remover colunas temporárias
-                        df = df.drop(columns=['Data_DT', 'Data_Str'])
-                    else:
-                        print(f"  ❌ Coluna de Data não encontrada!")
-                        df['Mes'] = pd.NA
-                        df['Ano'] = pd.NA
-                        df['Mes_Ano'] = "Sem Data"
-                        df['Data_Formatada'] = ""
-                    
-                    # 3. Encontrar coluna de Relatório
-                    coluna_relatorio = None
-                    for col in df.columns:
-                        if 'relatorio' in col.lower():
-                            coluna_relatorio = col
-                            break
-                    
-                    if coluna_relatorio:
-                        print(f"  ✅ Coluna de Relatório encontrada: '{coluna_relatorio}'")
-                        df['Relatorio'] = df[coluna_relatorio].astype(str)
-                        
-                        # DEBUG: Mostrar alguns exemplos de relatórios e siglas
-                        print(f"\n  🔤 Exemplos de relatórios e siglas:")
-                        siglas = []
-                        for idx, (relatorio, row) in enumerate(zip(df['Relatorio'].head(10), df.head(10).iterrows())):
-                            sigla = criar_sigla_relatorio(relatorio, idx)
-                            siglas.append(sigla)
-                            print(f"     {idx+1}. '{relatorio[:50]}...' -> {sigla}")
-                        
-                        # Criar siglas para os relatórios usando o dicionário
-                        print(f"\n  🔤 Criando siglas para TODOS os relatórios...")
-                        siglas = []
-                        for idx, relatorio in enumerate(df['Relatorio']):
-                            sigla = criar_sigla_relatorio(relatorio, idx)
-                            siglas.append(sigla)
-                        df['Sigla'] = siglas
-                        
-                        # Contar siglas únicas
-                        siglas_unicas = df['Sigla'].nunique()
-                        print(f"  📊 Total de siglas únicas criadas: {siglas_unicas}")
-                        print(f"  ✅ Exemplos de siglas: {df['Sigla'].unique()[:20]}")
-                        
-                    else:
-                        print(f"  ⚠️ Coluna de Relatório não encontrada")
-                        df['Relatorio'] = df.get('ID', 'Sem Relatório').astype(str)
-                        # Criar siglas padrão
-                        siglas = []
-                        for idx in range(len(df)):
-                            siglas.append(f"R{idx:03d}")
-                        df['Sigla'] = siglas
-                    
-                    # 4. Garantir coluna Unidade
-                    if 'Unidade' not in df.columns:
-                        for col in df.columns:
-                            if 'unidade' in col.lower():
-                                df['Unidade'] = df[col].astype(str)
-                                print(f"  ✅ Coluna Unidade mapeada de: '{col}'")
-                                break
-                        else:
-                            print(f"  ⚠️ Coluna Unidade não encontrada, criando padrão")
-                            df['Unidade'] = "Sem Unidade"
-                    
-                    # DEBUG: Mostrar estrutura final
-                    print(f"\n  📊 ESTRUTURA FINAL DO DATAFRAME DE RISCO:")
-                    print(f"     Colunas: {df.columns.tolist()}")
-                    print(f"     Total de registros: {len(df)}")
-                    print(f"     Unidades únicas: {df['Unidade'].nunique()}")
-                    print(f"     Meses com dados: {df['Mes'].dropna().nunique()}")
-                    print(f"     Anos com dados: {df['Ano'].dropna().nunique()}")
-                    print(f"     Siglas únicas: {df['Sigla'].nunique()}")
-                
-                elif i == 3:  # df_melhorias
-                    print("📈 Processando MELHORIAS...")
-                    if 'Status' in df.columns:
-                        df['Status'] = df['Status'].apply(canonical_status)
-                
-                print(f"Colunas finais: {df.columns.tolist()}")
-                
-                if i == 0: df_checklist = df
-                elif i == 1: df_politicas = df
-                elif i == 2: df_risco = df
-                elif i == 3: df_melhorias = df
-
-        print("\n" + "="*50)
-        print("✅ Dados carregados da planilha com sucesso!")
-        print("="*50)
+        # Lida uma vez: todas as abas (em série ou nos processos) vêm do mesmo conteúdo
+        with open(planilha_path, 'rb') as arquivo:
+            conteudo = arquivo.read()
+
+        resultados = None
+        modo = 'série'
+        processos = min(CARGA_PROCESSOS or nucleos_disponiveis(), len(ABAS_PLANILHA))
+        # Com um único núcleo os processos só concorreriam entre si
+        if CARGA_PARALELA and processos > 1 and len(conteudo) >= CARGA_PARALELA_MINIMO_BYTES:
+            try:
+                resultados = carregar_abas_em_paralelo(conteudo, processos)
+                modo = f'paralelo, {processos} processos'
+            except (OSError, TempoEsgotado) as e:
+                logger.warning('⚠️ Carga paralela das abas falhou (%s: %s); carregando em série',
+                               type(e).__name__, e)
+        if resultados is None:
+            # A planilha é aberta uma vez (zip, strings compartilhadas e estilos); cada aba só é interpretada
+            livro = abrir_planilha(conteudo)
+            logger.debug('  Planilha aberta em %.2f s (%s)', time.perf_counter() - inicio, type(livro).__name__)
+            with contextlib.closing(livro):
+                resultados = {aba: carregar_aba(livro, aba) for aba in ABAS_PLANILHA}
+
+        for aba, (df, tempos) in resultados.items():
+            registrar_etapa('leitura_excel', aba, tempos['leitura_s'])
+            registrar_etapa('normalizacao', aba, tempos['normalizacao_s'])
+            logger.info('  ⏱️ %s: leitura %.2f s, normalização %.2f s',
+                        aba, tempos['leitura_s'], tempos['normalizacao_s'])
+        df_checklist, df_politicas, df_risco, df_melhorias = (resultados[aba][0] for aba in ABAS_PLANILHA)
+
+        logger.info('✅ Dados carregados da planilha com sucesso em %.2f s (%s)!', time.perf_counter() - inicio, modo)
         
-        print(f"\n📊 RESUMO DOS DADOS CARREGADOS:")
-        print(f"  Checklist: {len(df_checklist)} registros")
-        print(f"  Políticas: {len(df_politicas)} registros")
-        print(f"  Risco: {len(df_risco)} registros")
-        print(f"  Melhorias: {len(df_melhorias)} registros")
+        logger.info('📊 RESUMO DOS DADOS CARREGADOS:')
+        logger.info('  Checklist: %s registros', len(df_checklist))
+        logger.info('  Políticas: %s registros', len(df_politicas))
+        logger.info('  Risco: %s registros', len(df_risco))
+        logger.info('  Melhorias: %s registros', len(df_melhorias))
         
-        if df_risco is not None and len(df_risco) > 0:
-            print(f"\n📋 DETALHES DA MATRIZ DE RISCO:")
-            print(f"  Colunas: {df_risco.columns.tolist()}")
+        if df_risco is not None and len(df_risco) > 0 and logger.isEnabledFor(logging.DEBUG):
+            logger.debug('📋 DETALHES DA MATRIZ DE RISCO:')
+            logger.debug('  Colunas: %s', df_risco.columns.tolist())
             if 'Ano' in df_risco.columns:
                 anos_unicos = df_risco['Ano'].dropna().unique()
-                print(f"  Anos únicos encontrados ({len(anos_unicos)}):")
+                logger.debug('  Anos únicos encontrados (%s):', len(anos_unicos))
                 for ano in sorted(anos_unicos):
                     contagem = len(df_risco[df_risco['Ano'] == ano])
-                    print(f"    {int(ano)}: {contagem} registros")
+                    logger.debug('    %s: %s registros', int(ano), contagem)
         
         return df_checklist, df_politicas, df_risco, df_melhorias
 
     except Exception as e:
-        print(f"❌ Erro ao carregar planilha: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception('❌ Erro ao carregar planilha: %s', e)
         return None, None, None, None
 
 # ========== FUNÇÕES UTILITÁRIAS ==========
@@ -1182,561 +1029,1761 @@ def obter_meses_disponiveis(df_checklist, ano_selecionado):
     
     return [{'label': f'{nomes_meses[m]}', 'value': m} for m in range(1, 13)]
 
-# ========== CARREGAR DADOS ==========
-df_checklist, df_politicas, df_risco, df_melhorias = carregar_dados_da_planilha()
-if df_checklist is None:
-    app = Dash(__name__)
-    server = app.server
-    app.layout = html.Div([html.H1("❌ Planilha não encontrada")])
-    if __name__ == '__main__':
-        app.run(debug=True, port=8050)
-    exit()
-
-anos_disponiveis = obter_anos_disponiveis(df_checklist)
-print(f"\nDEBUG: Anos disponíveis no filtro: {anos_disponiveis}")
+# ========== ÍNDICE DE FILTROS ==========
+# Colunas pelas quais cada aba é filtrada nos callbacks
+COLUNAS_FILTRO_CHECKLIST = ('Ano', 'Mes', 'Unidade')
+COLUNAS_FILTRO_RISCO = ('Ano', 'Unidade')
 
-# ========== APP DASH ==========
-app = Dash(__name__)
+def construir_indice_filtros(df, colunas):
+    """Pré-calcula as posições das linhas para cada combinação de colunas de filtro.
 
-# ========== APLICAR AUTENTICAÇÃO ==========
-auth = dash_auth.BasicAuth(app, USUARIOS_VALIDOS)
+    Retorna {(colunas...): {(valores...): array de posições}} para todo subconjunto
+    não vazio de `colunas` presentes no DataFrame. As posições saem em ordem crescente,
+    então filtrar por elas preserva a ordem original das linhas.
+    """
+    colunas = [col for col in colunas if col in df.columns]
+    indice = {}
+    for tamanho in range(1, len(colunas) + 1):
+        for subconjunto in combinations(colunas, tamanho):
+            grupos = df.groupby(list(subconjunto), dropna=False, sort=False, observed=True).indices
+            if tamanho == 1:
+                grupos = {(chave,): posicoes for chave, posicoes in grupos.items()}
+            indice[subconjunto] = grupos
+    return indice
 
-# ========== LAYOUT DO DASHBOARD ==========
-app.layout = html.Div([
-    html.Div([
-        html.H1("📊 DASHBOARD DE AUDITORIA", 
-                style={
-                    'textAlign':'center', 
-                    'marginBottom':'8px',
-                    'fontSize': '16px',
-                    'color': '#2c3e50'
-                })
-    ]),
-    html.Div([
-        html.Div([
-            html.Label("Ano:", style={'fontSize': '10px', 'fontWeight': 'bold', 'marginBottom': '1px'}),
-            dcc.Dropdown(
-                id='filtro-ano',
-                options=[{'label':'Todos','value':'todos'}]+
-                       [{'label':str(a),'value':a} for a in anos_disponiveis],
-                value='todos',
-                style={'fontSize': '10px', 'minHeight': '28px', 'padding': '2px'}
-            )
-        ], style={'marginRight':'8px','width':'140px'}),
-        html.Div([
-            html.Label("Mês:", style={'fontSize': '10px', 'fontWeight': 'bold', 'marginBottom': '1px'}),
-            dcc.Dropdown(
-                id='filtro-mes',
-                options=[{'label':'Todos','value':'todos'}]+
-                       [{'label':f'{m}','value':m} for m in range(1, 13)],
-                value='todos',
-                style={'fontSize': '10px', 'minHeight': '28px', 'padding': '2px'}
-            )
-        ], style={'marginRight':'8px','width':'110px'}),
-        html.Div([
-            html.Label("Unidade:", style={'fontSize': '10px', 'fontWeight': 'bold', 'marginBottom': '1px'}),
-            dcc.Dropdown(
-                id='filtro-unidade',
-                options=[{'label':'Todas','value':'todas'}]+
-                        [{'label':str(u),'value':str(u)} for u in sorted(df_checklist['Unidade'].dropna().unique())],
-                value='todas',
-                style={'fontSize': '10px', 'minHeight': '28px', 'padding': '2px'}
-            )
-        ], style={'width':'150px'})
-    ], style={'display':'flex','justifyContent':'center','marginBottom':'10px','flexWrap':'wrap', 'padding': '3px', 'gap': '5px'}),
-    html.Div(id='conteudo-principal', style={'padding':'8px', 'maxWidth': '1400px', 'margin': '0 auto', 'overflowY': 'auto'})
-])
+def posicoes_por_indice(indice, filtros):
+    """Posições (em ordem crescente) das linhas que atendem `filtros`; None quando não há filtros"""
+    if not filtros:
+        return None
+    for subconjunto, grupos in indice.items():
+        if len(subconjunto) == len(filtros) and set(subconjunto) == set(filtros):
+            posicoes = grupos.get(tuple(filtros[col] for col in subconjunto))
+            return posicoes if posicoes is not None else np.empty(0, dtype=np.intp)
+    raise KeyError(f"Sem índice para os filtros {sorted(filtros)}")
 
-# ========== CALLBACKS ==========
-@app.callback(
-    Output('conteudo-principal','children'),
-    [Input('filtro-ano','value'),
-     Input('filtro-mes','value'),
-     Input('filtro-unidade','value')]
-)
-def atualizar_conteudo_principal(ano, mes, unidade):
-    # ---------- FILTRAR CHECKLIST ----------
-    df = df_checklist.copy()
-    
-    print(f"\n🔍 DEBUG FILTROS: Ano='{ano}', Mês='{mes}', Unidade='{unidade}'")
-    
-    if 'Ano' in df.columns:
-        df['Ano'] = pd.to_numeric(df['Ano'], errors='coerce')
-    
-    if 'Mes' in df.columns:
-        df['Mes'] = pd.to_numeric(df['Mes'], errors='coerce')
-    
-    total_antes = len(df)
-    
-    if ano != 'todos':
-        try:
-            ano_filtro = int(ano)
-            df = df[df['Ano'] == ano_filtro]
-            print(f"  ✅ Filtro ANO aplicado: {ano_filtro} | Registros: {len(df)}/{total_antes}")
-        except Exception as e:
-            print(f"  ❌ Erro ao filtrar por ano '{ano}': {e}")
-    
-    if mes != 'todos':
-        try:
-            mes_filtro = int(mes)
-            df = df[df['Mes'] == mes_filtro]
-            print(f"  ✅ Filtro MÊS aplicado: {mes_filtro} | Registros: {len(df)}")
-        except Exception as e:
-            print(f"  ❌ Erro ao filtrar por mês '{mes}': {e}")
-    
-    if unidade != 'todas':
-        try:
-            df['Unidade'] = df['Unidade'].astype(str).str.strip()
-            df = df[df['Unidade'] == unidade.strip()]
-            print(f"  ✅ Filtro UNIDADE aplicado: '{unidade}' | Registros: {len(df)}")
-        except Exception as e:
-            print(f"  ❌ Erro ao filtrar por unidade '{unidade}': {e}")
-    
-    total = len(df)
-    print(f"📊 TOTAL APÓS FILTROS: {total} registros")
-    
-    # ---------- Contagem correta dos status ----------
-    if total > 0:
-        df['Status'] = df['Status'].astype(str).str.strip()
-        conforme = len(df[df['Status'].str.lower() == 'conforme'])
-        parcial = len(df[df['Status'].str.lower().str.contains('parcial')])
-        nao = len(df[df['Status'].str.lower().str.contains('não|nao')])
-    else:
-        conforme = 0
-        parcial = 0
-        nao = 0
+def filtrar_por_indice(df, indice, filtros):
+    """Filtra `df` por igualdade usando o índice pré-calculado.
 
-    # ---------- KPIs GERAIS SUPER COMPACTOS ----------
-    kpis = html.Div([
-        html.Div([
-            html.H4("Conforme", style={'color':'#27ae60','margin':'0', 'fontSize': '11px'}),
-            html.H2(f"{conforme}", style={'color':'#27ae60','margin':'0', 'fontSize': '20px'}),
-            html.P(f"{(conforme/total*100 if total>0 else 0):.1f}%", style={'margin':'0','color':'#27ae60', 'fontSize': '9px'})
-        ], style={'borderLeft':'3px solid #27ae60','borderRadius':'2px','padding':'6px','margin':'2px','flex':'1',
-                  'backgroundColor':'#eafaf1','textAlign':'center','boxShadow':'0 1px 2px rgba(0,0,0,0.05)',
-                  'minWidth': '100px', 'maxWidth': '110px', 'height': '70px'}),
+    `filtros` é {coluna: valor}; filtros vazios devolvem o próprio DataFrame (sem cópia).
+    O custo é proporcional ao tamanho do resultado, não ao da aba.
+    """
+    posicoes = posicoes_por_indice(indice, filtros)
+    return df if posicoes is None else df.iloc[posicoes]
 
-        html.Div([
-            html.H4("Conforme Parcial", style={'color':'#f39c12','margin':'0', 'fontSize': '11px'}),
-            html.H2(f"{parcial}", style={'color':'#f39c12','margin':'0', 'fontSize': '20px'}),
-            html.P(f"{(parcial/total*100 if total>0 else 0):.1f}%", style={'margin':'0','color':'#f39c12', 'fontSize': '9px'})
-        ], style={'borderLeft':'3px solid #f39c12','borderRadius':'2px','padding':'6px','margin':'2px','flex':'1',
-                  'backgroundColor':'#fff8e1','textAlign':'center','boxShadow':'0 1px 2px rgba(0,0,0,0.05)',
-                  'minWidth': '100px', 'maxWidth': '110px', 'height': '70px'}),
+# ========== SNAPSHOT DOS DADOS ==========
+@dataclass(frozen=True)
+class SnapshotDados:
+    """Conjunto imutável de DataFrames carregados de uma versão da planilha.
 
-        html.Div([
-            html.H4("Não Conforme", style={'color':'#e74c3c','margin':'0', 'fontSize': '11px'}),
-            html.H2(f"{nao}", style={'color':'#e74c3c','margin':'0', 'fontSize': '20px'}),
-            html.P(f"{(nao/total*100 if total>0 else 0):.1f}%", style={'margin':'0','color':'#e74c3c', 'fontSize': '9px'})
-        ], style={'borderLeft':'3px solid #e74c3c','borderRadius':'2px','padding':'6px','margin':'2px','flex':'1',
-                  'backgroundColor':'#fdecea','textAlign':'center','boxShadow':'0 1px 2px rgba(0,0,0,0.05)',
-                  'minWidth': '100px', 'maxWidth': '110px', 'height': '70px'})
-    ], style={'display':'flex','justifyContent':'center','flexWrap':'wrap','marginBottom':'10px', 'gap': '2px'})
+    Os callbacks obtêm o snapshot uma única vez no início e nunca alteram os
+    DataFrames (filtram pelo índice e copiam só o que vão modificar), então uma
+    recarga pode trocar o snapshot global sem afetar requisições em andamento.
+    """
+    versao: int
+    df_checklist: pd.DataFrame
+    df_politicas: pd.DataFrame
+    df_risco: pd.DataFrame
+    df_melhorias: pd.DataFrame
+    sha256: str
+    mtime_ns: int
+    tamanho: int
+    carregado_em: datetime
+    duracao_s: float
+    # Posições das linhas por combinação de filtros: {'checklist': ..., 'risco': ...}
+    indices: dict = field(default=None, repr=False)
+    # Dados compactos (contagens, posições, células da matriz) por (seção, filtros da seção),
+    # quando o pré-cálculo está habilitado; a renderização continua sob demanda
+    visoes: dict = field(default=None, repr=False)
+    relatorio_visoes: dict = None
+    # Pasta da versão publicada em DIRETORIO_COMPARTILHADO, quando os DataFrames são mmaps dela
+    pasta_compartilhada: str = None
 
-    # ---------- Tabela de NÃO CONFORMES MAIOR ----------
-    df_nao_conforme = df[df['Status']=='Não Conforme']
-    
-    # Inicializar contadores de prazo
-    dentro_prazo = 0
-    fora_prazo = 0
-    nao_concluido = 0
-    
-    if len(df_nao_conforme) > 0:
-        # Fazer uma cópia para não modificar o original
-        df_nao_conforme_display = df_nao_conforme.copy()
-        
-        # Procurar colunas de prazo e data de finalização
-        colunas_disponiveis = df_nao_conforme_display.columns.tolist()
-        colunas_lower = [str(col).lower() for col in colunas_disponiveis]
-        
-        # Procurar coluna de prazo
-        coluna_prazo = None
-        prazo_keywords = ['prazo', 'prazo_final', 'data_prazo', 'data_limite', 'limite']
-        for keyword in prazo_keywords:
-            for idx, col_lower in enumerate(colunas_lower):
-                if keyword in col_lower:
-                    coluna_prazo = colunas_disponiveis[idx]
-                    break
-            if coluna_prazo:
-                break
-        
-        # Procurar coluna de data de finalização
-        coluna_finalizacao = None
-        finalizacao_keywords = ['data_finalizacao', 'data_conclusao', 'finalizacao', 'conclusao', 
-                               'data_encerramento', 'data_termino']
-        for keyword in finalizacao_keywords:
-            for idx, col_lower in enumerate(colunas_lower):
-                if keyword in col_lower:
-                    coluna_finalizacao = colunas_disponiveis[idx]
-                    break
-            if coluna_finalizacao:
-                break
-        
-        # Se encontrou ambas as colunas, calcular status do prazo
-        if coluna_prazo and coluna_finalizacao:
-            print(f"✅ Encontradas colunas de prazo: '{coluna_prazo}' e finalização: '{coluna_finalizacao}'")
-            
-            # Formatar datas
-            df_nao_conforme_display['Prazo_Formatado'] = df_nao_conforme_display[coluna_prazo].apply(formatar_data)
-            df_nao_conforme_display['Finalizacao_Formatada'] = df_nao_conforme_display[coluna_finalizacao].apply(formatar_data)
-            
-            # Calcular status do prazo
-            df_nao_conforme_display['Status_Prazo'] = df_nao_conforme_display.apply(
-                lambda row: calcular_status_prazo(row[coluna_prazo], row[coluna_finalizacao]), 
-                axis=1
-            )
-            
-            # Contar status dos prazos
-            status_prazos = df_nao_conforme_display['Status_Prazo'].value_counts()
-            dentro_prazo = status_prazos.get('Concluído no Prazo', 0)
-            fora_prazo = status_prazos.get('Concluído Fora do Prazo', 0)
-            nao_concluido = status_prazos.get('Não Concluído', 0)
-            
-            print(f"📊 STATUS DOS PRAZOS:")
-            print(f"  Dentro do prazo: {dentro_prazo}")
-            print(f"  Fora do prazo: {fora_prazo}")
-            print(f"  Não concluído: {nao_concluido}")
-            
-            # Reordenar colunas para melhor visualização
-            colunas_ordenadas = ['Unidade', 'Status', 'Status_Prazo', 'Prazo_Formatado', 'Finalizacao_Formatada']
-            colunas_restantes = [col for col in df_nao_conforme_display.columns 
-                                if col not in colunas_ordenadas + [coluna_prazo, coluna_finalizacao]]
-            
-            colunas_finais = colunas_ordenadas + colunas_restantes
-            df_nao_conforme_display = df_nao_conforme_display[colunas_finais]
-            
-            # Renomear colunas para exibição
-            df_nao_conforme_display = df_nao_conforme_display.rename(columns={
-                'Prazo_Formatado': 'Prazo',
-                'Finalizacao_Formatada': 'Data Finalização',
-                'Status_Prazo': 'Status do Prazo'
-            })
-            
-            # Criar tabela MAIOR com cores condicionais
-            tabela_nao_conforme = dash_table.DataTable(
-                columns=[{"name": col, "id": col} for col in df_nao_conforme_display.columns],
-                data=df_nao_conforme_display.to_dict('records'),
-                page_size=10,  # AUMENTADO de 5 para 10 linhas
-                style_table={'overflowX':'auto', 'fontSize': '10px', 'marginTop': '5px', 'height': '300px'},  # AUMENTADA altura
-                style_header={
-                    'backgroundColor': '#c0392b',
-                    'color': 'white',
-                    'fontWeight': 'bold',
-                    'textAlign':'center',
-                    'fontSize': '10px',
-                    'padding': '4px 5px',
-                    'minHeight': '30px',
-                    'height': '30px',
-                    'position': 'sticky',
-                    'top': '0'
-                },
-                style_cell={
-                    'textAlign': 'center',
-                    'padding': '3px 4px',
-                    'whiteSpace':'normal',
-                    'height':'auto',
-                    'fontSize': '9px',
-                    'minWidth': '50px',  # Aumentado
-                    'maxWidth': '150px', # Aumentado
-                    'overflow': 'hidden',
-                    'textOverflow': 'ellipsis'
-                },
-                style_data_conditional=[
-                    {'if': {'row_index': 'odd'}, 'backgroundColor': '#f9e6e6'},
-                    {'if': {'row_index': 'even'}, 'backgroundColor': '#fdecea'},
-                    {
-                        'if': {
-                            'filter_query': '{Status do Prazo} = "Concluído no Prazo"',
-                        },
-                        'backgroundColor': '#d4edda',
-                        'color': '#155724',
-                        'fontWeight': 'bold'
-                    },
-                    {
-                        'if': {
-                            'filter_query': '{Status do Prazo} = "Concluído Fora do Prazo"',
-                        },
-                        'backgroundColor': '#f8d7da',
-                        'color': '#721c24',
-                        'fontWeight': 'bold'
-                    },
-                    {
-                        'if': {
-                            'filter_query': '{Status do Prazo} = "Não Concluído"',
-                        },
-                        'backgroundColor': '#fff3cd',
-                        'color': '#856404',
-                        'fontWeight': 'bold'
-                    }
-                ]
-            )
-            
-        else:
-            # Se não encontrou as colunas, mostrar tabela normal MAIOR
-            print(f"⚠️ Não encontrou colunas de prazo/finalização. Colunas disponíveis: {colunas_disponiveis}")
-            
-            # Remover colunas desnecessárias
-            colunas_para_remover = ['Ano', 'Mes', 'Mes_Ano']
-            for col in colunas_para_remover:
-                if col in df_nao_conforme_display.columns:
-                    df_nao_conforme_display = df_nao_conforme_display.drop(columns=[col])
-            
-            # Formatar datas se houver
-            colunas_data = [col for col in df_nao_conforme_display.columns 
-                           if any(termo in col.lower() for termo in ['data', 'prazo', 'vencimento', 'limite', 'criacao', 'conclusao'])]
-            
-            for coluna_data in colunas_data:
-                if coluna_data in df_nao_conforme_display.columns:
-                    df_nao_conforme_display[coluna_data] = df_nao_conforme_display[coluna_data].apply(formatar_data)
-            
-            # Limitar número de colunas para visualização
-            if len(df_nao_conforme_display.columns) > 8:
-                # Manter apenas as colunas mais importantes
-                colunas_importantes = ['Unidade', 'Status', 'Data', 'Descricao']
-                colunas_selecionadas = [col for col in colunas_importantes if col in df_nao_conforme_display.columns]
-                colunas_adicionais = [col for col in df_nao_conforme_display.columns if col not in colunas_importantes][:4]
-                df_nao_conforme_display = df_nao_conforme_display[colunas_selecionadas + colunas_adicionais]
-            
-            tabela_nao_conforme = dash_table.DataTable(
-                columns=[{"name": col, "id": col} for col in df_nao_conforme_display.columns],
-                data=df_nao_conforme_display.to_dict('records'),
-                page_size=10,  # AUMENTADO
-                style_table={'overflowX':'auto', 'fontSize': '10px', 'marginTop': '5px', 'height': '300px'},  # AUMENTADA
-                style_header={
-                    'backgroundColor': '#c0392b',
-                    'color': 'white',
-                    'fontWeight': 'bold',
-                    'textAlign':'center',
-                    'fontSize': '10px',
-                    'padding': '4px 5px',
-                    'minHeight': '30px',
-                    'height': '30px',
-                    'position': 'sticky',
-                    'top': '0'
-                },
-                style_cell={
-                    'textAlign': 'center',
-                    'padding': '3px 4px',
-                    'whiteSpace':'normal',
-                    'height':'auto',
-                    'fontSize': '9px',
-                    'minWidth': '50px',  # Aumentado
-                    'maxWidth': '150px', # Aumentado
-                    'overflow': 'hidden',
-                    'textOverflow': 'ellipsis'
-                },
-                style_data_conditional=[
-                    {'if': {'row_index': 'odd'}, 'backgroundColor': '#f9e6e6'},
-                    {'if': {'row_index': 'even'}, 'backgroundColor': '#fdecea'}
-                ]
-            )
-    else:
-        tabela_nao_conforme = html.Div([
-            html.P("✅ Nenhum item não conforme encontrado com os filtros atuais.", 
-                   style={'textAlign': 'center', 'padding': '10px', 'color': '#27ae60', 'fontSize': '11px'})
-        ], style={'height': '100px', 'display': 'flex', 'alignItems': 'center', 'justifyContent': 'center'})
-    
-    tabela_titulo = html.H3(f"❌ Itens Não Conformes ({len(df_nao_conforme)} itens)", 
-                           style={'marginTop': '12px', 'marginBottom': '6px', 'color': '#c0392b', 'fontSize': '13px'})
-    
-    # ---------- KPIs de PRAZOS dos Itens Não Conformes SUPER COMPACTOS ----------
-    if len(df_nao_conforme) > 0 and (coluna_prazo and coluna_finalizacao):
-        kpis_prazos = html.Div([
-            html.Div([
-                html.H4("Dentro Prazo", style={'color':'#27ae60','margin':'0', 'fontSize': '9px'}),
-                html.H2(f"{dentro_prazo}", style={'color':'#27ae60','margin':'0', 'fontSize': '16px'}),
-                html.P(f"{(dentro_prazo/len(df_nao_conforme)*100 if len(df_nao_conforme)>0 else 0):.1f}%", 
-                       style={'margin':'0','color':'#27ae60', 'fontSize': '8px'})
-            ], style={'borderLeft':'2px solid #27ae60','borderRadius':'2px','padding':'6px','margin':'2px','flex':'1',
-                      'backgroundColor':'#d4edda','textAlign':'center','boxShadow':'0 1px 2px rgba(0,0,0,0.05)',
-                      'minWidth': '80px', 'maxWidth': '90px', 'height': '60px'}),
+    def contagens(self):
+        return {
+            'Checklist_Unidades': len(self.df_checklist),
+            'Politicas': len(self.df_politicas),
+            'Auditoria_Risco': len(self.df_risco),
+            'Melhorias_Logistica': len(self.df_melhorias)
+        }
 
-            html.Div([
-                html.H4("Fora Prazo", style={'color':'#e74c3c','margin':'0', 'fontSize': '9px'}),
-                html.H2(f"{fora_prazo}", style={'color':'#e74c3c','margin':'0', 'fontSize': '16px'}),
-                html.P(f"{(fora_prazo/len(df_nao_conforme)*100 if len(df_nao_conforme)>0 else 0):.1f}%", 
-                       style={'margin':'0','color':'#e74c3c', 'fontSize': '8px'})
-            ], style={'borderLeft':'2px solid #e74c3c','borderRadius':'2px','padding':'6px','margin':'2px','flex':'1',
-                      'backgroundColor':'#f8d7da','textAlign':'center','boxShadow':'0 1px 2px rgba(0,0,0,0.05)',
-                      'minWidth': '80px', 'maxWidth': '90px', 'height': '60px'}),
+    def resumo(self):
+        return {
+            'versao': self.versao,
+            'sha256': self.sha256,
+            'carregado_em': self.carregado_em.isoformat(timespec='seconds'),
+            'duracao_s': round(self.duracao_s, 3),
+            'linhas': self.contagens(),
+            'memoria_mb': round(sum(memoria_mb(df) for df in (self.df_checklist, self.df_politicas,
+                                                               self.df_risco, self.df_melhorias)), 2),
+            'visoes_materializadas': self.relatorio_visoes,
+            'dados_compartilhados': self.pasta_compartilhada
+        }
 
-            html.Div([
-                html.H4("Não Concluído", style={'color':'#f39c12','margin':'0', 'fontSize': '9px'}),
-                html.H2(f"{nao_concluido}", style={'color':'#f39c12','margin':'0', 'fontSize': '16px'}),
-                html.P(f"{(nao_concluido/len(df_nao_conforme)*100 if len(df_nao_conforme)>0 else 0):.1f}%", 
-                       style={'margin':'0','color':'#f39c12', 'fontSize': '8px'})
-            ], style={'borderLeft':'2px solid #f39c12','borderRadius':'2px','padding':'6px','margin':'2px','flex':'1',
-                      'backgroundColor':'#fff3cd','textAlign':'center','boxShadow':'0 1px 2px rgba(0,0,0,0.05)',
-                      'minWidth': '80px', 'maxWidth': '90px', 'height': '60px'})
-        ], style={'display':'flex','justifyContent':'center','flexWrap':'wrap','marginBottom':'8px', 'gap': '2px'})
-        
-        # Adicionar legenda para KPIs de prazo SUPER COMPACTA
-        legenda_prazo = html.Div([
-            html.P("📊 Status dos Prazos:", 
-                   style={'fontWeight':'bold','marginBottom':'1px', 'fontSize': '9px', 'textAlign': 'center'}),
-            html.Div([
-                html.Span("🟢 ", style={'color':'#27ae60','marginRight':'1px', 'fontSize': '8px'}),
-                html.Span("Dentro Prazo", style={'marginRight':'6px','color':'#27ae60', 'fontSize': '8px'}),
-                html.Span("🔴 ", style={'color':'#e74c3c','marginRight':'1px', 'fontSize': '8px'}),
-                html.Span("Fora Prazo", style={'marginRight':'6px','color':'#e74c3c', 'fontSize': '8px'}),
-                html.Span("🟡 ", style={'color':'#f39c12','marginRight':'1px', 'fontSize': '8px'}),
-                html.Span("Não Concluído", style={'color':'#f39c12', 'fontSize': '8px'})
-            ], style={'backgroundColor':'#f8f9fa','padding':'3px 5px','borderRadius':'2px','marginBottom':'5px', 
-                      'fontSize': '8px', 'textAlign': 'center'})
-        ], style={'marginBottom':'8px', 'textAlign': 'center'})
-    else:
-        kpis_prazos = html.Div()
-        legenda_prazo = html.Div()
+class CacheLRU:
+    """Cache LRU limitado, com expiração por tempo (TTL) e seguro entre threads"""
 
-    # ---------- Matriz de Risco (APENAS ANO) ----------
-    abas_extra = []
+    def __init__(self, tamanho_maximo, ttl_s):
+        self.tamanho_maximo = tamanho_maximo
+        self.ttl_s = ttl_s
+        self._itens = OrderedDict()
+        self._trava = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
 
-    if df_risco is not None and len(df_risco) > 0:
-        print(f"\n📋 PROCESSANDO MATRIZ DE RISCO:")
-        print(f"  Total de registros: {len(df_risco)}")
-        
-        df_risco_filtrado = df_risco.copy()
-        
-        # Aplicar filtros para matriz de risco
-        if 'Ano' in df_risco_filtrado.columns:
-            df_risco_filtrado['Ano'] = pd.to_numeric(df_risco_filtrado['Ano'], errors='coerce')
-        
-        # Aplicar filtro de ano se não for 'todos'
-        if ano != 'todos' and 'Ano' in df_risco_filtrado.columns:
-            try:
-                ano_int = int(ano)
-                df_risco_filtrado = df_risco_filtrado[df_risco_filtrado['Ano'] == ano_int]
-                print(f"  ✅ Filtro ANO aplicado para matriz de risco: {ano_int}")
-            except:
-                pass
-        
-        # Aplicar filtro de unidade se não for 'todas'
-        if unidade != 'todas' and 'Unidade' in df_risco_filtrado.columns:
-            df_risco_filtrado = df_risco_filtrado[df_risco_filtrado['Unidade'] == unidade]
-            print(f"  ✅ Filtro UNIDADE aplicado para matriz de risco: '{unidade}'")
-        
-        # NÃO aplicar filtro de mês para a matriz de risco (mostrar ano completo)
+    def obter(self, chave):
+        """Retorna (encontrado, valor)"""
+        with self._trava:
+            item = self._itens.get(chave)
+            if item is None:
+                self.falhas += 1
+                return False, None
+            expira_em, valor = item
+            if self.ttl_s > 0 and expira_em < time.monotonic():
+                del self._itens[chave]
+                self.falhas += 1
+                return False, None
+            self._itens.move_to_end(chave)
+            self.acertos += 1
+            return True, valor
 
-        print(f"\n📋 Matriz após filtros (ano completo): {len(df_risco_filtrado)} registros")
-        
-        if len(df_risco_filtrado) > 0:
-            # Determinar qual ano usar para a matriz
-            if ano != 'todos':
-                ano_matriz = int(ano)
-            else:
-                # Se 'todos', usar o primeiro ano disponível
-                anos_disponiveis = sorted(df_risco_filtrado['Ano'].dropna().unique())
-                if len(anos_disponiveis) > 0:
-                    ano_matriz = int(anos_disponiveis[0])
-                else:
-                    ano_matriz = datetime.now().year
-            
-            # Criar matriz de risco anual
-            matriz_risco = criar_matriz_risco_anual(df_risco_filtrado, ano_matriz)
-            abas_extra.append(matriz_risco)
+    def guardar(self, chave, valor):
+        if self.tamanho_maximo <= 0:
+            return
+        with self._trava:
+            self._itens[chave] = (time.monotonic() + self.ttl_s, valor)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.tamanho_maximo:
+                self._itens.popitem(last=False)
+
+    def limpar(self):
+        with self._trava:
+            self._itens.clear()
+
+    def estatisticas(self):
+        with self._trava:
+            return {
+                'itens': len(self._itens),
+                'tamanho_maximo': self.tamanho_maximo,
+                'ttl_s': self.ttl_s,
+                'acertos': self.acertos,
+                'falhas': self.falhas
+            }
+
+# Conteúdo renderizado por (versão dos dados, seção, filtros da seção)
+cache_conteudo = CacheLRU(
+    tamanho_maximo=int(os.environ.get('DASHBOARD_CACHE_CALLBACK_MAX', '256')),
+    ttl_s=float(os.environ.get('DASHBOARD_CACHE_CALLBACK_TTL', '900'))
+)
+
+# DataFrames prontos para exibição das tabelas paginadas, por (versão, tabela, filtros)
+cache_tabelas = CacheLRU(
+    tamanho_maximo=int(os.environ.get('DASHBOARD_CACHE_CALLBACK_MAX', '256')),
+    ttl_s=float(os.environ.get('DASHBOARD_CACHE_CALLBACK_TTL', '900'))
+)
+
+RELOAD_INTERVALO_S = float(os.environ.get('DASHBOARD_RELOAD_INTERVALO', '30'))
+
+# ========== DADOS COMPARTILHADOS ENTRE WORKERS (OPCIONAL) ==========
+# Cada versão dos dados é gravada uma vez como arquivos .npy e os workers montam os
+# DataFrames sobre mmaps somente leitura desses arquivos, sem cópia: as páginas ficam no
+# cache do sistema uma vez só, qualquer que seja o número de workers, e contagens de
+# referência do Python não as tocam. 'atual.json' aponta para a versão vigente; é por ele
+# que os outros workers percebem que alguém já recarregou a planilha.
+# Colunas de texto livre (object) não têm forma sem cópia e vão dentro do manifesto.
+DADOS_COMPARTILHADOS = os.environ.get('DASHBOARD_DADOS_COMPARTILHADOS', '0') == '1'
+DIRETORIO_COMPARTILHADO = os.environ.get('DASHBOARD_DADOS_COMPARTILHADOS_DIR',
+                                         os.path.join(DIRETORIO_CACHE, 'compartilhado'))
+
+if DADOS_COMPARTILHADOS and fcntl is None:
+    logger.warning('⚠️ DASHBOARD_DADOS_COMPARTILHADOS exige fcntl (Linux/macOS); cada processo terá sua cópia')
+    DADOS_COMPARTILHADOS = False
+
+ABAS_SNAPSHOT = ('df_checklist', 'df_politicas', 'df_risco', 'df_melhorias')
+ARQUIVO_VERSAO_PUBLICADA = 'atual.json'
+
+# Arrays mascarados do pandas (Int16, Float64, boolean) por tipo dos valores
+CLASSES_MASCARADAS = {
+    'i': pd.arrays.IntegerArray,
+    'u': pd.arrays.IntegerArray,
+    'f': pd.arrays.FloatingArray,
+    'b': pd.arrays.BooleanArray
+}
+
+def _gravar_array(pasta, nome, valores):
+    np.save(os.path.join(pasta, f"{nome}.npy"), np.ascontiguousarray(valores), allow_pickle=False)
+    return nome
+
+def _abrir_array(pasta, nome):
+    # Visão ndarray comum sobre o mmap (sem cópia): o pandas nunca vê a subclasse np.memmap
+    return np.load(os.path.join(pasta, f"{nome}.npy"), mmap_mode='r', allow_pickle=False).view(np.ndarray)
+
+def _descrever_coluna(pasta, nome, serie):
+    """Grava a coluna em .npy e devolve o necessário para remontá-la"""
+    dtype = serie.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        return {'forma': 'categoria', 'codigos': _gravar_array(pasta, nome, serie.cat.codes.to_numpy()),
+                'categorias': dtype.categories, 'ordenada': dtype.ordered}
+    if isinstance(serie.array, tuple(CLASSES_MASCARADAS.values())):
+        mascara = serie.isna().to_numpy()
+        valores = serie.to_numpy(dtype=dtype.numpy_dtype, na_value=dtype.numpy_dtype.type(0))
+        return {'forma': 'mascarada', 'valores': _gravar_array(pasta, nome, valores),
+                'mascara': _gravar_array(pasta, f"{nome}_mascara", mascara)}
+    if isinstance(dtype, np.dtype) and dtype.kind in 'biufmM':
+        return {'forma': 'numpy', 'valores': _gravar_array(pasta, nome, serie.to_numpy())}
+    return {'forma': 'objeto', 'valores': serie.to_numpy(), 'dtype': dtype}
+
+def _montar_coluna(pasta, descricao):
+    forma = descricao['forma']
+    if forma == 'categoria':
+        return pd.Categorical.from_codes(
+            _abrir_array(pasta, descricao['codigos']),
+            dtype=pd.CategoricalDtype(descricao['categorias'], ordered=descricao['ordenada']),
+            validate=False
+        )
+    if forma == 'mascarada':
+        valores = _abrir_array(pasta, descricao['valores'])
+        return CLASSES_MASCARADAS[valores.dtype.kind](valores, _abrir_array(pasta, descricao['mascara']), copy=False)
+    if forma == 'numpy':
+        return _abrir_array(pasta, descricao['valores'])
+    return pd.array(descricao['valores'], dtype=descricao['dtype'], copy=False)
+
+def publicar_snapshot(snapshot):
+    """Grava o snapshot como .npy + manifesto e aponta atual.json para ele; retorna o nome da pasta"""
+    os.makedirs(DIRETORIO_COMPARTILHADO, exist_ok=True)
+    nome_pasta = f"v{snapshot.versao}-{snapshot.sha256[:12]}"
+    pasta_tmp = tempfile.mkdtemp(dir=DIRETORIO_COMPARTILHADO, prefix=f".{nome_pasta}-")
+    try:
+        abas = {}
+        for aba in ABAS_SNAPSHOT:
+            df = getattr(snapshot, aba)
+            abas[aba] = {
+                'indice': df.index,
+                'colunas': [(coluna, _descrever_coluna(pasta_tmp, f"{aba}_{i}", df[coluna]))
+                            for i, coluna in enumerate(df.columns)]
+            }
+
+        # Posições de cada grupo concatenadas num array só; o manifesto guarda chave e limites
+        indices = {}
+        for tabela, indice in snapshot.indices.items():
+            indices[tabela] = []
+            for i, (subconjunto, grupos) in enumerate(indice.items()):
+                posicoes = list(grupos.values())
+                limites = np.cumsum([0] + [len(p) for p in posicoes])
+                arquivo = _gravar_array(pasta_tmp, f"indice_{tabela}_{i}",
+                                        np.concatenate(posicoes) if posicoes else np.empty(0, dtype=np.intp))
+                indices[tabela].append((subconjunto, list(grupos.keys()), limites.tolist(), arquivo))
+
+        manifesto = {
+            'abas': abas,
+            'indices': indices,
+            'metadados': {campo: getattr(snapshot, campo) for campo in
+                          ('versao', 'sha256', 'mtime_ns', 'tamanho', 'carregado_em', 'duracao_s')}
+        }
+        with open(os.path.join(pasta_tmp, 'manifesto.pkl'), 'wb') as arquivo:
+            pickle.dump(manifesto, arquivo, protocol=pickle.HIGHEST_PROTOCOL)
+
+        pasta = os.path.join(DIRETORIO_COMPARTILHADO, nome_pasta)
+        if os.path.isdir(pasta):
+            shutil.rmtree(pasta)
+        os.rename(pasta_tmp, pasta)
+    except BaseException:
+        shutil.rmtree(pasta_tmp, ignore_errors=True)
+        raise
+
+    gravar_versao_publicada({
+        'versao_cache': VERSAO_CACHE,
+        'versao': snapshot.versao,
+        'pasta': nome_pasta,
+        'sha256': snapshot.sha256,
+        'mtime_ns': snapshot.mtime_ns,
+        'tamanho': snapshot.tamanho
+    })
+    _remover_versoes_antigas(manter={nome_pasta})
+    return nome_pasta
+
+def gravar_versao_publicada(publicada):
+    _escrever_arquivo_atomico(os.path.join(DIRETORIO_COMPARTILHADO, ARQUIVO_VERSAO_PUBLICADA),
+                              json.dumps(publicada).encode('utf-8'))
+
+def ler_versao_publicada():
+    """Conteúdo de atual.json, ou None se nada foi publicado por esta versão do código"""
+    try:
+        with open(os.path.join(DIRETORIO_COMPARTILHADO, ARQUIVO_VERSAO_PUBLICADA), 'r', encoding='utf-8') as arquivo:
+            publicada = json.load(arquivo)
+    except (OSError, ValueError):
+        return None
+    return publicada if publicada.get('versao_cache') == VERSAO_CACHE else None
+
+def _remover_versoes_antigas(manter):
+    """Apaga as pastas de versões anteriores à última substituída.
+
+    A imediatamente anterior fica, para um worker que esteja anexando agora;
+    mmaps já abertos de pastas apagadas continuam válidos até o worker trocar de versão.
+    """
+    pastas = sorted(
+        (nome for nome in os.listdir(DIRETORIO_COMPARTILHADO)
+         if nome.startswith('v') and os.path.isdir(os.path.join(DIRETORIO_COMPARTILHADO, nome))),
+        key=lambda nome: int(nome[1:].split('-')[0])
+    )
+    antigas = [nome for nome in pastas if nome not in manter]
+    for nome in antigas[:-1]:
+        shutil.rmtree(os.path.join(DIRETORIO_COMPARTILHADO, nome), ignore_errors=True)
+
+def anexar_versao_publicada(publicada):
+    """SnapshotDados com os DataFrames montados sobre mmaps somente leitura da versão publicada"""
+    pasta = os.path.join(DIRETORIO_COMPARTILHADO, publicada['pasta'])
+    with open(os.path.join(pasta, 'manifesto.pkl'), 'rb') as arquivo:
+        manifesto = pickle.load(arquivo)
+
+    # copy=False: um bloco por coluna, cada um apontando para o próprio mmap
+    dataframes = {
+        aba: pd.DataFrame({coluna: _montar_coluna(pasta, descricao) for coluna, descricao in dados['colunas']},
+                          index=dados['indice'], copy=False)
+        for aba, dados in manifesto['abas'].items()
+    }
+    indices = {}
+    for tabela, subconjuntos in manifesto['indices'].items():
+        indices[tabela] = {}
+        for subconjunto, chaves, limites, arquivo in subconjuntos:
+            posicoes = _abrir_array(pasta, arquivo)
+            indices[tabela][subconjunto] = {
+                chave: posicoes[inicio:fim] for chave, inicio, fim in zip(chaves, limites, limites[1:])
+            }
+
+    return SnapshotDados(
+        **dataframes,
+        **manifesto['metadados'],
+        indices=indices,
+        pasta_compartilhada=publicada['pasta']
+    )
+
+def travar_publicacao(bloquear):
+    """Trava exclusiva entre processos (arquivo aberto com flock), ou None se ocupada e bloquear=False.
+
+    Fechar o arquivo libera a trava.
+    """
+    os.makedirs(DIRETORIO_COMPARTILHADO, exist_ok=True)
+    arquivo = open(os.path.join(DIRETORIO_COMPARTILHADO, 'publicacao.lock'), 'a')
+    try:
+        fcntl.flock(arquivo, fcntl.LOCK_EX if bloquear else fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        arquivo.close()
+        return None
+    return arquivo
+
+def existe_versao_publicada_mais_nova():
+    publicada = ler_versao_publicada()
+    atual = _snapshot_atual
+    return publicada is not None and (atual is None or publicada['versao'] > atual.versao)
+
+# ========== PRÉ-CÁLCULO DAS VISÕES (OPCIONAL) ==========
+PRECOMPUTAR_VISOES = os.environ.get('DASHBOARD_PRECOMPUTAR', '0') == '1'
+# Com o preload do gunicorn o app é importado no master e threads não sobrevivem ao fork:
+# gunicorn.conf.py desliga isto e inicia o observador nos próprios hooks. O pré-cálculo
+# só roda de quem inicia o servidor: when_ready do gunicorn ou o bloco __main__
+THREADS_NA_IMPORTACAO = os.environ.get('DASHBOARD_THREADS_NA_IMPORTACAO', '1') == '1' and not PROCESSO_AUXILIAR
+PROCESSOS_PRECOMPUTAR = int(os.environ.get('DASHBOARD_PRECOMPUTAR_PROCESSOS', '0')) or nucleos_disponiveis()
+
+def listar_combinacoes_filtros(snapshot):
+    """Pares (seção, filtros) para todas as opções dos dropdowns do layout.
+
+    Só as seções com dados por filtro (CALCULADORES_SECAO); cada uma varia apenas nos
+    filtros de que depende (a matriz ignora o mês).
+    """
+    opcoes = {
+        'ano': ['todos'] + obter_anos_disponiveis(snapshot.df_checklist),
+        'mes': ['todos'] + list(range(1, 13)),
+        'unidade': ['todas'] + [str(u) for u in sorted(snapshot.df_checklist['Unidade'].dropna().unique())]
+    }
+    combinacoes = []
+    for secao in CALCULADORES_SECAO:
+        if secao == 'resumo' and MODO_CLIENTE:
+            continue  # filtrado no navegador
+        valores = [()]
+        for nome in FILTROS_SECAO[secao]:
+            valores = [anteriores + (valor,) for anteriores in valores for valor in opcoes[nome]]
+        combinacoes += [(secao, filtros) for filtros in valores]
+    return combinacoes
+
+_snapshot_worker = None
+
+def _inicializar_worker_visoes(snapshot):
+    global _snapshot_worker
+    _snapshot_worker = snapshot
+    # Os resumos de cada renderização multiplicados por centenas de combinações só poluem o log
+    logger.setLevel(max(logger.level, logging.WARNING))
+
+def _materializar_combinacao(combinacao):
+    secao, filtros = combinacao
+    chave = (secao,) + tuple(str(filtro) for filtro in filtros)
+    return chave, CALCULADORES_SECAO[secao](_snapshot_worker, *filtros)
+
+def tamanho_aproximado(objeto, vistos=None):
+    """Bytes ocupados por `objeto` e pelo que ele contém (arrays pelo nbytes), sem serializá-lo"""
+    if vistos is None:
+        vistos = set()
+    if id(objeto) in vistos:
+        return 0
+    vistos.add(id(objeto))
+    if isinstance(objeto, np.ndarray):
+        return sys.getsizeof(objeto) + (objeto.nbytes if objeto.base is None else 0)
+    tamanho = sys.getsizeof(objeto)
+    if isinstance(objeto, dict):
+        tamanho += sum(tamanho_aproximado(k, vistos) + tamanho_aproximado(v, vistos) for k, v in objeto.items())
+    elif isinstance(objeto, (list, tuple, set, frozenset)):
+        tamanho += sum(tamanho_aproximado(item, vistos) for item in objeto)
+    return tamanho
+
+def materializar_visoes(snapshot):
+    """Calcula os dados de cada seção (CALCULADORES_SECAO) para todas as combinações dos seus filtros.
+
+    Em um pool de processos por fork só quando este processo não tem outras threads
+    (o master do gunicorn em when_ready): um fork com o servidor ou o observador rodando
+    pode herdar travas presas. Chamado do observador ou das rotas administrativas,
+    pré-calcula em série na própria thread.
+
+    Retorna (visoes, relatorio) com o tempo de construção e o tamanho aproximado em memória.
+    """
+    combinacoes = listar_combinacoes_filtros(snapshot)
+    inicio = time.perf_counter()
+    processos = PROCESSOS_PRECOMPUTAR
+    if threading.active_count() > 1 or 'fork' not in multiprocessing.get_all_start_methods():
+        processos = 1
+    logger.info('🧮 Pré-calculando %s combinações de seção e filtros com %s processo(s)...', len(combinacoes), processos)
+
+    visoes = {}
+    if processos > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=processos, mp_context=multiprocessing.get_context('fork'),
+                                     initializer=_inicializar_worker_visoes, initargs=(snapshot,)) as executor:
+                for chave, conteudo in executor.map(_materializar_combinacao, combinacoes, chunksize=8):
+                    visoes[chave] = conteudo
+        except Exception as e:
+            logger.warning('⚠️ Pool de processos indisponível (%s); pré-calculando em série', e)
+            processos = 1
+            visoes = {}
+    if processos == 1:
+        nivel_original = logger.level
+        try:
+            _inicializar_worker_visoes(snapshot)
+            for combinacao in combinacoes:
+                chave, conteudo = _materializar_combinacao(combinacao)
+                visoes[chave] = conteudo
+        finally:
+            logger.setLevel(nivel_original)
+
+    duracao = time.perf_counter() - inicio
+    tamanho_bytes = tamanho_aproximado(visoes)
+    relatorio = {
+        'combinacoes': len(visoes),
+        'processos': processos,
+        'duracao_s': round(duracao, 3),
+        'memoria_mb': round(tamanho_bytes / 1024 / 1024, 2)
+    }
+    logger.info('✅ Pré-cálculo concluído: %s visões em %.2f s (~%s MB)', len(visoes), duracao, relatorio['memoria_mb'])
+    return visoes, relatorio
+
+def _com_visoes(snapshot):
+    visoes, relatorio = materializar_visoes(snapshot)
+    return replace(snapshot, visoes=visoes, relatorio_visoes=relatorio)
+
+def aplicar_visoes_materializadas():
+    """Pré-calcula as visões do snapshot vigente (when_ready do gunicorn ou __main__, após a carga inicial)"""
+    global _snapshot_atual
+    with _trava_recarga:
+        if _snapshot_atual is not None and _snapshot_atual.visoes is None:
+            _snapshot_atual = _com_visoes(_snapshot_atual)
+
+def dados_secao(snapshot, secao, *filtros):
+    """Dados de uma seção para os filtros: do pré-cálculo do snapshot, ou calculados agora"""
+    if snapshot.visoes is not None:
+        dados = snapshot.visoes.get((secao,) + tuple(str(filtro) for filtro in filtros))
+        if dados is not None:
+            return dados
+    return CALCULADORES_SECAO[secao](snapshot, *filtros)
+
+_snapshot_atual = None
+_trava_recarga = threading.Lock()
+_ultima_recarga = {'status': 'nunca executada'}
+
+def _construir_indices(df_checklist, df_risco):
+    with medir_etapa('indices', 'checklist+risco'):
+        return {
+            'checklist': construir_indice_filtros(df_checklist, COLUNAS_FILTRO_CHECKLIST),
+            'risco': construir_indice_filtros(df_risco, COLUNAS_FILTRO_RISCO)
+        }
+
+def obter_snapshot():
+    """Retorna o snapshot vigente; a referência lida continua válida mesmo após uma recarga"""
+    return _snapshot_atual
+
+def recarregar_dados(motivo='manual', materializar=None):
+    """Recarrega a planilha e troca o snapshot global de forma atômica.
+
+    Retorna o novo snapshot, o atual (se o conteúdo não mudou) ou None em caso de falha.
+    Se outra recarga já estiver em andamento, retorna None sem esperar.
+    Com os dados compartilhados, só um processo recarrega por vez e a planilha que outro
+    worker já publicou é apenas anexada.
+    """
+    global _snapshot_atual, _ultima_recarga
+
+    if materializar is None:
+        materializar = PRECOMPUTAR_VISOES
+
+    if not _trava_recarga.acquire(blocking=False):
+        logger.info('⏳ Recarga (%s) ignorada: outra recarga em andamento', motivo)
+        return None
+
+    trava_processos = None
+    if DADOS_COMPARTILHADOS:
+        # Na inicialização espera a vez (não há o que servir ainda); depois, o observador tenta de novo no próximo ciclo
+        trava_processos = travar_publicacao(bloquear=_snapshot_atual is None)
+        if trava_processos is None:
+            _trava_recarga.release()
+            logger.info('⏳ Recarga (%s) ignorada: outro worker está recarregando', motivo)
+            return None
+
+    try:
+        inicio = time.perf_counter()
+        logger.info('🔄 Recarregando planilha (%s)...', motivo)
+        stat = os.stat(PLANILHA_PATH) if os.path.exists(PLANILHA_PATH) else None
+        atual = _snapshot_atual
+        publicada = ler_versao_publicada() if DADOS_COMPARTILHADOS else None
+
+        if (publicada is not None and stat is not None
+                and publicada['mtime_ns'] == stat.st_mtime_ns and publicada['tamanho'] == stat.st_size):
+            # Esta planilha já foi publicada (por outro worker ou pelo master): só anexa
+            if atual is not None and atual.versao == publicada['versao']:
+                novo = None
+                status = 'sem alteração'
+            else:
+                with medir_etapa('anexacao', 'dados_compartilhados'):
+                    novo = anexar_versao_publicada(publicada)
+                status = 'anexada'
+            duracao = time.perf_counter() - inicio
+        else:
+            (df_checklist, df_politicas, df_risco, df_melhorias), sha256, stat = _carregar_dados_com_hash(PLANILHA_PATH)
+            duracao = time.perf_counter() - inicio
+
+            if df_checklist is None:
+                _ultima_recarga = {
+                    'status': 'erro',
+                    'motivo': motivo,
+                    'em': datetime.now().isoformat(timespec='seconds'),
+                    'duracao_s': round(duracao, 3)
+                }
+                logger.error('❌ Recarga (%s) falhou; mantendo versão %s', motivo, atual.versao if atual else '-')
+                return None
+
+            if atual is not None and atual.sha256 == sha256:
+                novo = None
+                status = 'sem alteração'
+                if publicada is not None and publicada['sha256'] == sha256:
+                    # Mesmo conteúdo com outra assinatura: os outros workers também não reprocessam
+                    gravar_versao_publicada({**publicada, 'mtime_ns': stat.st_mtime_ns, 'tamanho': stat.st_size})
+            else:
+                novo = SnapshotDados(
+                    # Com dados compartilhados a versão é única entre os workers
+                    versao=max(atual.versao if atual else 0, publicada['versao'] if publicada else 0) + 1,
+                    df_checklist=df_checklist,
+                    df_politicas=df_politicas,
+                    df_risco=df_risco,
+                    df_melhorias=df_melhorias,
+                    sha256=sha256,
+                    mtime_ns=stat.st_mtime_ns,
+                    tamanho=stat.st_size,
+                    carregado_em=datetime.now(),
+                    duracao_s=duracao,
+                    indices=_construir_indices(df_checklist, df_risco)
+                )
+                if DADOS_COMPARTILHADOS:
+                    # Daqui em diante este processo também usa os mmaps, não a cópia recém-carregada
+                    with medir_etapa('publicacao', 'dados_compartilhados'):
+                        novo = anexar_versao_publicada({'pasta': publicar_snapshot(novo)})
+                status = 'ok'
+
+        if novo is None:
+            # Só atualiza a assinatura para o observador não disparar de novo
+            _snapshot_atual = replace(atual, mtime_ns=stat.st_mtime_ns, tamanho=stat.st_size)
+            novo = _snapshot_atual
         else:
-            abas_extra.append(html.Div([
-                html.H3("📋 Matriz Auditoria Risco", style={'fontSize': '13px'}),
-                html.P("Nenhum dado encontrado para o ano selecionado.", 
-                       style={'textAlign':'center', 'color':'#7f8c8d', 'padding': '15px', 'fontSize': '10px'})
-            ], style={'marginTop':'12px', 'height': '150px', 'display': 'flex', 'flexDirection': 'column', 'justifyContent': 'center'}))
+            if materializar:
+                # Pré-calcula antes da troca: a nova versão já entra em uso aquecida
+                novo = _com_visoes(novo)
+            _snapshot_atual = novo  # atribuição de referência: troca atômica
+            # A versão faz parte da chave; limpar só libera a memória das entradas antigas
+            cache_conteudo.limpar()
+            cache_tabelas.limpar()
+
+        _ultima_recarga = {
+            'status': status,
+            'motivo': motivo,
+            'em': datetime.now().isoformat(timespec='seconds'),
+            'duracao_s': round(duracao, 3),
+            'versao': novo.versao,
+            'linhas': novo.contagens()
+        }
+        registrar_etapa('recarga', status, duracao)
+        logger.info('✅ Recarga (%s) concluída em %.2f s - versão %s (%s)', motivo, duracao, novo.versao, status)
+        return novo
+    finally:
+        if trava_processos is not None:
+            trava_processos.close()
+        _trava_recarga.release()
+
+def planilha_foi_alterada():
+    """Compara mtime/tamanho do arquivo com os do snapshot vigente"""
+    snapshot = _snapshot_atual
+    try:
+        stat = os.stat(PLANILHA_PATH)
+    except OSError:
+        return False
+    if snapshot is None:
+        return True
+    return stat.st_mtime_ns != snapshot.mtime_ns or stat.st_size != snapshot.tamanho
+
+def dados_desatualizados():
+    """A planilha mudou ou outro worker já publicou uma versão mais nova que a deste processo"""
+    return planilha_foi_alterada() or (DADOS_COMPARTILHADOS and existe_versao_publicada_mais_nova())
+
+def _loop_observador_planilha():
+    while True:
+        time.sleep(RELOAD_INTERVALO_S)
+        try:
+            if dados_desatualizados():
+                recarregar_dados('observador')
+        except Exception as e:
+            logger.exception('❌ Erro no observador da planilha: %s', e)
+
+_observador_iniciado = False
+
+def iniciar_observador_planilha():
+    """Inicia (uma vez por processo) a thread que recarrega a planilha quando ela muda"""
+    global _observador_iniciado
+    if _observador_iniciado or RELOAD_INTERVALO_S <= 0:
+        return
+    _observador_iniciado = True
+    threading.Thread(target=_loop_observador_planilha, name='observador-planilha', daemon=True).start()
+    logger.info('👀 Observando alterações na planilha a cada %g s', RELOAD_INTERVALO_S)
+
+# ========== CARREGAR DADOS ==========
+# O pré-cálculo da carga inicial fica para quem inicia o servidor (when_ready ou __main__)
+if not PROCESSO_AUXILIAR:
+    if recarregar_dados('inicialização', materializar=False) is None:
+        app = Dash(__name__)
+        server = app.server
+        app.layout = html.Div([html.H1("❌ Planilha não encontrada")])
+        if __name__ == '__main__':
+            app.run(debug=True, port=8050)
+        exit()
+
+    logger.debug('Anos disponíveis no filtro: %s', obter_anos_disponiveis(obter_snapshot().df_checklist))
+if THREADS_NA_IMPORTACAO and __name__ != '__main__':
+    # Executado como script, o observador só começa depois do pré-cálculo (ver __main__)
+    iniciar_observador_planilha()
+
+# ========== APP DASH ==========
+# As tabelas paginadas só existem depois que o conteúdo principal é renderizado
+app = Dash(__name__, suppress_callback_exceptions=True)
+
+# ========== ROTAS ADMINISTRATIVAS ==========
+# Registradas antes da autenticação para que o BasicAuth também as proteja
+USUARIOS_ADMIN = {'admin'}
+
+def _negar_se_nao_admin(acao):
+    """Resposta 403 quando o usuário autenticado não é administrador; None quando é"""
+    autorizacao = request.authorization
+    if autorizacao is None or autorizacao.username not in USUARIOS_ADMIN:
+        return jsonify({'erro': f'apenas administradores podem {acao}'}), 403
+    return None
+
+@app.server.route('/admin/dados', methods=['GET'])
+def rota_status_dados():
+    negado = _negar_se_nao_admin('consultar o estado dos dados')
+    if negado is not None:
+        return negado
+    snapshot = obter_snapshot()
+    return jsonify({
+        'snapshot': snapshot.resumo() if snapshot is not None else None,
+        'ultima_recarga': _ultima_recarga,
+        'recarga_em_andamento': _trava_recarga.locked(),
+        'cache_conteudo': cache_conteudo.estatisticas(),
+        'cache_tabelas': cache_tabelas.estatisticas(),
+        'intervalo_observador_s': RELOAD_INTERVALO_S
+    })
+
+@app.server.route('/admin/recarregar', methods=['POST'])
+def rota_recarregar_dados():
+    negado = _negar_se_nao_admin('recarregar os dados')
+    if negado is not None:
+        return negado
+    if _trava_recarga.locked():
+        return jsonify({'status': 'recarga já em andamento'}), 409
+
+    # Roda fora da requisição; o resultado aparece em /admin/dados
+    threading.Thread(target=recarregar_dados, args=('endpoint',), daemon=True).start()
+    return jsonify({'status': 'recarga iniciada', 'versao_atual': obter_snapshot().versao}), 202
+
+# ========== ROTA DE MÉTRICAS ==========
+@app.server.route('/metrics', methods=['GET'])
+def rota_metricas():
+    snapshot = obter_snapshot()
+    if snapshot is not None:
+        metricas.definir('dashboard_dados_versao', snapshot.versao)
+        for aba, linhas in snapshot.contagens().items():
+            metricas.definir('dashboard_dados_linhas', linhas, aba=aba)
+    for nome_cache, cache in (('conteudo', cache_conteudo), ('tabelas', cache_tabelas)):
+        estatisticas = cache.estatisticas()
+        metricas.definir('dashboard_cache_itens', estatisticas['itens'], cache=nome_cache)
+        metricas.definir('dashboard_cache_consultas_total', estatisticas['acertos'], cache=nome_cache, resultado='acerto')
+        metricas.definir('dashboard_cache_consultas_total', estatisticas['falhas'], cache=nome_cache, resultado='falha')
+    return app.server.response_class(metricas.exportar(), mimetype='text/plain; version=0.0.4')
+
+@app.server.before_request
+def _iniciar_medicao_requisicao():
+    request.environ['dashboard.inicio'] = time.perf_counter()
+
+@app.server.after_request
+def _registrar_requisicao(resposta):
+    # Nas atualizações do Dash a rota é sempre a mesma: o rótulo 'saida' diz qual callback respondeu
+    rota = request.url_rule.rule if request.url_rule is not None else 'desconhecida'
+    saida = '-'
+    if request.path.endswith('/_dash-update-component'):
+        corpo = request.get_json(silent=True) or {}
+        saida = corpo.get('output', '-')
+
+    metricas.incrementar('dashboard_requisicoes_total', rota=rota, metodo=request.method, status=resposta.status_code)
+    inicio = request.environ.get('dashboard.inicio')
+    if inicio is not None:
+        metricas.observar('dashboard_requisicao_duracao_segundos', time.perf_counter() - inicio, rota=rota, saida=saida)
+
+    tamanho = resposta.content_length
+    if tamanho is None and not resposta.is_streamed:
+        tamanho = len(resposta.get_data())
+    if tamanho is not None:
+        metricas.observar('dashboard_resposta_bytes', tamanho, rota=rota, saida=saida)
+    return resposta
+
+# ========== COMPRESSÃO E CACHE HTTP ==========
+# As atualizações do Dash são JSON muito repetitivo (estilos inline, registros das tabelas):
+# comprimidas aqui mesmo, sem depender de um proxy na frente do gunicorn
+COMPRESSAO_ATIVA = os.environ.get('DASHBOARD_COMPRESSAO', '1') == '1'
+COMPRESSAO_MINIMO_BYTES = int(os.environ.get('DASHBOARD_COMPRESSAO_MINIMO', '1024'))
+NIVEL_GZIP = int(os.environ.get('DASHBOARD_COMPRESSAO_NIVEL', '6'))
+QUALIDADE_BROTLI = int(os.environ.get('DASHBOARD_BROTLI_QUALIDADE', '5'))
+# Os assets vêm com ?m=<mtime> na URL, então um arquivo alterado nunca reaproveita o cache antigo
+CACHE_ASSETS_S = int(os.environ.get('DASHBOARD_CACHE_ASSETS_S', '86400'))
+
+TIPOS_COMPRIMIVEIS = ('text/', 'application/json', 'application/javascript', 'image/svg+xml')
+PREFIXO_ASSETS = app.config.routes_pathname_prefix + app.config.assets_url_path.strip('/') + '/'
+# Página inicial, layout e dependências: revalidados a cada acesso (ETag), pois mudam com os dados
+ROTAS_REVALIDADAS = {app.config.routes_pathname_prefix + rota for rota in ('', '_dash-layout', '_dash-dependencies')}
+
+def _aplicar_cache_http(resposta):
+    if request.path.startswith(PREFIXO_ASSETS):
+        resposta.cache_control.no_cache = None
+        resposta.cache_control.public = True
+        resposta.cache_control.max_age = CACHE_ASSETS_S
+    elif request.path in ROTAS_REVALIDADAS and resposta.status_code == 200:
+        resposta.cache_control.private = True
+        resposta.cache_control.no_cache = True
+        resposta.add_etag()
+        resposta.make_conditional(request)
+
+def _comprimir_corpo(dados):
+    """(codificação, corpo comprimido) conforme o Accept-Encoding; brotli tem preferência se instalado"""
+    if BROTLI_DISPONIVEL and request.accept_encodings['br']:
+        return 'br', brotli.compress(dados, quality=QUALIDADE_BROTLI)
+    if request.accept_encodings['gzip']:
+        return 'gzip', gzip.compress(dados, compresslevel=NIVEL_GZIP, mtime=0)
+    return None, None
+
+# Registrado depois da medição de requisições: o Flask roda os after_request na ordem
+# inversa, então dashboard_resposta_bytes já vê o tamanho comprimido
+@app.server.after_request
+def _comprimir_resposta(resposta):
+    if request.method in ('GET', 'HEAD'):
+        _aplicar_cache_http(resposta)
+
+    if (not COMPRESSAO_ATIVA or request.method == 'HEAD' or resposta.status_code != 200
+            or 'Content-Encoding' in resposta.headers
+            or not (resposta.mimetype or '').startswith(TIPOS_COMPRIMIVEIS)):
+        return resposta
+    if resposta.direct_passthrough:
+        # Assets (send_file) chegam como arquivo aberto; lê o corpo para poder comprimir
+        resposta.direct_passthrough = False
+    elif resposta.is_streamed:
+        return resposta
+
+    resposta.vary.add('Accept-Encoding')
+    dados = resposta.get_data()
+    if len(dados) < COMPRESSAO_MINIMO_BYTES:
+        return resposta
+
+    rota = request.url_rule.rule if request.url_rule is not None else 'desconhecida'
+    inicio = time.perf_counter()
+    codificacao, corpo = _comprimir_corpo(dados)
+    if codificacao is None or len(corpo) >= len(dados):
+        return resposta
+    registrar_etapa('compressao', codificacao, time.perf_counter() - inicio)
+
+    resposta.set_data(corpo)
+    resposta.headers['Content-Encoding'] = codificacao
+    # Outra representação do mesmo recurso: ETag fraca, como o nginx faz ao comprimir
+    etag, fraca = resposta.get_etag()
+    if etag and not fraca:
+        resposta.set_etag(etag, weak=True)
+
+    metricas.incrementar('dashboard_respostas_comprimidas_total', codificacao=codificacao, rota=rota)
+    metricas.incrementar('dashboard_compressao_bytes_economizados_total', len(dados) - len(corpo),
+                         codificacao=codificacao, rota=rota)
+    return resposta
+
+# ========== APLICAR AUTENTICAÇÃO ==========
+auth = dash_auth.BasicAuth(app, USUARIOS_VALIDOS)
+
+# Verificação de credenciais medida como etapa própria
+_verificar_credenciais = auth.is_authorized
+
+def _verificar_credenciais_medido():
+    with medir_etapa('autenticacao', 'basic_auth'):
+        return _verificar_credenciais()
+
+auth.is_authorized = _verificar_credenciais_medido
+
+# ========== LAYOUT DO DASHBOARD ==========
+def construir_layout():
+    """Monta o layout a cada carregamento de página, refletindo o snapshot vigente"""
+    snapshot = obter_snapshot()
+    df_checklist = snapshot.df_checklist
+    anos_disponiveis = obter_anos_disponiveis(df_checklist)
+
+    return html.Div([
+        html.Div([
+            html.H1("📊 DASHBOARD DE AUDITORIA", 
+                    style={
+                        'textAlign':'center', 
+                        'marginBottom':'8px',
+                        'fontSize': '16px',
+                        'color': '#2c3e50'
+                    })
+        ]),
+        html.Div([
+            html.Div([
+                html.Label("Ano:", style={'fontSize': '10px', 'fontWeight': 'bold', 'marginBottom': '1px'}),
+                dcc.Dropdown(
+                    id='filtro-ano',
+                    options=[{'label':'Todos','value':'todos'}]+
+                           [{'label':str(a),'value':a} for a in anos_disponiveis],
+                    value='todos',
+                    style={'fontSize': '10px', 'minHeight': '28px', 'padding': '2px'}
+                )
+            ], style={'marginRight':'8px','width':'140px'}),
+            html.Div([
+                html.Label("Mês:", style={'fontSize': '10px', 'fontWeight': 'bold', 'marginBottom': '1px'}),
+                dcc.Dropdown(
+                    id='filtro-mes',
+                    options=[{'label':'Todos','value':'todos'}]+
+                           [{'label':f'{m}','value':m} for m in range(1, 13)],
+                    value='todos',
+                    style={'fontSize': '10px', 'minHeight': '28px', 'padding': '2px'}
+                )
+            ], style={'marginRight':'8px','width':'110px'}),
+            html.Div([
+                html.Label("Unidade:", style={'fontSize': '10px', 'fontWeight': 'bold', 'marginBottom': '1px'}),
+                dcc.Dropdown(
+                    id='filtro-unidade',
+                    options=[{'label':'Todas','value':'todas'}]+
+                            [{'label':str(u),'value':str(u)} for u in sorted(df_checklist['Unidade'].dropna().unique())],
+                    value='todas',
+                    style={'fontSize': '10px', 'minHeight': '28px', 'padding': '2px'}
+                )
+            ], style={'width':'150px'})
+        ], style={'display':'flex','justifyContent':'center','marginBottom':'10px','flexWrap':'wrap', 'padding': '3px', 'gap': '5px'}),
+        html.Div(
+            html.Div([
+                # No modo cliente o resumo chega como esqueleto e é preenchido no navegador
+                html.Div(renderizar_resumo_cliente(snapshot) if MODO_CLIENTE else None,
+                         id='secao-resumo', style=ESTILO_SECAO),
+                html.Div(id='secao-matriz'),
+                # Melhorias e Políticas ignoram os filtros: vão prontas no layout
+                html.Div(servir_secao('melhorias'), id='secao-melhorias'),
+                html.Div(servir_secao('politicas'), id='secao-politicas')
+            ], style={'fontSize': '10px', **ESTILO_SECAO}),
+            id='conteudo-principal',
+            style={'padding':'8px', 'maxWidth': '1400px', 'margin': '0 auto', 'overflowY': 'auto'}
+        ),
+        *([dcc.Store(id='dados-cliente', data=obter_dados_cliente(snapshot))] if MODO_CLIENTE else [])
+    ])
+
+app.layout = construir_layout
+
+# ========== TABELAS PAGINADAS NO SERVIDOR ==========
+TAMANHO_PAGINA = 10
+
+# Operadores do filter_query do DataTable (palavra e símbolo) -> nome canônico
+OPERADORES_FILTRO_TABELA = {
+    'ge': 'ge', '>=': 'ge', 'le': 'le', '<=': 'le', 'lt': 'lt', '<': 'lt',
+    'gt': 'gt', '>': 'gt', 'ne': 'ne', '!=': 'ne', 'eq': 'eq', '=': 'eq',
+    'contains': 'contains', 'datestartswith': 'datestartswith'
+}
+
+COMPARADORES_FILTRO = {
+    'ge': operator.ge, 'le': operator.le, 'lt': operator.lt,
+    'gt': operator.gt, 'ne': operator.ne, 'eq': operator.eq
+}
+
+# Prefixos de caixa dos operadores do DataTable ('icontains', 's=', 'ieq'...)
+PREFIXOS_CAIXA_FILTRO = {'i': False, 's': True}
+
+def dividir_consulta_filtro(consulta):
+    """Separa o filter_query nos '&&' que ficam fora de aspas e de {coluna}"""
+    partes = []
+    atual = []
+    delimitador = None
+    i = 0
+    while i < len(consulta):
+        caractere = consulta[i]
+        if delimitador is not None:
+            atual.append(caractere)
+            if caractere == '\\' and delimitador != '}' and i + 1 < len(consulta):
+                atual.append(consulta[i + 1])
+                i += 1
+            elif caractere == delimitador:
+                delimitador = None
+        elif consulta.startswith('&&', i):
+            partes.append(''.join(atual).strip())
+            atual = []
+            i += 1
+        else:
+            atual.append(caractere)
+            if caractere in ('"', "'", '`'):
+                delimitador = caractere
+            elif caractere == '{':
+                delimitador = '}'
+        i += 1
+    partes.append(''.join(atual).strip())
+    return partes
+
+def dividir_parte_filtro(parte):
+    """Quebra um trecho do filter_query em (coluna, operador, valor em texto, diferencia caixa).
+
+    O operador é a primeira palavra depois do '}' que fecha o nome da coluna; o resto
+    é o valor (que pode conter 'le', 'eq'... sem confundir a busca). Com prefixo 'i'/'s'
+    o último campo é False/True; sem prefixo, None (padrão de cada operador). Trechos
+    que não seguem esse formato devolvem (None, None, None, None).
+    """
+    inicio = parte.find('{')
+    fim = parte.find('}', inicio + 1)
+    if inicio < 0 or fim < 0:
+        return None, None, None, None
+    nome = parte[inicio + 1:fim]
+    palavra, _, valor = parte[fim + 1:].strip().partition(' ')
+    operador = OPERADORES_FILTRO_TABELA.get(palavra)
+    diferencia_caixa = None
+    if operador is None and palavra[:1] in PREFIXOS_CAIXA_FILTRO:
+        operador = OPERADORES_FILTRO_TABELA.get(palavra[1:])
+        diferencia_caixa = PREFIXOS_CAIXA_FILTRO[palavra[0]]
+    if operador is None:
+        return None, None, None, None
+    valor = valor.strip()
+    if len(valor) >= 2 and valor[0] == valor[-1] and valor[0] in ('"', "'", '`'):
+        valor = valor[1:-1].replace('\\' + valor[0], valor[0])
+    return nome, operador, valor, diferencia_caixa
+
+def _chave_ordenacao(serie):
+    if pd.api.types.is_numeric_dtype(serie):
+        return serie
+    return serie.astype(object).where(serie.notna(), '').astype(str)
+
+def consultar_pagina(df, pagina, tamanho_pagina, ordenacao=None, consulta=None):
+    """Filtra, ordena e fatia `df` no servidor; retorna (registros da página, total de páginas)"""
+    if consulta:
+        for parte in dividir_consulta_filtro(consulta):
+            coluna, operador, valor, diferencia_caixa = dividir_parte_filtro(parte)
+            if coluna not in df.columns:
+                # Filtro que não entendemos não pode virar "sem filtro": nenhuma linha atende
+                logger.warning('⚠️ Trecho de filtro não reconhecido: %r (consulta %r)', parte, consulta)
+                df = df.iloc[:0]
+                break
+            serie = df[coluna]
+            if operador == 'contains':
+                mascara = serie.astype(str).str.contains(valor, case=bool(diferencia_caixa), regex=False, na=False)
+            elif operador == 'datestartswith':
+                mascara = serie.astype(str).str.startswith(valor)
+            else:
+                try:
+                    if not pd.api.types.is_numeric_dtype(serie):
+                        raise ValueError
+                    mascara = COMPARADORES_FILTRO[operador](serie, float(valor)).fillna(False).astype(bool)
+                except ValueError:
+                    texto = serie.astype(str)
+                    if diferencia_caixa is False:
+                        texto, valor = texto.str.lower(), valor.lower()
+                    mascara = COMPARADORES_FILTRO[operador](texto, valor)
+            df = df[mascara]
+
+    if ordenacao:
+        df = df.sort_values(
+            [col['column_id'] for col in ordenacao],
+            ascending=[col['direction'] == 'asc' for col in ordenacao],
+            kind='stable',
+            key=_chave_ordenacao
+        )
+
+    total_paginas = max(1, math.ceil(len(df) / tamanho_pagina))
+    inicio = (pagina or 0) * tamanho_pagina
+    return df.iloc[inicio:inicio + tamanho_pagina].to_dict('records'), total_paginas
+
+def obter_tabela(snapshot, nome, ano='todos', mes='todos', unidade='todas'):
+    """DataFrame de exibição de uma tabela ('nao-conformes', 'melhorias' ou 'politicas').
+
+    Montado uma vez por versão dos dados (e por filtros, no caso dos não conformes)
+    e reaproveitado por todas as trocas de página, ordenação e filtro.
+    """
+    if nome == 'nao-conformes':
+        chave = (snapshot.versao, nome, str(ano), str(mes), str(unidade))
     else:
-        abas_extra.append(html.Div([
-            html.H3("📋 Matriz Auditoria Risco", style={'fontSize': '13px'}),
-            html.P("Não há dados de risco disponíveis.", 
-                   style={'textAlign':'center', 'color':'#7f8c8d', 'padding': '15px', 'fontSize': '10px'})
-        ], style={'marginTop':'12px', 'height': '150px', 'display': 'flex', 'flexDirection': 'column', 'justifyContent': 'center'}))
+        chave = (snapshot.versao, nome)
 
-    # ---------- Melhorias (8 registros) - MOSTRAR TODOS COMPACTOS ----------
-    if df_melhorias is not None and len(df_melhorias) > 0:
-        print(f"\n📈 PROCESSANDO MELHORIAS: {len(df_melhorias)} registros")
-        
-        # Formatar datas
-        colunas_data_melhorias = [
-            col for col in df_melhorias.columns 
-            if any(termo in col.lower() for termo in ['data', 'prazo', 'vencimento', 'limite', 'criacao', 'conclusao'])
+    encontrado, tabela = cache_tabelas.obter(chave)
+    if encontrado:
+        return tabela
+
+    inicio = time.perf_counter()
+    if nome == 'nao-conformes':
+        posicoes = dados_secao(snapshot, 'resumo', ano, mes, unidade)['nao_conformes']
+        tabela = preparar_tabela_nao_conformes(snapshot.df_checklist.iloc[posicoes])
+    elif nome == 'melhorias':
+        tabela = preparar_tabela_melhorias(snapshot.df_melhorias)
+    else:
+        tabela = preparar_tabela_politicas(snapshot.df_politicas)
+    registrar_etapa('preparo_tabela', nome, time.perf_counter() - inicio)
+    cache_tabelas.guardar(chave, tabela)
+    return tabela
+
+def criar_tabela_paginada(tabela_id, df_display, tamanho_pagina, **estilos):
+    """DataTable com paginação, ordenação e filtro feitos no servidor (só a página visível vai ao navegador)"""
+    registros, total_paginas = consultar_pagina(df_display, 0, tamanho_pagina)
+    return dash_table.DataTable(
+        id=tabela_id,
+        columns=[{"name": col, "id": col} for col in df_display.columns],
+        data=registros,
+        page_current=0,
+        page_size=tamanho_pagina,
+        page_count=total_paginas,
+        page_action='custom',
+        sort_action='custom',
+        sort_mode='single',
+        sort_by=[],
+        filter_action='custom',
+        filter_query='',
+        **estilos
+    )
+
+# Coluna flexível usada pelo conteúdo principal e por cada seção dentro dele
+ESTILO_SECAO = {
+    'display': 'flex',
+    'flexDirection': 'column',
+    'gap': '10px'  # Espaço reduzido entre todas as seções
+}
+
+# ========== PEÇAS DA SEÇÃO DE RESUMO ==========
+# Compartilhadas entre a renderização no servidor e o esqueleto do modo cliente
+def _cartao_kpi(titulo, valor, percentual, cor, fundo, compacto=False, id_base=None):
+    """Cartão de KPI; com `id_base`, o valor e o percentual ganham ids para o modo cliente"""
+    fonte_titulo, fonte_valor, fonte_pct, borda, largura_min, largura_max, altura = (
+        ('9px', '16px', '8px', '2px', '80px', '90px', '60px') if compacto
+        else ('11px', '20px', '9px', '3px', '100px', '110px', '70px')
+    )
+    id_valor = {'id': f'{id_base}-valor'} if id_base else {}
+    id_pct = {'id': f'{id_base}-pct'} if id_base else {}
+    return html.Div([
+        html.H4(titulo, style={'color':cor,'margin':'0', 'fontSize': fonte_titulo}),
+        html.H2(valor, style={'color':cor,'margin':'0', 'fontSize': fonte_valor}, **id_valor),
+        html.P(percentual, style={'margin':'0','color':cor, 'fontSize': fonte_pct}, **id_pct)
+    ], style={'borderLeft':f'{borda} solid {cor}','borderRadius':'2px','padding':'6px','margin':'2px','flex':'1',
+              'backgroundColor':fundo,'textAlign':'center','boxShadow':'0 1px 2px rgba(0,0,0,0.05)',
+              'minWidth': largura_min, 'maxWidth': largura_max, 'height': altura})
+
+def _linha_kpis(cartoes, margem_inferior):
+    return html.Div(cartoes, style={'display':'flex','justifyContent':'center','flexWrap':'wrap',
+                                    'marginBottom':margem_inferior, 'gap': '2px'})
+
+# (título, chave em calcular_kpis, cor, fundo) de cada cartão
+CARTOES_KPI = [
+    ("Conforme", 'conforme', '#27ae60', '#eafaf1'),
+    ("Conforme Parcial", 'parcial', '#f39c12', '#fff8e1'),
+    ("Não Conforme", 'nao', '#e74c3c', '#fdecea')
+]
+CARTOES_PRAZO = [
+    ("Dentro Prazo", 'dentro_prazo', '#27ae60', '#d4edda'),
+    ("Fora Prazo", 'fora_prazo', '#e74c3c', '#f8d7da'),
+    ("Não Concluído", 'nao_concluido', '#f39c12', '#fff3cd')
+]
+
+ESTILO_TITULO_RESUMO = {'textAlign': 'center', 'color': '#2c3e50', 'marginBottom': '8px', 'fontSize': '14px'}
+ESTILO_TITULO_NAO_CONFORMES = {'marginTop': '12px', 'marginBottom': '6px', 'color': '#c0392b', 'fontSize': '13px'}
+
+def _legenda_prazo():
+    # Legenda para KPIs de prazo SUPER COMPACTA
+    return html.Div([
+        html.P("📊 Status dos Prazos:", 
+               style={'fontWeight':'bold','marginBottom':'1px', 'fontSize': '9px', 'textAlign': 'center'}),
+        html.Div([
+            html.Span("🟢 ", style={'color':'#27ae60','marginRight':'1px', 'fontSize': '8px'}),
+            html.Span("Dentro Prazo", style={'marginRight':'6px','color':'#27ae60', 'fontSize': '8px'}),
+            html.Span("🔴 ", style={'color':'#e74c3c','marginRight':'1px', 'fontSize': '8px'}),
+            html.Span("Fora Prazo", style={'marginRight':'6px','color':'#e74c3c', 'fontSize': '8px'}),
+            html.Span("🟡 ", style={'color':'#f39c12','marginRight':'1px', 'fontSize': '8px'}),
+            html.Span("Não Concluído", style={'color':'#f39c12', 'fontSize': '8px'})
+        ], style={'backgroundColor':'#f8f9fa','padding':'3px 5px','borderRadius':'2px','marginBottom':'5px', 
+                  'fontSize': '8px', 'textAlign': 'center'})
+    ], style={'marginBottom':'8px', 'textAlign': 'center'})
+
+def _mensagem_sem_nao_conformes():
+    return html.Div([
+        html.P("✅ Nenhum item não conforme encontrado com os filtros atuais.", 
+               style={'textAlign': 'center', 'padding': '10px', 'color': '#27ae60', 'fontSize': '11px'})
+    ], style={'height': '100px', 'display': 'flex', 'alignItems': 'center', 'justifyContent': 'center'})
+
+def _estilos_tabela_nao_conformes(com_prazo):
+    """Estilos da tabela de não conformes (MAIOR), com cores por status do prazo quando houver"""
+    # Cores alternadas das linhas
+    estilo_condicional = [
+        {'if': {'row_index': 'odd'}, 'backgroundColor': '#f9e6e6'},
+        {'if': {'row_index': 'even'}, 'backgroundColor': '#fdecea'}
+    ]
+    if com_prazo:
+        # Cores condicionais por status do prazo
+        estilo_condicional += [
+            {
+                'if': {
+                    'filter_query': '{Status do Prazo} = "Concluído no Prazo"',
+                },
+                'backgroundColor': '#d4edda',
+                'color': '#155724',
+                'fontWeight': 'bold'
+            },
+            {
+                'if': {
+                    'filter_query': '{Status do Prazo} = "Concluído Fora do Prazo"',
+                },
+                'backgroundColor': '#f8d7da',
+                'color': '#721c24',
+                'fontWeight': 'bold'
+            },
+            {
+                'if': {
+                    'filter_query': '{Status do Prazo} = "Não Concluído"',
+                },
+                'backgroundColor': '#fff3cd',
+                'color': '#856404',
+                'fontWeight': 'bold'
+            }
         ]
+    return {
+        'style_table': {'overflowX':'auto', 'fontSize': '10px', 'marginTop': '5px', 'height': '300px'},  # AUMENTADA altura
+        'style_header': {
+            'backgroundColor': '#c0392b',
+            'color': 'white',
+            'fontWeight': 'bold',
+            'textAlign':'center',
+            'fontSize': '10px',
+            'padding': '4px 5px',
+            'minHeight': '30px',
+            'height': '30px',
+            'position': 'sticky',
+            'top': '0'
+        },
+        'style_cell': {
+            'textAlign': 'center',
+            'padding': '3px 4px',
+            'whiteSpace':'normal',
+            'height':'auto',
+            'fontSize': '9px',
+            'minWidth': '50px',  # Aumentado
+            'maxWidth': '150px', # Aumentado
+            'overflow': 'hidden',
+            'textOverflow': 'ellipsis'
+        },
+        'style_data_conditional': estilo_condicional
+    }
+
+# ========== MODO CLIENTE (OPCIONAL) ==========
+# Envia o checklist normalizado uma vez por sessão e filtra o resumo no navegador
+# (assets/filtros_cliente.js). A matriz de risco continua no servidor.
+MODO_CLIENTE = os.environ.get('DASHBOARD_MODO_CLIENTE', '0') == '1'
+
+def _coluna_compacta(serie):
+    """Coluna para o dcc.Store: lista simples ou, se houver muita repetição, categorias + códigos"""
+    if pd.api.types.is_numeric_dtype(serie) and not isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.astype(object).where(serie.notna(), None).tolist()
+    codigos, categorias = pd.factorize(serie)
+    if len(categorias) * 2 > len(serie):
+        return serie.astype(object).where(serie.notna(), None).tolist()
+    return {'categorias': list(categorias), 'codigos': codigos.tolist()}
+
+def montar_dados_cliente(snapshot):
+    """Dados do dcc.Store, orientados a colunas.
+
+    'checklist' traz só as colunas usadas nos filtros e KPIs; 'nao_conformes' traz a
+    tabela de exibição completa e, em 'linhas', a posição de cada linha no checklist.
+    """
+    checklist = snapshot.df_checklist
+    tabela = obter_tabela(snapshot, 'nao-conformes')
+    df_nao_conforme = tabela['df']
+    return {
+        'versao': snapshot.versao,
+        'checklist': {
+            col: _coluna_compacta(checklist[col])
+            for col in ('Ano', 'Mes', 'Unidade', 'Status') if col in checklist.columns
+        },
+        'nao_conformes': {
+            'linhas': checklist.index.get_indexer(df_nao_conforme.index).tolist(),
+            'colunas': df_nao_conforme.columns.tolist(),
+            'dados': {col: _coluna_compacta(df_nao_conforme[col]) for col in df_nao_conforme.columns},
+            'com_prazo': bool(tabela['coluna_prazo'] and tabela['coluna_finalizacao'])
+        }
+    }
+
+def obter_dados_cliente(snapshot):
+    chave = (snapshot.versao, 'dados-cliente')
+    encontrado, dados = cache_conteudo.obter(chave)
+    if not encontrado:
+        dados = montar_dados_cliente(snapshot)
+        cache_conteudo.guardar(chave, dados)
+    return dados
+
+def _id_cartao(chave):
+    return 'kpi-' + chave.replace('_', '-')
+
+# Saídas do callback do navegador, na ordem do array devolvido por filtrar_resumo
+SAIDAS_RESUMO_CLIENTE = (
+    [('resumo-titulo', 'children')]
+    + [(f'{_id_cartao(chave)}-{parte}', 'children') for _, chave, _, _ in CARTOES_KPI for parte in ('valor', 'pct')]
+    + [('nao-conformes-titulo', 'children'), ('bloco-prazos', 'style')]
+    + [(f'{_id_cartao(chave)}-{parte}', 'children') for _, chave, _, _ in CARTOES_PRAZO for parte in ('valor', 'pct')]
+    + [('bloco-tabela-nao-conformes', 'style'), ('tabela-nao-conformes-cliente', 'data'),
+       ('bloco-sem-nao-conformes', 'style')]
+)
+
+def renderizar_resumo_cliente(snapshot):
+    """Esqueleto da seção de resumo: textos, blocos visíveis e dados da tabela vêm do navegador"""
+    tabela = obter_tabela(snapshot, 'nao-conformes')
+    com_prazo = bool(tabela['coluna_prazo'] and tabela['coluna_finalizacao'])
+    return [
+        html.Div([
+            html.H4(id='resumo-titulo', style=ESTILO_TITULO_RESUMO)
+        ]),
+        _linha_kpis([
+            _cartao_kpi(titulo, '', '', cor, fundo, id_base=_id_cartao(chave))
+            for titulo, chave, cor, fundo in CARTOES_KPI
+        ], '10px'),
+        html.H3(id='nao-conformes-titulo', style=ESTILO_TITULO_NAO_CONFORMES),
+        html.Div([
+            _linha_kpis([
+                _cartao_kpi(titulo, '', '', cor, fundo, compacto=True, id_base=_id_cartao(chave))
+                for titulo, chave, cor, fundo in CARTOES_PRAZO
+            ], '8px'),
+            _legenda_prazo()
+        ], id='bloco-prazos', style={'display': 'none'}),
+        # Todos os não conformes já estão no navegador: paginação, ordenação e filtro nativos
+        html.Div(dash_table.DataTable(
+            id='tabela-nao-conformes-cliente',
+            columns=[{"name": col, "id": col} for col in tabela['df'].columns],
+            data=[],
+            page_size=TAMANHO_PAGINA,
+            page_action='native',
+            sort_action='native',
+            filter_action='native',
+            **_estilos_tabela_nao_conformes(com_prazo)
+        ), id='bloco-tabela-nao-conformes', style={'display': 'none'}),
+        html.Div(_mensagem_sem_nao_conformes(), id='bloco-sem-nao-conformes', style={'display': 'none'})
+    ]
+
+# ========== CALLBACKS ==========
+def servir_secao(secao, *filtros):
+    """Conteúdo de uma seção para os filtros de que ela depende.
+
+    Procura no cache e só então renderiza, a partir dos dados pré-calculados do snapshot
+    quando existem (dados_secao).
+    """
+    # Um único snapshot por requisição: uma recarga no meio não mistura versões
+    snapshot = obter_snapshot()
+    chave = (secao,) + tuple(str(filtro) for filtro in filtros)
+
+    encontrado, conteudo = cache_conteudo.obter((snapshot.versao,) + chave)
+    if encontrado:
+        logger.debug("⚡ Seção '%s' servida do cache: %s", secao, filtros)
+        metricas.incrementar('dashboard_secao_servida_total', secao=secao, origem='cache')
+        return conteudo
+
+    inicio = time.perf_counter()
+    conteudo = RENDERIZADORES_SECAO[secao](snapshot, *filtros)
+    cache_conteudo.guardar((snapshot.versao,) + chave, conteudo)
+    duracao = time.perf_counter() - inicio
+    registrar_etapa('secao', secao, duracao)
+    pre_calculada = snapshot.visoes is not None and chave in snapshot.visoes
+    metricas.incrementar('dashboard_secao_servida_total', secao=secao,
+                         origem='pre_calculo' if pre_calculada else 'renderizacao')
+    logger.info("Seção '%s' %s renderizada em %.1f ms (versão %s)",
+                secao, filtros, duracao * 1000, snapshot.versao)
+    return conteudo
+
+if MODO_CLIENTE:
+    # O servidor só entrega o layout (com o dcc.Store); os filtros do resumo rodam no navegador
+    app.clientside_callback(
+        ClientsideFunction(namespace='auditoria', function_name='filtrar_resumo'),
+        [Output(id_componente, propriedade) for id_componente, propriedade in SAIDAS_RESUMO_CLIENTE],
+        [Input('filtro-ano','value'),
+         Input('filtro-mes','value'),
+         Input('filtro-unidade','value')],
+        [State('dados-cliente','data')]
+    )
+else:
+    @app.callback(
+        Output('secao-resumo','children'),
+        [Input('filtro-ano','value'),
+         Input('filtro-mes','value'),
+         Input('filtro-unidade','value')]
+    )
+    def atualizar_secao_resumo(ano, mes, unidade):
+        return servir_secao('resumo', ano, mes, unidade)
+
+# A matriz mostra o ano completo: trocar o mês não a reconstrói
+@app.callback(
+    Output('secao-matriz','children'),
+    [Input('filtro-ano','value'),
+     Input('filtro-unidade','value')]
+)
+def atualizar_secao_matriz(ano, unidade):
+    return servir_secao('matriz', ano, unidade)
+
+def posicoes_checklist(snapshot, ano, mes, unidade):
+    """Posições das linhas do checklist para ano, mês e unidade (None = todas), via índice"""
+    df_checklist = snapshot.df_checklist
+    
+    logger.debug("🔍 Filtros: Ano='%s', Mês='%s', Unidade='%s'", ano, mes, unidade)
+    
+    filtros = {}
+    if ano != 'todos':
+        try:
+            filtros['Ano'] = int(ano)
+        except Exception as e:
+            logger.warning("  ❌ Erro ao filtrar por ano '%s': %s", ano, e)
+    
+    if mes != 'todos':
+        try:
+            filtros['Mes'] = int(mes)
+        except Exception as e:
+            logger.warning("  ❌ Erro ao filtrar por mês '%s': %s", mes, e)
+    
+    if unidade != 'todas':
+        filtros['Unidade'] = unidade.strip()
+    
+    # Dados já normalizados na carga: o filtro é só uma consulta ao índice
+    filtros = {col: valor for col, valor in filtros.items() if col in df_checklist.columns}
+    with medir_etapa('filtro', 'checklist'):
+        posicoes = posicoes_por_indice(snapshot.indices['checklist'], filtros)
+    logger.debug('  ✅ Filtros aplicados: %s | Registros: %s/%s', filtros,
+                 len(df_checklist) if posicoes is None else len(posicoes), len(df_checklist))
+    return posicoes
+
+def preparar_tabela_nao_conformes(df_nao_conforme):
+    """Monta o DataFrame de exibição da tabela de não conformes"""
+    # Fazer uma cópia para não modificar o original
+    df_nao_conforme_display = df_nao_conforme.copy()
+    
+    # Procurar colunas de prazo e data de finalização
+    colunas_disponiveis = df_nao_conforme_display.columns.tolist()
+    coluna_prazo, coluna_finalizacao = encontrar_colunas_prazo(colunas_disponiveis)
+    
+    # Se encontrou ambas as colunas, usar o status do prazo
+    if coluna_prazo and coluna_finalizacao:
+        logger.debug("✅ Encontradas colunas de prazo: '%s' e finalização: '%s'", coluna_prazo, coluna_finalizacao)
         
-        df_melhorias_display = df_melhorias.copy()
+        # O status do prazo normalmente já vem da carga; as datas são formatadas só aqui
+        df_nao_conforme_display['Prazo_Formatado'] = formatar_datas_em_lote(df_nao_conforme_display[coluna_prazo])
+        df_nao_conforme_display['Finalizacao_Formatada'] = formatar_datas_em_lote(df_nao_conforme_display[coluna_finalizacao])
+        if 'Status_Prazo' not in df_nao_conforme_display.columns:
+            df_nao_conforme_display['Status_Prazo'] = calcular_status_prazo_em_lote(
+                df_nao_conforme_display[coluna_prazo], df_nao_conforme_display[coluna_finalizacao]
+            )
+        if 'Data' in df_nao_conforme_display.columns and pd.api.types.is_datetime64_any_dtype(df_nao_conforme_display['Data']):
+            df_nao_conforme_display['Data'] = formatar_datas_em_lote(df_nao_conforme_display['Data'])
         
-        for coluna_data in colunas_data_melhorias:
-            if coluna_data in df_melhorias_display.columns:
-                df_melhorias_display[coluna_data] = df_melhorias_display[coluna_data].apply(formatar_data)
+        # Reordenar colunas para melhor visualização
+        colunas_ordenadas = ['Unidade', 'Status', 'Status_Prazo', 'Prazo_Formatado', 'Finalizacao_Formatada']
+        colunas_restantes = [col for col in df_nao_conforme_display.columns 
+                            if col not in colunas_ordenadas + [coluna_prazo, coluna_finalizacao]]
         
-        # ENCONTRAR COLUNAS DE STATUS E OBSERVAÇÃO
-        colunas_status = [col for col in df_melhorias_display.columns if 'status' in col.lower()]
-        colunas_observacao = [col for col in df_melhorias_display.columns if any(termo in col.lower() for termo in ['observacao', 'obs', 'comentario', 'nota'])]
+        colunas_finais = colunas_ordenadas + colunas_restantes
+        df_nao_conforme_display = df_nao_conforme_display[colunas_finais]
         
-        print(f"  🔍 Colunas de Status encontradas: {colunas_status}")
-        print(f"  🔍 Colunas de Observação encontradas: {colunas_observacao}")
+        # Renomear colunas para exibição
+        df_nao_conforme_display = df_nao_conforme_display.rename(columns={
+            'Prazo_Formatado': 'Prazo',
+            'Finalizacao_Formatada': 'Data Finalização',
+            'Status_Prazo': 'Status do Prazo'
+        })
         
-        # Garantir que Status seja uma coluna
-        if colunas_status:
-            coluna_status = colunas_status[0]
-            print(f"  ✅ Usando coluna de Status: '{coluna_status}'")
-        else:
-            print(f"  ⚠️ Nenhuma coluna de Status encontrada, criando padrão")
-            df_melhorias_display['Status'] = 'Sem Status'
-            coluna_status = 'Status'
+    else:
+        # Se não encontrou as colunas, mostrar tabela normal
+        logger.debug('⚠️ Não encontrou colunas de prazo/finalização. Colunas disponíveis: %s', colunas_disponiveis)
         
-        # Garantir que Observação seja uma coluna
-        if colunas_observacao:
-            coluna_observacao = colunas_observacao[0]
-            print(f"  ✅ Usando coluna de Observação: '{coluna_observacao}'")
-        else:
-            print(f"  ⚠️ Nenhuma coluna de Observação encontrada, criando padrão")
-            df_melhorias_display['Observacao'] = 'Sem Observação'
-            coluna_observacao = 'Observacao'
+        # Remover colunas desnecessárias
+        colunas_para_remover = ['Ano', 'Mes', 'Mes_Ano']
+        for col in colunas_para_remover:
+            if col in df_nao_conforme_display.columns:
+                df_nao_conforme_display = df_nao_conforme_display.drop(columns=[col])
         
-        # MOSTRAR TODAS AS COLUNAS (exceto as temporárias)
-        colunas_excluidas = ['Ano', 'Mes', 'Mes_Ano']
-        colunas_para_mostrar = [col for col in df_melhorias_display.columns if col not in colunas_excluidas]
+        # Formatar datas se houver
+        colunas_data = [col for col in df_nao_conforme_display.columns 
+                       if any(termo in col.lower() for termo in ['data', 'prazo', 'vencimento', 'limite', 'criacao', 'conclusao'])]
         
-        # Garantir que Status e Observação estejam no final para melhor visualização
-        if coluna_status in colunas_para_mostrar:
-            colunas_para_mostrar.remove(coluna_status)
-            colunas_para_mostrar.append(coluna_status)
+        for coluna_data in colunas_data:
+            if coluna_data in df_nao_conforme_display.columns:
+                df_nao_conforme_display[coluna_data] = formatar_datas_em_lote(df_nao_conforme_display[coluna_data])
         
-        if coluna_observacao in colunas_para_mostrar:
-            colunas_para_mostrar.remove(coluna_observacao)
-            colunas_para_mostrar.append(coluna_observacao)
+        # Limitar número de colunas para visualização
+        if len(df_nao_conforme_display.columns) > 8:
+            # Manter apenas as colunas mais importantes
+            colunas_importantes = ['Unidade', 'Status', 'Data', 'Descricao']
+            colunas_selecionadas = [col for col in colunas_importantes if col in df_nao_conforme_display.columns]
+            colunas_adicionais = [col for col in df_nao_conforme_display.columns if col not in colunas_importantes][:4]
+            df_nao_conforme_display = df_nao_conforme_display[colunas_selecionadas + colunas_adicionais]
+    
+    return {'df': df_nao_conforme_display, 'coluna_prazo': coluna_prazo, 'coluna_finalizacao': coluna_finalizacao}
+
+def preparar_tabela_melhorias(df_melhorias):
+    """Monta o DataFrame de exibição da tabela de melhorias"""
+    logger.debug('📈 PROCESSANDO MELHORIAS: %s registros', len(df_melhorias))
+
+    # Formatar datas
+    colunas_data_melhorias = [
+        col for col in df_melhorias.columns 
+        if any(termo in col.lower() for termo in ['data', 'prazo', 'vencimento', 'limite', 'criacao', 'conclusao'])
+    ]
+
+    df_melhorias_display = df_melhorias.copy()
+
+    for coluna_data in colunas_data_melhorias:
+        if coluna_data in df_melhorias_display.columns:
+            df_melhorias_display[coluna_data] = formatar_datas_em_lote(df_melhorias_display[coluna_data])
+
+    # ENCONTRAR COLUNAS DE STATUS E OBSERVAÇÃO
+    colunas_status = [col for col in df_melhorias_display.columns if 'status' in col.lower()]
+    colunas_observacao = [col for col in df_melhorias_display.columns if any(termo in col.lower() for termo in ['observacao', 'obs', 'comentario', 'nota'])]
+
+    logger.debug('  🔍 Colunas de Status encontradas: %s', colunas_status)
+    logger.debug('  🔍 Colunas de Observação encontradas: %s', colunas_observacao)
+
+    # Garantir que Status seja uma coluna
+    if colunas_status:
+        coluna_status = colunas_status[0]
+        logger.debug("  ✅ Usando coluna de Status: '%s'", coluna_status)
+    else:
+        logger.debug('  ⚠️ Nenhuma coluna de Status encontrada, criando padrão')
+        df_melhorias_display['Status'] = 'Sem Status'
+        coluna_status = 'Status'
+
+    # Garantir que Observação seja uma coluna
+    if colunas_observacao:
+        coluna_observacao = colunas_observacao[0]
+        logger.debug("  ✅ Usando coluna de Observação: '%s'", coluna_observacao)
+    else:
+        logger.debug('  ⚠️ Nenhuma coluna de Observação encontrada, criando padrão')
+        df_melhorias_display['Observacao'] = 'Sem Observação'
+        coluna_observacao = 'Observacao'
+
+    # MOSTRAR TODAS AS COLUNAS (exceto as temporárias)
+    colunas_excluidas = ['Ano', 'Mes', 'Mes_Ano']
+    colunas_para_mostrar = [col for col in df_melhorias_display.columns if col not in colunas_excluidas]
+
+    # Garantir que Status e Observação estejam no final para melhor visualização
+    if coluna_status in colunas_para_mostrar:
+        colunas_para_mostrar.remove(coluna_status)
+        colunas_para_mostrar.append(coluna_status)
+
+    if coluna_observacao in colunas_para_mostrar:
+        colunas_para_mostrar.remove(coluna_observacao)
+        colunas_para_mostrar.append(coluna_observacao)
+
+    # Limitar a 10 colunas se tiver muitas
+    if len(colunas_para_mostrar) > 10:
+        logger.debug('⚠️ Muitas colunas (%s). Mantendo Status e Observação, reduzindo outras.', len(colunas_para_mostrar))
+        # Manter as colunas essenciais
+        colunas_essenciais = ['Descricao', 'Unidade', coluna_status, coluna_observacao]
+        colunas_adicionais = [col for col in colunas_para_mostrar if col not in colunas_essenciais][:6]
+        colunas_para_mostrar = colunas_essenciais + colunas_adicionais
+
+    df_melhorias_display = df_melhorias_display[colunas_para_mostrar]
+    
+    return {'df': df_melhorias_display, 'coluna_status': coluna_status, 'coluna_observacao': coluna_observacao}
+
+def preparar_tabela_politicas(df_politicas):
+    """Monta o DataFrame de exibição da tabela de políticas"""
+    logger.debug('📑 PROCESSANDO POLÍTICAS: %s registros', len(df_politicas))
+
+    colunas_data_politicas = [
+        col for col in df_politicas.columns
+        if any(termo in col.lower() for termo in [
+            'data', 'prazo', 'vencimento', 'limite', 'criacao', 'conclusao'
+        ])
+    ]
+
+    df_politicas_display = df_politicas.copy()
+
+    for coluna_data in colunas_data_politicas:
+        if coluna_data in df_politicas_display.columns:
+            df_politicas_display[coluna_data] = formatar_datas_em_lote(df_politicas_display[coluna_data])
+
+    # ENCONTRAR COLUNAS DE STATUS E OBSERVAÇÃO
+    colunas_status_politicas = [col for col in df_politicas_display.columns if 'status' in col.lower()]
+    colunas_observacao_politicas = [col for col in df_politicas_display.columns if any(termo in col.lower() for termo in ['observacao', 'obs', 'comentario', 'nota'])]
+
+    logger.debug('  🔍 Colunas de Status encontradas (Políticas): %s', colunas_status_politicas)
+    logger.debug('  🔍 Colunas de Observação encontradas (Políticas): %s', colunas_observacao_politicas)
+
+    # Garantir que Status seja uma coluna
+    if colunas_status_politicas:
+        coluna_status_politicas = colunas_status_politicas[0]
+        logger.debug("  ✅ Usando coluna de Status: '%s'", coluna_status_politicas)
+    else:
+        logger.debug('  ⚠️ Nenhuma coluna de Status encontrada em Políticas, criando padrão')
+        df_politicas_display['Status'] = 'Sem Status'
+        coluna_status_politicas = 'Status'
+
+    # Garantir que Observação seja uma coluna
+    if colunas_observacao_politicas:
+        coluna_observacao_politicas = colunas_observacao_politicas[0]
+        logger.debug("  ✅ Usando coluna de Observação: '%s'", coluna_observacao_politicas)
+    else:
+        logger.debug('  ⚠️ Nenhuma coluna de Observação encontrada em Políticas, criando padrão')
+        df_politicas_display['Observacao'] = 'Sem Observação'
+        coluna_observacao_politicas = 'Observacao'
+
+    # MOSTRAR TODAS AS COLUNAS (exceto as temporárias)
+    colunas_excluidas_politicas = ['Ano', 'Mes', 'Mes_Ano']
+    colunas_para_mostrar_politicas = [col for col in df_politicas_display.columns if col not in colunas_excluidas_politicas]
+
+    # Garantir que Status e Observação estejam no final para melhor visualização
+    if coluna_status_politicas in colunas_para_mostrar_politicas:
+        colunas_para_mostrar_politicas.remove(coluna_status_politicas)
+        colunas_para_mostrar_politicas.append(coluna_status_politicas)
+
+    if coluna_observacao_politicas in colunas_para_mostrar_politicas:
+        colunas_para_mostrar_politicas.remove(coluna_observacao_politicas)
+        colunas_para_mostrar_politicas.append(coluna_observacao_politicas)
+
+    # Limitar a 10 colunas se tiver muitas
+    if len(colunas_para_mostrar_politicas) > 10:
+        logger.debug('⚠️ Muitas colunas em Políticas (%s). Mantendo Status e Observação, reduzindo outras.', len(colunas_para_mostrar_politicas))
+        # Manter as colunas essenciais
+        colunas_essenciais_politicas = ['Nome da Politica', 'Unidade', coluna_status_politicas, coluna_observacao_politicas]
+        colunas_adicionais_politicas = [col for col in colunas_para_mostrar_politicas if col not in colunas_essenciais_politicas][:6]
+        colunas_para_mostrar_politicas = colunas_essenciais_politicas + colunas_adicionais_politicas
+
+    df_politicas_display = df_politicas_display[colunas_para_mostrar_politicas]
+
+    return {'df': df_politicas_display, 'coluna_status': coluna_status_politicas, 'coluna_observacao': coluna_observacao_politicas}
+
+def calcular_dados_resumo(snapshot, ano, mes, unidade):
+    """Dados do resumo sem componentes: KPIs e posições dos não conformes no checklist"""
+    df_checklist = snapshot.df_checklist
+    posicoes = posicoes_checklist(snapshot, ano, mes, unidade)
+    df = df_checklist if posicoes is None else df_checklist.iloc[posicoes]
+
+    with medir_etapa('kpis', 'resumo'):
+        kpis = calcular_kpis(df)
+    if posicoes is None:
+        posicoes = np.arange(len(df_checklist))
+    nao_conformes = posicoes[(df['Status'] == 'Não Conforme').to_numpy()]
+    # int32 basta até 2 bilhões de linhas e ocupa metade na memória do pré-cálculo
+    if len(df_checklist) < np.iinfo(np.int32).max:
+        nao_conformes = nao_conformes.astype(np.int32)
+    return {'total': len(df), 'kpis': kpis, 'nao_conformes': nao_conformes}
+
+def renderizar_resumo(snapshot, ano, mes, unidade):
+    """Seção de resumo: KPIs, prazos e tabela de não conformes (depende de ano, mês e unidade)"""
+    # ---------- KPIs E NÃO CONFORMES (pré-calculados ou calculados agora) ----------
+    dados = dados_secao(snapshot, 'resumo', ano, mes, unidade)
+    
+    total = dados['total']
+    logger.debug('📊 TOTAL APÓS FILTROS: %s registros', total)
+    
+    # ---------- Contagem correta dos status ----------
+    kpis_checklist = dados['kpis']
+
+    # ---------- KPIs GERAIS SUPER COMPACTOS ----------
+    kpis = _linha_kpis([
+        _cartao_kpi(titulo, f"{kpis_checklist[chave]}", f"{kpis_checklist['pct_' + chave]:.1f}%", cor, fundo)
+        for titulo, chave, cor, fundo in CARTOES_KPI
+    ], '10px')
+
+    # ---------- Tabela de NÃO CONFORMES MAIOR ----------
+    total_nao_conforme = len(dados['nao_conformes'])
+    
+    coluna_prazo = coluna_finalizacao = None
+    
+    if total_nao_conforme > 0:
+        tabela = obter_tabela(snapshot, 'nao-conformes', ano, mes, unidade)
+        df_nao_conforme_display = tabela['df']
+        coluna_prazo, coluna_finalizacao = tabela['coluna_prazo'], tabela['coluna_finalizacao']
         
-        # Limitar a 10 colunas se tiver muitas
-        if len(colunas_para_mostrar) > 10:
-            print(f"⚠️ Muitas colunas ({len(colunas_para_mostrar)}). Mantendo Status e Observação, reduzindo outras.")
-            # Manter as colunas essenciais
-            colunas_essenciais = ['Descricao', 'Unidade', coluna_status, coluna_observacao]
-            colunas_adicionais = [col for col in colunas_para_mostrar if col not in colunas_essenciais][:6]
-            colunas_para_mostrar = colunas_essenciais + colunas_adicionais
+        if coluna_prazo and coluna_finalizacao:
+            # Sem Status_Prazo vindo da carga, as contagens saem da tabela montada
+            if 'Status_Prazo' not in snapshot.df_checklist.columns:
+                kpis_checklist = calcular_kpis(df_nao_conforme_display.rename(columns={'Status do Prazo': 'Status_Prazo'}))
+            
+            logger.debug('📊 STATUS DOS PRAZOS:')
+            logger.debug('  Dentro do prazo: %s', kpis_checklist['dentro_prazo'])
+            logger.debug('  Fora do prazo: %s', kpis_checklist['fora_prazo'])
+            logger.debug('  Não concluído: %s', kpis_checklist['nao_concluido'])
         
-        df_melhorias_display = df_melhorias_display[colunas_para_mostrar]
+        # Tabela MAIOR, paginada no servidor
+        tabela_nao_conforme = criar_tabela_paginada(
+            'tabela-nao-conformes',
+            df_nao_conforme_display,
+            TAMANHO_PAGINA,  # AUMENTADO de 5 para 10 linhas
+            **_estilos_tabela_nao_conformes(bool(coluna_prazo and coluna_finalizacao))
+        )
+    else:
+        tabela_nao_conforme = _mensagem_sem_nao_conformes()
+    
+    tabela_titulo = html.H3(f"❌ Itens Não Conformes ({total_nao_conforme} itens)", 
+                           style=ESTILO_TITULO_NAO_CONFORMES)
+    
+    # ---------- KPIs de PRAZOS dos Itens Não Conformes SUPER COMPACTOS ----------
+    if total_nao_conforme > 0 and (coluna_prazo and coluna_finalizacao):
+        kpis_prazos = _linha_kpis([
+            _cartao_kpi(titulo, f"{kpis_checklist[chave]}", f"{kpis_checklist[chave] / total_nao_conforme * 100:.1f}%",
+                        cor, fundo, compacto=True)
+            for titulo, chave, cor, fundo in CARTOES_PRAZO
+        ], '8px')
+        legenda_prazo = _legenda_prazo()
+    else:
+        kpis_prazos = html.Div()
+        legenda_prazo = html.Div()
+
+    return html.Div([
+        html.Div([
+            html.H4(f"📊 Resumo - {total} itens auditados", 
+                    style=ESTILO_TITULO_RESUMO)
+        ]),
+        kpis,
+        tabela_titulo,
+        kpis_prazos,
+        legenda_prazo,
+        tabela_nao_conforme
+    ], style=ESTILO_SECAO)
+
+def calcular_dados_matriz(snapshot, ano, unidade):
+    """Dados da matriz sem componentes: ano exibido, unidades e siglas por célula.
+
+    As células guardam tuplas (sigla, status, classe CSS, relatório) em vez dos dicionários
+    de estilo, que não são serializáveis e voltam a ser os compartilhados na renderização.
+    """
+    df_risco = snapshot.df_risco
+    if df_risco is None or len(df_risco) == 0:
+        return {'registros_risco': 0, 'registros': 0}
+
+    logger.debug('📋 PROCESSANDO MATRIZ DE RISCO:')
+    logger.debug('  Total de registros: %s', len(df_risco))
+    
+    # Aplicar filtros de ano e unidade para a matriz de risco
+    filtros_risco = {}
+    if ano != 'todos' and 'Ano' in df_risco.columns:
+        try:
+            filtros_risco['Ano'] = int(ano)
+        except:
+            pass
+    
+    if unidade != 'todas' and 'Unidade' in df_risco.columns:
+        filtros_risco['Unidade'] = unidade.strip()
+    
+    with medir_etapa('filtro', 'risco'):
+        df_risco_filtrado = filtrar_por_indice(df_risco, snapshot.indices['risco'], filtros_risco)
+    logger.debug('  ✅ Filtros aplicados para matriz de risco: %s', filtros_risco)
+    
+    # NÃO aplicar filtro de mês para a matriz de risco (mostrar ano completo)
+
+    logger.debug('📋 Matriz após filtros (ano completo): %s registros', len(df_risco_filtrado))
+    if len(df_risco_filtrado) == 0:
+        return {'registros_risco': len(df_risco), 'registros': 0}
+
+    # Determinar qual ano usar para a matriz
+    if ano != 'todos':
+        ano_matriz = int(ano)
+    else:
+        # Se 'todos', usar o primeiro ano disponível
+        anos_disponiveis = sorted(df_risco_filtrado['Ano'].dropna().unique())
+        if len(anos_disponiveis) > 0:
+            ano_matriz = int(anos_disponiveis[0])
+        else:
+            ano_matriz = datetime.now().year
+
+    with medir_etapa('matriz', 'risco'):
+        celulas = agrupar_siglas_por_celula(df_risco_filtrado)
+    return {
+        'registros_risco': len(df_risco),
+        'registros': len(df_risco_filtrado),
+        'ano': ano_matriz,
+        'unidades': sorted(df_risco_filtrado['Unidade'].dropna().unique()),
+        'celulas': {
+            chave: [(item['sigla'], item['status'], item['cor']['classe'], item['relatorio']) for item in itens]
+            for chave, itens in celulas.items()
+        }
+    }
+
+def renderizar_matriz(snapshot, ano, unidade):
+    """Seção da matriz de risco (APENAS ANO: o mês é ignorado e o ano aparece completo)"""
+    dados = dados_secao(snapshot, 'matriz', ano, unidade)
+
+    if dados['registros_risco'] == 0:
+        return html.Div([
+            html.H3("📋 Matriz Auditoria Risco", style={'fontSize': '13px'}),
+            html.P("Não há dados de risco disponíveis.", 
+                   style={'textAlign':'center', 'color':'#7f8c8d', 'padding': '15px', 'fontSize': '10px'})
+        ], style={'marginTop':'12px', 'height': '150px', 'display': 'flex', 'flexDirection': 'column', 'justifyContent': 'center'})
+    if dados['registros'] == 0:
+        return html.Div([
+            html.H3("📋 Matriz Auditoria Risco", style={'fontSize': '13px'}),
+            html.P("Nenhum dado encontrado para o ano selecionado.", 
+                   style={'textAlign':'center', 'color':'#7f8c8d', 'padding': '15px', 'fontSize': '10px'})
+        ], style={'marginTop':'12px', 'height': '150px', 'display': 'flex', 'flexDirection': 'column', 'justifyContent': 'center'})
+
+    celulas = {
+        chave: [
+            {'sigla': sigla, 'status': status, 'cor': ESTILOS_CLASSE_STATUS[classe], 'relatorio': relatorio}
+            for sigla, status, classe, relatorio in itens
+        ]
+        for chave, itens in dados['celulas'].items()
+    }
+    # Criar matriz de risco anual
+    return montar_matriz_risco(celulas, dados['unidades'], dados['registros'], dados['ano'])
+
+def renderizar_melhorias(snapshot):
+    """Seção de melhorias (8 registros) - MOSTRAR TODOS COMPACTOS; não depende dos filtros"""
+    df_melhorias = snapshot.df_melhorias
+    if df_melhorias is not None and len(df_melhorias) > 0:
+        tabela = obter_tabela(snapshot, 'melhorias')
+        df_melhorias_display = tabela['df']
+        coluna_status, coluna_observacao = tabela['coluna_status'], tabela['coluna_observacao']
+        colunas_para_mostrar = df_melhorias_display.columns.tolist()
         
         num_registros = len(df_melhorias_display)
         altura_tabela = 'auto' if num_registros <= 10 else min(350, 150 + (num_registros * 30))
         
-        # Configurar cores condicionais para Status
-        style_data_conditional = [
-            {'if': {'row_index': 'odd'}, 'backgroundColor': '#e8f4fd'},
-            {'if': {'row_index': 'even'}, 'backgroundColor': '#f0f8ff'}
-        ]
+        # Cores condicionais para Status (zebrado + cor por status), montadas uma vez por coluna
+        style_data_conditional = estilo_condicional_status(coluna_status, '#e8f4fd', '#f0f8ff')
         
-        # Adicionar cores baseadas no status
-        for status_val, cor in [('Conforme', '#d4edda'), 
-                                ('Conforme Parcialmente', '#fff3cd'),
-                                ('Não Conforme', '#f8d7da'),
-                                ('Pendente', '#fff8e1'),
-                                ('Finalizado', '#d1ecf1')]:
-            style_data_conditional.append({
-                'if': {
-                    'filter_query': f'{{{coluna_status}}} = "{status_val}"',
-                },
-                'backgroundColor': cor
-            })
-        
-        tabela_melhorias = dash_table.DataTable(
-            columns=[{"name": col, "id": col} for col in df_melhorias_display.columns],
-            data=df_melhorias_display.to_dict('records'),
-            page_size=10,
+        # Até 15 registros cabem numa página só (como antes, sem paginação visível)
+        tabela_melhorias = criar_tabela_paginada(
+            'tabela-melhorias',
+            df_melhorias_display,
+            num_registros if num_registros <= 15 else TAMANHO_PAGINA,
             style_table={
                 'overflowX': 'auto', 
                 'marginTop': '5px', 
@@ -1761,8 +2808,7 @@ def atualizar_conteudo_principal(ano, mes, unidade):
                 'overflow': 'hidden',
                 'textOverflow': 'ellipsis'
             },
-            style_data_conditional=style_data_conditional,
-            page_action='none' if num_registros <= 15 else 'native'
+            style_data_conditional=style_data_conditional
         )
         
         container_melhorias = html.Div([
@@ -1773,102 +2819,29 @@ def atualizar_conteudo_principal(ano, mes, unidade):
             tabela_melhorias
         ], style={'marginTop': '12px'})
         
-        abas_extra.append(container_melhorias)
+        return container_melhorias
 
-    # ---------- Políticas (7 registros) - MOSTRAR TODOS COMPACTOS ----------
+def renderizar_politicas(snapshot):
+    """Seção de políticas (7 registros) - MOSTRAR TODOS COMPACTOS; não depende dos filtros"""
+    df_politicas = snapshot.df_politicas
     if df_politicas is not None and len(df_politicas) > 0:
-        print(f"\n📑 PROCESSANDO POLÍTICAS: {len(df_politicas)} registros")
-
-        colunas_data_politicas = [
-            col for col in df_politicas.columns
-            if any(termo in col.lower() for termo in [
-                'data', 'prazo', 'vencimento', 'limite', 'criacao', 'conclusao'
-            ])
-        ]
-
-        df_politicas_display = df_politicas.copy()
-
-        for coluna_data in colunas_data_politicas:
-            if coluna_data in df_politicas_display.columns:
-                df_politicas_display[coluna_data] = (
-                    df_politicas_display[coluna_data]
-                    .apply(formatar_data)
-                )
-
-        # ENCONTRAR COLUNAS DE STATUS E OBSERVAÇÃO
-        colunas_status_politicas = [col for col in df_politicas_display.columns if 'status' in col.lower()]
-        colunas_observacao_politicas = [col for col in df_politicas_display.columns if any(termo in col.lower() for termo in ['observacao', 'obs', 'comentario', 'nota'])]
-        
-        print(f"  🔍 Colunas de Status encontradas (Políticas): {colunas_status_politicas}")
-        print(f"  🔍 Colunas de Observação encontradas (Políticas): {colunas_observacao_politicas}")
-        
-        # Garantir que Status seja uma coluna
-        if colunas_status_politicas:
-            coluna_status_politicas = colunas_status_politicas[0]
-            print(f"  ✅ Usando coluna de Status: '{coluna_status_politicas}'")
-        else:
-            print(f"  ⚠️ Nenhuma coluna de Status encontrada em Políticas, criando padrão")
-            df_politicas_display['Status'] = 'Sem Status'
-            coluna_status_politicas = 'Status'
-        
-        # Garantir que Observação seja uma coluna
-        if colunas_observacao_politicas:
-            coluna_observacao_politicas = colunas_observacao_politicas[0]
-            print(f"  ✅ Usando coluna de Observação: '{coluna_observacao_politicas}'")
-        else:
-            print(f"  ⚠️ Nenhuma coluna de Observação encontrada em Políticas, criando padrão")
-            df_politicas_display['Observacao'] = 'Sem Observação'
-            coluna_observacao_politicas = 'Observacao'
-
-        # MOSTRAR TODAS AS COLUNAS (exceto as temporárias)
-        colunas_excluidas_politicas = ['Ano', 'Mes', 'Mes_Ano']
-        colunas_para_mostrar_politicas = [col for col in df_politicas_display.columns if col not in colunas_excluidas_politicas]
-        
-        # Garantir que Status e Observação estejam no final para melhor visualização
-        if coluna_status_politicas in colunas_para_mostrar_politicas:
-            colunas_para_mostrar_politicas.remove(coluna_status_politicas)
-            colunas_para_mostrar_politicas.append(coluna_status_politicas)
-        
-        if coluna_observacao_politicas in colunas_para_mostrar_politicas:
-            colunas_para_mostrar_politicas.remove(coluna_observacao_politicas)
-            colunas_para_mostrar_politicas.append(coluna_observacao_politicas)
-        
-        # Limitar a 10 colunas se tiver muitas
-        if len(colunas_para_mostrar_politicas) > 10:
-            print(f"⚠️ Muitas colunas em Políticas ({len(colunas_para_mostrar_politicas)}). Mantendo Status e Observação, reduzindo outras.")
-            # Manter as colunas essenciais
-            colunas_essenciais_politicas = ['Nome da Politica', 'Unidade', coluna_status_politicas, coluna_observacao_politicas]
-            colunas_adicionais_politicas = [col for col in colunas_para_mostrar_politicas if col not in colunas_essenciais_politicas][:6]
-            colunas_para_mostrar_politicas = colunas_essenciais_politicas + colunas_adicionais_politicas
-        
-        df_politicas_display = df_politicas_display[colunas_para_mostrar_politicas]
+        tabela = obter_tabela(snapshot, 'politicas')
+        df_politicas_display = tabela['df']
+        coluna_status_politicas = tabela['coluna_status']
+        coluna_observacao_politicas = tabela['coluna_observacao']
+        colunas_para_mostrar_politicas = df_politicas_display.columns.tolist()
 
         num_registros = len(df_politicas_display)
         altura_tabela = 'auto' if num_registros <= 10 else min(350, 150 + (num_registros * 30))
 
-        # Configurar cores condicionais para Status
-        style_data_conditional_politicas = [
-            {'if': {'row_index': 'odd'}, 'backgroundColor': '#f0f3f4'},
-            {'if': {'row_index': 'even'}, 'backgroundColor': '#f8f9fa'}
-        ]
-        
-        # Adicionar cores baseadas no status
-        for status_val, cor in [('Conforme', '#d4edda'), 
-                                ('Conforme Parcialmente', '#fff3cd'),
-                                ('Não Conforme', '#f8d7da'),
-                                ('Pendente', '#fff8e1'),
-                                ('Finalizado', '#d1ecf1')]:
-            style_data_conditional_politicas.append({
-                'if': {
-                    'filter_query': f'{{{coluna_status_politicas}}} = "{status_val}"',
-                },
-                'backgroundColor': cor
-            })
+        # Cores condicionais para Status (zebrado + cor por status), montadas uma vez por coluna
+        style_data_conditional_politicas = estilo_condicional_status(coluna_status_politicas, '#f0f3f4', '#f8f9fa')
 
-        tabela_politicas = dash_table.DataTable(
-            columns=[{"name": col, "id": col} for col in df_politicas_display.columns],
-            data=df_politicas_display.to_dict('records'),
-            page_size=10,
+        # Até 15 registros cabem numa página só (como antes, sem paginação visível)
+        tabela_politicas = criar_tabela_paginada(
+            'tabela-politicas',
+            df_politicas_display,
+            num_registros if num_registros <= 15 else TAMANHO_PAGINA,
             style_table={
                 'overflowX': 'auto',
                 'marginTop': '5px',
@@ -1893,8 +2866,7 @@ def atualizar_conteudo_principal(ano, mes, unidade):
                 'overflow': 'hidden',
                 'textOverflow': 'ellipsis'
             },
-            style_data_conditional=style_data_conditional_politicas,
-            page_action='none' if num_registros <= 15 else 'native'
+            style_data_conditional=style_data_conditional_politicas
         )
 
         container_politicas = html.Div([
@@ -1905,39 +2877,89 @@ def atualizar_conteudo_principal(ano, mes, unidade):
             tabela_politicas
         ], style={'marginTop': '12px'})
 
-        abas_extra.append(container_politicas)
+        return container_politicas
 
-    # ---------- Layout Final SUPER COMPACTO ----------
-    return html.Div([
-        html.Div([
-            html.H4(f"📊 Resumo - {len(df)} itens auditados", 
-                    style={'textAlign': 'center', 'color': '#2c3e50', 'marginBottom': '8px', 'fontSize': '14px'})
-        ]),
-        kpis,
-        tabela_titulo,
-        kpis_prazos,
-        legenda_prazo,
-        tabela_nao_conforme,
-        *abas_extra
-    ], style={
-        'fontSize': '10px',
-        'display': 'flex',
-        'flexDirection': 'column',
-        'gap': '10px'  # Espaço reduzido entre todas as seções
-    })
+# Filtros de que cada seção depende (na ordem dos argumentos do renderizador)
+FILTROS_SECAO = {
+    'resumo': ('ano', 'mes', 'unidade'),
+    'matriz': ('ano', 'unidade'),
+    'melhorias': (),
+    'politicas': ()
+}
+
+# Seções com dados que dependem dos filtros: calculados por combinação e pré-calculáveis
+CALCULADORES_SECAO = {
+    'resumo': calcular_dados_resumo,
+    'matriz': calcular_dados_matriz
+}
+
+RENDERIZADORES_SECAO = {
+    'resumo': renderizar_resumo,
+    'matriz': renderizar_matriz,
+    'melhorias': renderizar_melhorias,
+    'politicas': renderizar_politicas
+}
+
+def paginar_tabela(nome, pagina, tamanho_pagina, ordenacao, consulta, ano='todos', mes='todos', unidade='todas'):
+    inicio = time.perf_counter()
+    tabela = obter_tabela(obter_snapshot(), nome, ano, mes, unidade)
+    with medir_etapa('pagina_tabela', nome):
+        registros, total_paginas = consultar_pagina(tabela['df'], pagina, tamanho_pagina, ordenacao, consulta)
+    logger.info("Tabela '%s' página %s/%s (ordenação %s, filtro %r) em %.1f ms",
+                nome, (pagina or 0) + 1, total_paginas, ordenacao, consulta, (time.perf_counter() - inicio) * 1000)
+    return registros, total_paginas
+
+@app.callback(
+    [Output('tabela-nao-conformes', 'data'),
+     Output('tabela-nao-conformes', 'page_count')],
+    [Input('tabela-nao-conformes', 'page_current'),
+     Input('tabela-nao-conformes', 'page_size'),
+     Input('tabela-nao-conformes', 'sort_by'),
+     Input('tabela-nao-conformes', 'filter_query')],
+    [State('filtro-ano', 'value'),
+     State('filtro-mes', 'value'),
+     State('filtro-unidade', 'value')]
+)
+def paginar_nao_conformes(pagina, tamanho_pagina, ordenacao, consulta, ano, mes, unidade):
+    return paginar_tabela('nao-conformes', pagina, tamanho_pagina, ordenacao, consulta, ano, mes, unidade)
+
+@app.callback(
+    [Output('tabela-melhorias', 'data'),
+     Output('tabela-melhorias', 'page_count')],
+    [Input('tabela-melhorias', 'page_current'),
+     Input('tabela-melhorias', 'page_size'),
+     Input('tabela-melhorias', 'sort_by'),
+     Input('tabela-melhorias', 'filter_query')]
+)
+def paginar_melhorias(pagina, tamanho_pagina, ordenacao, consulta):
+    return paginar_tabela('melhorias', pagina, tamanho_pagina, ordenacao, consulta)
+
+@app.callback(
+    [Output('tabela-politicas', 'data'),
+     Output('tabela-politicas', 'page_count')],
+    [Input('tabela-politicas', 'page_current'),
+     Input('tabela-politicas', 'page_size'),
+     Input('tabela-politicas', 'sort_by'),
+     Input('tabela-politicas', 'filter_query')]
+)
+def paginar_politicas(pagina, tamanho_pagina, ordenacao, consulta):
+    return paginar_tabela('politicas', pagina, tamanho_pagina, ordenacao, consulta)
 
 # ========== EXECUÇÃO DO APP ==========
 if __name__ == '__main__':
-    print("\n" + "="*50)
-    print("🌐 DASHBOARD RODANDO: http://localhost:8050")
-    print("📊 DASHBOARD OTIMIZADO:")
-    print("  - ✅ KPIs mais compactos (espaçamento reduzido)")
-    print("  - ✅ Tabela de Não Conformes maior (300px de altura)")
-    print("  - ✅ Legenda de siglas compacta (uma ao lado da outra)")
-    print("  - ✅ Tabelas de Melhorias e Políticas com Status e Observação SEPARADOS")
-    print("  - ✅ Fontes reduzidas para otimizar espaço")
-    print("  - ✅ Layout mais compacto geral")
-    print("="*50)
+    if PRECOMPUTAR_VISOES:
+        # Antes de qualquer thread: o processo ainda pode usar o pool por fork
+        aplicar_visoes_materializadas()
+    if THREADS_NA_IMPORTACAO:
+        iniciar_observador_planilha()
+    logger.info('🌐 DASHBOARD RODANDO: http://localhost:8050')
+    logger.info('📊 DASHBOARD OTIMIZADO:')
+    logger.info('  - ✅ KPIs mais compactos (espaçamento reduzido)')
+    logger.info('  - ✅ Tabela de Não Conformes maior (300px de altura)')
+    logger.info('  - ✅ Legenda de siglas compacta (uma ao lado da outra)')
+    logger.info('  - ✅ Tabelas de Melhorias e Políticas com Status e Observação SEPARADOS')
+    logger.info('  - ✅ Fontes reduzidas para otimizar espaço')
+    logger.info('  - ✅ Layout mais compacto geral')
     app.run(debug=True, host='0.0.0.0', port=8050)
 
 # ========== SERVER PARA O RENDER ==========
@@ -0,0 +1,112 @@
+// Modo cliente (DASHBOARD_MODO_CLIENTE=1): filtra o resumo no navegador a partir do
+// dcc.Store 'dados-cliente', sem ida ao servidor a cada troca de filtro.
+// A ordem do array devolvido segue SAIDAS_RESUMO_CLIENTE em app.py.
+(function () {
+    var ESTILO_OCULTO = {display: 'none'};
+    var ESTILO_VISIVEL = {};
+    var ESTILO_BLOCO_PRAZOS = {display: 'flex', flexDirection: 'column', gap: '10px'};
+
+    // Colunas compactas: lista simples ou {categorias, codigos}
+    function valor(coluna, i) {
+        if (Array.isArray(coluna)) {
+            return coluna[i];
+        }
+        var codigo = coluna.codigos[i];
+        return codigo < 0 ? null : coluna.categorias[codigo];
+    }
+
+    function tamanho(coluna) {
+        return Array.isArray(coluna) ? coluna.length : coluna.codigos.length;
+    }
+
+    function percentual(parte, total) {
+        return (total > 0 ? parte / total * 100 : 0).toFixed(1) + '%';
+    }
+
+    // Mesmas regras de calcular_kpis, aplicadas uma vez por rótulo distinto
+    function classificarStatus(rotulo) {
+        var texto = String(rotulo).trim();
+        var minusculo = texto.toLowerCase();
+        return {
+            conforme: minusculo === 'conforme',
+            parcial: minusculo.indexOf('parcial') >= 0,
+            nao: minusculo.indexOf('não') >= 0 || minusculo.indexOf('nao') >= 0
+        };
+    }
+
+    function filtrarResumo(ano, mes, unidade, dados) {
+        var checklist = dados.checklist;
+        var total = tamanho(checklist.Status);
+        var selecionadas = new Uint8Array(total);
+        var unidadeFiltro = unidade === 'todas' ? null : String(unidade).trim();
+
+        var contagens = {conforme: 0, parcial: 0, nao: 0};
+        var classes = {};
+        var filtradas = 0;
+
+        for (var i = 0; i < total; i++) {
+            if (ano !== 'todos' && checklist.Ano && Number(valor(checklist.Ano, i)) !== Number(ano)) {
+                continue;
+            }
+            if (mes !== 'todos' && checklist.Mes && Number(valor(checklist.Mes, i)) !== Number(mes)) {
+                continue;
+            }
+            if (unidadeFiltro !== null && checklist.Unidade && valor(checklist.Unidade, i) !== unidadeFiltro) {
+                continue;
+            }
+            selecionadas[i] = 1;
+            filtradas++;
+
+            var rotulo = valor(checklist.Status, i);
+            if (rotulo === null) {
+                continue;
+            }
+            var classe = classes[rotulo] || (classes[rotulo] = classificarStatus(rotulo));
+            if (classe.conforme) { contagens.conforme++; }
+            if (classe.parcial) { contagens.parcial++; }
+            if (classe.nao) { contagens.nao++; }
+        }
+
+        // Linhas da tabela de não conformes que passam pelos filtros
+        var tabela = dados.nao_conformes;
+        var registros = [];
+        var prazos = {'Concluído no Prazo': 0, 'Concluído Fora do Prazo': 0, 'Não Concluído': 0};
+        for (var j = 0; j < tabela.linhas.length; j++) {
+            if (!selecionadas[tabela.linhas[j]]) {
+                continue;
+            }
+            var registro = {};
+            for (var c = 0; c < tabela.colunas.length; c++) {
+                var nome = tabela.colunas[c];
+                registro[nome] = valor(tabela.dados[nome], j);
+            }
+            if (tabela.com_prazo && registro['Status do Prazo'] in prazos) {
+                prazos[registro['Status do Prazo']]++;
+            }
+            registros.push(registro);
+        }
+        var naoConformes = registros.length;
+        var dentro = prazos['Concluído no Prazo'];
+        var fora = prazos['Concluído Fora do Prazo'];
+        var naoConcluido = prazos['Não Concluído'];
+
+        return [
+            '📊 Resumo - ' + filtradas + ' itens auditados',
+            String(contagens.conforme), percentual(contagens.conforme, filtradas),
+            String(contagens.parcial), percentual(contagens.parcial, filtradas),
+            String(contagens.nao), percentual(contagens.nao, filtradas),
+            '❌ Itens Não Conformes (' + naoConformes + ' itens)',
+            naoConformes > 0 && tabela.com_prazo ? ESTILO_BLOCO_PRAZOS : ESTILO_OCULTO,
+            String(dentro), percentual(dentro, naoConformes),
+            String(fora), percentual(fora, naoConformes),
+            String(naoConcluido), percentual(naoConcluido, naoConformes),
+            naoConformes > 0 ? ESTILO_VISIVEL : ESTILO_OCULTO,
+            registros,
+            naoConformes > 0 ? ESTILO_OCULTO : ESTILO_VISIVEL
+        ];
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        auditoria: {filtrar_resumo: filtrarResumo}
+    });
+})();
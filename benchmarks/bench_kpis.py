@@ -0,0 +1,66 @@
+"""Benchmark dos KPIs do checklist: contagens com .str repetidos x calcular_kpis.
+
+Uso (a partir da raiz do repositório):
+    python benchmarks/bench_kpis.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DASHBOARD_RELOAD_INTERVALO', '0')
+# Só avisos e erros do app (os logs da carga inicial poluiriam a saída do benchmark)
+os.environ.setdefault('DASHBOARD_LOG_LEVEL', 'WARNING')
+
+import app
+import carga_abas
+
+LINHAS = 1_000_000
+STATUS = ['Conforme', 'Conforme Parcialmente', 'Não Conforme', 'Não Iniciado', 'Finalizado', 'Pendente']
+PRAZOS = ['Concluído no Prazo', 'Concluído Fora do Prazo', 'Não Concluído']
+
+
+def kpis_legado(df):
+    """Contagens como eram feitas no callback antes de calcular_kpis"""
+    status = df['Status'].astype(str).str.strip()
+    conforme = len(df[status.str.lower() == 'conforme'])
+    parcial = len(df[status.str.lower().str.contains('parcial')])
+    nao = len(df[status.str.lower().str.contains('não|nao')])
+    prazos = df[status == 'Não Conforme']['Status_Prazo'].value_counts()
+    return {
+        'conforme': conforme, 'parcial': parcial, 'nao': nao,
+        'dentro_prazo': prazos.get('Concluído no Prazo', 0),
+        'fora_prazo': prazos.get('Concluído Fora do Prazo', 0),
+        'nao_concluido': prazos.get('Não Concluído', 0),
+    }
+
+
+def main():
+    rng = np.random.default_rng(42)
+    df = pd.DataFrame({
+        'Status': carga_abas.canonicalizar_status(pd.Series(np.array(STATUS)[rng.integers(0, len(STATUS), LINHAS)])),
+        'Status_Prazo': np.array(PRAZOS)[rng.integers(0, len(PRAZOS), LINHAS)],
+    })
+
+    inicio = time.perf_counter()
+    esperado = kpis_legado(df)
+    tempo_legado = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    obtido = app.calcular_kpis(df)
+    tempo_novo = time.perf_counter() - inicio
+
+    for nome, valor in esperado.items():
+        assert obtido[nome] == valor, f"calcular_kpis diverge em '{nome}': {obtido[nome]} != {valor}"
+
+    print(f"{LINHAS:,} linhas")
+    print(f"  contagens legadas: {tempo_legado:.3f} s")
+    print(f"  calcular_kpis:     {tempo_novo:.3f} s")
+    print(f"  ganho: {tempo_legado / tempo_novo:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
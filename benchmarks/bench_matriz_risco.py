@@ -0,0 +1,79 @@
+"""Benchmark da matriz de risco: agrupamento vetorizado x laço legado por célula.
+
+Uso (a partir da raiz do repositório):
+    python benchmarks/bench_matriz_risco.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DASHBOARD_RELOAD_INTERVALO', '0')
+# Só avisos e erros do app (os logs da carga inicial poluiriam a saída do benchmark)
+os.environ.setdefault('DASHBOARD_LOG_LEVEL', 'WARNING')
+
+import app
+
+TAMANHOS = [267, 1_000, 10_000, 100_000]
+STATUS = ['Não Iniciado', 'Pendente', 'Finalizado', 'Conforme', 'Conforme Parcialmente']
+
+
+def gerar_risco(linhas, unidades=40, seed=42):
+    rng = np.random.default_rng(seed)
+    siglas = np.array(list(app.DICIONARIO_SIGLAS))
+    return pd.DataFrame({
+        'Unidade': [f"U{u:03d}" for u in rng.integers(0, unidades, linhas)],
+        'Mes': rng.integers(1, 13, linhas),
+        'Ano': 2025,
+        'Sigla': rng.choice(siglas, linhas),
+        'Status': rng.choice(STATUS, linhas),
+        'Relatorio': [f"Relatório {i}" for i in range(linhas)]
+    })
+
+
+def agrupar_legado(df_risco_filtrado):
+    """Coleta de siglas como era feita antes: filtro booleano + iterrows por célula"""
+    celulas = {}
+    for unidade_nome in sorted(df_risco_filtrado['Unidade'].dropna().unique()):
+        df_unidade = df_risco_filtrado[df_risco_filtrado['Unidade'] == unidade_nome].copy()
+        for mes in range(1, 13):
+            df_unidade['Mes'] = pd.to_numeric(df_unidade['Mes'], errors='coerce')
+            df_mes = df_unidade[df_unidade['Mes'] == mes]
+            itens = []
+            for _, row in df_mes.iterrows():
+                sigla = str(row.get('Sigla', '')).strip().upper()
+                status = str(row.get('Status', 'Sem Status'))
+                if sigla:
+                    itens.append({'sigla': sigla, 'status': status,
+                                  'cor': app.get_status_color(status), 'relatorio': row.get('Relatorio', '')})
+            if itens:
+                itens.sort(key=lambda x: x['sigla'])
+                celulas[(unidade_nome, mes)] = itens
+    return celulas
+
+
+def cronometrar(funcao, *args, repeticoes=3):
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(*args)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def main():
+    print(f"{'linhas':>8} | {'legado (s)':>10} | {'agrupado (s)':>12} | {'matriz completa (s)':>19}")
+    for linhas in TAMANHOS:
+        df = gerar_risco(linhas)
+        # O laço legado fica impraticável em volumes grandes; mede só até 10k linhas
+        legado = cronometrar(agrupar_legado, df, repeticoes=1) if linhas <= 10_000 else float('nan')
+        agrupado = cronometrar(app.agrupar_siglas_por_celula, df)
+        completo = cronometrar(app.criar_matriz_risco_anual, df, 2025, repeticoes=1)
+        print(f"{linhas:>8} | {legado:>10.3f} | {agrupado:>12.3f} | {completo:>19.3f}")
+
+
+if __name__ == '__main__':
+    main()
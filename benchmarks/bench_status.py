@@ -0,0 +1,50 @@
+"""Benchmark da normalização de status: apply linha a linha x canonicalizar_status.
+
+Uso (a partir da raiz do repositório):
+    python benchmarks/bench_status.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import carga_abas
+
+LINHAS = 1_000_000
+
+# Grafias reais e variações de caixa/espaço encontradas nas planilhas
+VALORES = [
+    'Conforme', 'conforme ', 'C', 'Conforme Parcialmente', 'parcial', ' Parcialmente',
+    'Não Conforme', 'nao conforme', 'NC', 'não', 'Finalizado', 'finalizada', 'Pendente',
+    'pend', 'Não Iniciado', '', None, np.nan, 'Em análise', 'cancelado'
+]
+
+
+def main():
+    rng = np.random.default_rng(42)
+    serie = pd.Series(np.array(VALORES, dtype=object)[rng.integers(0, len(VALORES), LINHAS)], name='Status')
+
+    inicio = time.perf_counter()
+    esperado = serie.apply(carga_abas.canonical_status)
+    tempo_apply = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    obtido = carga_abas.canonicalizar_status(serie)
+    tempo_vetorizado = time.perf_counter() - inicio
+
+    assert obtido.astype(str).equals(esperado), "canonicalizar_status diverge de canonical_status"
+
+    memoria_apply = esperado.memory_usage(deep=True) / 1024 / 1024
+    memoria_categorica = obtido.memory_usage(deep=True) / 1024 / 1024
+    print(f"{LINHAS:,} linhas")
+    print(f"  apply(canonical_status): {tempo_apply:.3f} s ({memoria_apply:.1f} MB)")
+    print(f"  canonicalizar_status:    {tempo_vetorizado:.3f} s ({memoria_categorica:.1f} MB)")
+    print(f"  ganho: {tempo_apply / tempo_vetorizado:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
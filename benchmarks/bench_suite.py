@@ -0,0 +1,212 @@
+"""Suíte de benchmarks: carga da planilha, renderização de cada seção e tamanho do payload.
+
+Gera planilhas sintéticas (gerar_planilha.py) nos tamanhos pedidos e mede, para cada uma:
+  - a carga completa da planilha (sem cache) e a leitura do cache em disco;
+  - cada seção do dashboard para combinações representativas de filtros;
+  - a paginação das tabelas com ordenação e filtro;
+  - o tamanho do JSON que o Dash enviaria ao navegador.
+
+Com --comparar, qualquer tempo ou payload acima da tolerância em relação à base
+gravada antes faz o script sair com código 1 (para rodar antes do deploy).
+
+Por padrão mede 1 mil, 100 mil e 1 milhão de linhas. A planilha de 1 milhão leva minutos
+para ser gerada e carregada na primeira vez (depois é reaproveitada de benchmarks/dados);
+--tamanhos 1000 100000 dá uma volta rápida, mas a comparação só vale entre os mesmos tamanhos.
+
+Uso (a partir da raiz do repositório):
+    python benchmarks/bench_suite.py --saida benchmarks/dados/base.json
+    python benchmarks/bench_suite.py --comparar benchmarks/dados/base.json
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import plotly
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('DASHBOARD_RELOAD_INTERVALO', '0')
+# Só avisos e erros do app (os logs da carga e de cada renderização poluiriam a saída)
+os.environ.setdefault('DASHBOARD_LOG_LEVEL', 'WARNING')
+
+import app
+
+from gerar_planilha import gerar_abas, salvar_planilha
+
+DIRETORIO_DADOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dados')
+
+# Paginação com ordenação e filtro, como o DataTable envia (Status existe nas três tabelas)
+CONSULTAS_TABELA = [
+    ('primeira página', 0, None, ''),
+    ('ordenada', 1, [{'column_id': 'Status', 'direction': 'desc'}], ''),
+    ('filtrada', 0, None, '{Status} contains "o"'),
+]
+
+
+def medir(funcao, repeticoes, antes=None):
+    """Mediana e mínimo de várias execuções (antes() roda fora da medição, ex.: limpar caches)"""
+    tempos = []
+    resultado = None
+    for _ in range(repeticoes):
+        if antes is not None:
+            antes()
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return resultado, {'mediana_s': statistics.median(tempos), 'min_s': min(tempos)}
+
+
+def tamanho_payload(conteudo):
+    return len(json.dumps(conteudo, cls=plotly.utils.PlotlyJSONEncoder).encode('utf-8'))
+
+
+def obter_planilha(linhas, unidades, anos):
+    """Reaproveita a planilha gerada numa execução anterior com os mesmos parâmetros"""
+    caminho = os.path.join(DIRETORIO_DADOS, f"auditoria_{linhas}_{unidades}u_{len(anos)}a.xlsx")
+    if not os.path.exists(caminho):
+        os.makedirs(DIRETORIO_DADOS, exist_ok=True)
+        inicio = time.perf_counter()
+        salvar_planilha(gerar_abas(linhas, unidades, anos), caminho)
+        print(f"  planilha gerada em {time.perf_counter() - inicio:.1f} s: {caminho}")
+    return caminho
+
+
+def montar_snapshot(dados, versao):
+    df_checklist, df_politicas, df_risco, df_melhorias = dados
+    return app.SnapshotDados(
+        versao=versao,
+        df_checklist=df_checklist,
+        df_politicas=df_politicas,
+        df_risco=df_risco,
+        df_melhorias=df_melhorias,
+        sha256='',
+        mtime_ns=0,
+        tamanho=0,
+        carregado_em=datetime.now(),
+        duracao_s=0.0,
+        indices=app._construir_indices(df_checklist, df_risco)
+    )
+
+
+def combinacoes_representativas(snapshot):
+    """Sem filtro, só ano, ano+mês, só unidade e os três juntos"""
+    anos = app.obter_anos_disponiveis(snapshot.df_checklist)
+    ano = anos[-1] if anos else 'todos'
+    unidade = str(snapshot.df_checklist['Unidade'].value_counts().index[0])
+    return [
+        ('todos', 'todos', 'todas'),
+        (ano, 'todos', 'todas'),
+        (ano, 6, 'todas'),
+        ('todos', 'todos', unidade),
+        (ano, 6, unidade),
+    ]
+
+
+def medir_tamanho(linhas, unidades, anos, repeticoes):
+    resultados = {}
+    caminho = obter_planilha(linhas, unidades, anos)
+
+    # ---------- carga ----------
+    diretorio_cache_original = app.DIRETORIO_CACHE
+    with tempfile.TemporaryDirectory() as diretorio_cache:
+        app.DIRETORIO_CACHE = diretorio_cache
+        try:
+            dados, resultados['carga/planilha'] = medir(
+                lambda: app._carregar_dados_com_hash(caminho)[0], 1)
+            _, resultados['carga/cache'] = medir(
+                lambda: app._carregar_dados_com_hash(caminho)[0], repeticoes)
+        finally:
+            app.DIRETORIO_CACHE = diretorio_cache_original
+
+    snapshot, resultados['carga/indices'] = medir(lambda: montar_snapshot(dados, -linhas), repeticoes)
+
+    # ---------- seções ----------
+    for ano, mes, unidade in combinacoes_representativas(snapshot):
+        valores = {'ano': ano, 'mes': mes, 'unidade': unidade}
+        for secao, nomes in app.FILTROS_SECAO.items():
+            filtros = tuple(valores[nome] for nome in nomes)
+            chave = f"secao/{secao}/{'/'.join(str(f) for f in filtros) or '-'}"
+            if chave in resultados:
+                continue  # seções que ignoram parte dos filtros repetiriam a mesma medição
+            conteudo, resultados[chave] = medir(
+                lambda: app.RENDERIZADORES_SECAO[secao](snapshot, *filtros), repeticoes,
+                antes=app.cache_tabelas.limpar)
+            resultados[chave]['payload_bytes'] = tamanho_payload(conteudo)
+
+    # ---------- tabelas paginadas ----------
+    ano, mes, unidade = combinacoes_representativas(snapshot)[0]
+    for nome in ('nao-conformes', 'melhorias', 'politicas'):
+        tabela = app.obter_tabela(snapshot, nome, ano, mes, unidade)['df']
+        for descricao, pagina, ordenacao, consulta in CONSULTAS_TABELA:
+            (registros, _), resultados[f"tabela/{nome}/{descricao}"] = medir(
+                lambda: app.consultar_pagina(tabela, pagina, app.TAMANHO_PAGINA, ordenacao, consulta), repeticoes)
+            resultados[f"tabela/{nome}/{descricao}"]['payload_bytes'] = tamanho_payload(registros)
+    app.cache_tabelas.limpar()
+    return resultados
+
+
+# Abaixo disso a diferença de tempo é ruído de medição, não regressão
+FOLGA_MINIMA_S = 0.002
+
+
+def comparar(resultados, base, tolerancia):
+    """Regressões: melhor tempo (o menos sujeito a ruído) ou payload acima de (1 + tolerância) x base"""
+    regressoes = []
+    for tamanho, medidas in resultados.items():
+        for chave, medida in medidas.items():
+            referencia = base.get(tamanho, {}).get(chave)
+            if referencia is None:
+                continue
+            for campo, folga in (('min_s', FOLGA_MINIMA_S), ('payload_bytes', 0)):
+                if campo not in medida or campo not in referencia:
+                    continue
+                limite = max(referencia[campo] * (1 + tolerancia), referencia[campo] + folga)
+                if medida[campo] > limite:
+                    regressoes.append(f"{tamanho} {chave} {campo}: {referencia[campo]:.4g} -> {medida[campo]:.4g}")
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=[1_000, 100_000, 1_000_000],
+                        help='linhas do checklist (ex.: 1000 100000 1000000)')
+    parser.add_argument('--unidades', type=int, default=300)
+    parser.add_argument('--anos', type=int, nargs='+', default=[2023, 2024, 2025])
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--saida', help='grava os resultados em JSON (base para --comparar)')
+    parser.add_argument('--comparar', help='JSON de uma execução anterior')
+    parser.add_argument('--tolerancia', type=float, default=0.25, help='folga antes de acusar regressão (0.25 = 25%%)')
+    args = parser.parse_args()
+
+    resultados = {}
+    for linhas in args.tamanhos:
+        print(f"{linhas:,} linhas, {args.unidades} unidades, anos {args.anos}")
+        resultados[str(linhas)] = medidas = medir_tamanho(linhas, args.unidades, args.anos, args.repeticoes)
+        for chave, medida in medidas.items():
+            payload = f"  {medida['payload_bytes'] / 1024:8.1f} KiB" if 'payload_bytes' in medida else ''
+            print(f"  {chave:<45} {medida['mediana_s'] * 1000:10.2f} ms{payload}")
+
+    if args.saida:
+        os.makedirs(os.path.dirname(os.path.abspath(args.saida)), exist_ok=True)
+        with open(args.saida, 'w', encoding='utf-8') as arquivo:
+            json.dump(resultados, arquivo, indent=2)
+        print(f"Resultados gravados em {args.saida}")
+
+    if args.comparar:
+        with open(args.comparar, 'r', encoding='utf-8') as arquivo:
+            regressoes = comparar(resultados, json.load(arquivo), args.tolerancia)
+        if regressoes:
+            print(f"❌ {len(regressoes)} regressão(ões) acima de {args.tolerancia:.0%}:")
+            for regressao in regressoes:
+                print(f"  {regressao}")
+            sys.exit(1)
+        print(f"✅ Nenhuma regressão acima de {args.tolerancia:.0%}")
+
+
+if __name__ == '__main__':
+    main()
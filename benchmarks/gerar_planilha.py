@@ -0,0 +1,149 @@
+"""Gerador de planilhas sintéticas com as mesmas abas e colunas de base_auditoria.xlsx.
+
+Uso (a partir da raiz do repositório):
+    python benchmarks/gerar_planilha.py --linhas 100000 --unidades 300 --anos 2023 2024 2025
+    python benchmarks/gerar_planilha.py --linhas 1000000 --saida /tmp/auditoria_1m.xlsx
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+
+UNIDADES_REAIS = ['WSUL', 'WNE', 'WNO', 'WSP', 'MB', 'LM', 'WCO']
+CATEGORIAS = ['Logistica', 'Administrativo']
+ITENS = ['Reserva incorreta', 'Bonificação X MEI', 'Corte', 'Inventário rotativo', 'Avarias',
+         'Devoluções', 'Notas fiscais pendentes', 'Endereçamento', 'Validade de produtos', '5S']
+# Grafias como aparecem nas planilhas reais, com o peso de cada uma
+STATUS_CHECKLIST = {'Conforme': 0.62, 'Conforme parcialmente': 0.18, 'Não Conforme': 0.17,
+                    'nao conforme': 0.01, 'Pendente': 0.01, 'Em análise': 0.01}
+RELATORIOS = ['Baixas Manuais', 'Bonificações', 'Faturamento sem finaceiro', 'Descontos Concedidos',
+              'Pagamento manual', 'Prorrogação', 'Recebimento sem juros', 'Titulos pagos a menor',
+              'Vendas', 'Vendas ', 'Vendas Canceladas', 'Devolução', 'Notas Fiscais de Entrada',
+              'Estoque Mínimo', 'Limite de Crédito', 'Faturamento de Serviços']
+STATUS_RISCO = {'finalizado': 0.7, 'Não iniciado': 0.2, 'Pendente': 0.1}
+
+
+def _escolher(rng, pesos, linhas):
+    valores = np.array(list(pesos))
+    probabilidades = np.array(list(pesos.values()))
+    return valores[rng.choice(len(valores), linhas, p=probabilidades / probabilidades.sum())]
+
+
+def _datas(rng, anos, linhas, primeiro_dia=False):
+    anos = np.asarray(anos)[rng.integers(0, len(anos), linhas)]
+    meses = rng.integers(1, 13, linhas)
+    dias = np.ones(linhas, dtype=int) if primeiro_dia else rng.integers(1, 29, linhas)
+    return pd.to_datetime(pd.DataFrame({'year': anos, 'month': meses, 'day': dias}))
+
+
+def gerar_unidades(quantidade):
+    """As unidades reais primeiro; acima disso, códigos sintéticos U001, U002..."""
+    extras = [f"U{i:03d}" for i in range(1, max(0, quantidade - len(UNIDADES_REAIS)) + 1)]
+    return (UNIDADES_REAIS + extras)[:quantidade]
+
+
+def gerar_abas(linhas=1_000, unidades=7, anos=(2024, 2025), linhas_risco=None, seed=42):
+    """DataFrames das quatro abas, com os mesmos nomes e tipos de coluna da planilha real"""
+    rng = np.random.default_rng(seed)
+    nomes_unidades = np.array(gerar_unidades(unidades))
+    if linhas_risco is None:
+        linhas_risco = max(267, linhas // 10)
+
+    status = _escolher(rng, STATUS_CHECKLIST, linhas)
+    data = _datas(rng, anos, linhas)
+    # Prazo e finalização só existem para parte dos não conformes, como na planilha real
+    nao_conforme = np.char.find(np.char.lower(status.astype(str)), 'não') >= 0
+    nao_conforme |= np.char.find(np.char.lower(status.astype(str)), 'nao') >= 0
+    prazo = data + pd.to_timedelta(rng.integers(7, 60, linhas), unit='D')
+    finalizacao = data + pd.to_timedelta(rng.integers(1, 90, linhas), unit='D')
+    tem_prazo = nao_conforme & (rng.random(linhas) < 0.8)
+    finalizado = tem_prazo & (rng.random(linhas) < 0.6)
+
+    checklist = pd.DataFrame({
+        'Unidade': nomes_unidades[rng.integers(0, len(nomes_unidades), linhas)],
+        'Data': data,
+        'Auditor': 'Georgia Freitas',
+        'Categoria': np.array(CATEGORIAS)[rng.integers(0, len(CATEGORIAS), linhas)],
+        'Item': np.array(ITENS)[rng.integers(0, len(ITENS), linhas)],
+        'Status': status,
+        'Observações': [f"Observação {i}" for i in range(linhas)],
+        'Prazo': prazo.where(tem_prazo),
+        'Data de finalização': finalizacao.where(finalizado),
+    })
+
+    risco = pd.DataFrame({
+        'ID': [f"RISK-{i:03d}" for i in range(1, linhas_risco + 1)],
+        'Tipo_Auditoria': 'Gestão de Risco',
+        'Unidade': nomes_unidades[rng.integers(0, len(nomes_unidades), linhas_risco)],
+        'Data': _datas(rng, anos, linhas_risco, primeiro_dia=True),
+        'Auditor': 'Georgia Freitas',
+        'Relatorio': np.array(RELATORIOS)[rng.integers(0, len(RELATORIOS), linhas_risco)],
+        'Status': _escolher(rng, STATUS_RISCO, linhas_risco),
+    })
+
+    politicas = pd.DataFrame({
+        'ID': [f"POL-{i:03d}" for i in range(1, 21)],
+        'Nome da Politica': [f"Política {i}" for i in range(1, 21)],
+        'Data Criação': _datas(rng, anos, 20),
+        'Status': 'Ativa',
+        'Responsavel': 'Georgia Freitas',
+        'Unidade': 'Todas',
+        'Data de Implementação': _datas(rng, anos, 20),
+    })
+
+    melhorias = pd.DataFrame({
+        'ID': [f"LOG-{i:03d}" for i in range(1, 31)],
+        'Projetos': [f"Projeto {i}" for i in range(1, 31)],
+        'Unidade': 'TODAS',
+        'Data': _datas(rng, anos, 30),
+        'Melhoria': np.array(['Digitalização', 'Otimização', 'Automação', 'Padronização'])[rng.integers(0, 4, 30)],
+        'Impacto': 'Agilidade na resposta e redução de erros.',
+        'Status': np.array(['Concluído', 'Em andamento'])[rng.integers(0, 2, 30)],
+        'Responsavel': 'Georgia',
+    })
+
+    return {
+        'Checklist_Unidades': checklist,
+        'Politicas': politicas,
+        'Auditoria_Risco': risco,
+        'Melhorias_Logistica': melhorias,
+    }
+
+
+def salvar_planilha(abas, caminho):
+    """Grava as abas em modo write-only do openpyxl (memória constante, bem mais rápido que to_excel)"""
+    livro = Workbook(write_only=True)
+    for nome, df in abas.items():
+        planilha = livro.create_sheet(nome)
+        planilha.append(list(df.columns))
+        colunas = [df[col].astype(object).where(df[col].notna(), None).tolist() for col in df.columns]
+        for linha in zip(*colunas):
+            planilha.append(linha)
+    livro.save(caminho)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--linhas', type=int, default=1_000, help='linhas do checklist')
+    parser.add_argument('--unidades', type=int, default=7)
+    parser.add_argument('--anos', type=int, nargs='+', default=[2024, 2025])
+    parser.add_argument('--linhas-risco', type=int, default=None, help='padrão: 10%% do checklist (mínimo 267)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--saida', default=None, help='padrão: benchmarks/dados/auditoria_<linhas>.xlsx')
+    args = parser.parse_args()
+
+    saida = args.saida or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dados', f"auditoria_{args.linhas}.xlsx")
+    os.makedirs(os.path.dirname(os.path.abspath(saida)), exist_ok=True)
+
+    inicio = time.perf_counter()
+    abas = gerar_abas(args.linhas, args.unidades, args.anos, args.linhas_risco, args.seed)
+    salvar_planilha(abas, saida)
+    print(f"{saida}: " + ', '.join(f"{nome}={len(df):,}" for nome, df in abas.items())
+          + f" ({time.perf_counter() - inicio:.1f} s)")
+
+
+if __name__ == '__main__':
+    main()
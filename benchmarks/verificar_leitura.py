@@ -0,0 +1,80 @@
+"""Confere a leitura em streaming (ler_aba_em_streaming) contra o pd.read_excel.
+
+Monta uma planilha com os textos que o pandas trata como vazios ('N/A', 'NA', 'NULL',
+'nan', '#N/A'...), células de erro do Excel e colunas de data/número misturadas com
+eles, além das abas sintéticas de gerar_planilha.py, e compara aba a aba.
+Sai com código 1 se alguma aba divergir.
+
+Uso (a partir da raiz do repositório):
+    python benchmarks/verificar_leitura.py
+"""
+import io
+import os
+import sys
+from datetime import datetime
+
+import pandas as pd
+from openpyxl import Workbook, load_workbook
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import carga_abas
+from gerar_planilha import gerar_abas, salvar_planilha
+
+# Textos lidos como NaN pelo pandas, um texto parecido que não é ('  NA') e erros do Excel
+# (o openpyxl grava '#N/A', '#DIV/0!'... como células de erro)
+VALORES_VAZIOS = ['N/A', 'NA', '#N/A', 'NULL', 'nan', 'None', 'n/a', '', '  NA', '#DIV/0!', '#REF!']
+
+
+def planilha_com_vazios():
+    livro = Workbook()
+    planilha = livro.active
+    planilha.title = 'Vazios'
+    planilha.append(['Status', 'Data', 'Quantidade', 'Prazo'])
+    for i, valor in enumerate(VALORES_VAZIOS):
+        planilha.append([valor, valor if i % 2 else datetime(2025, 1, i + 1), i, datetime(2025, 2, i + 1)])
+        planilha.append(['Conforme', datetime(2025, 3, i + 1), valor, valor])
+    planilha.append(['NA', 'NA', 'NA', 'NA'])
+    conteudo = io.BytesIO()
+    livro.save(conteudo)
+    return conteudo.getvalue()
+
+
+def planilha_sintetica():
+    abas = gerar_abas(linhas=2_000, unidades=7, anos=(2024, 2025))
+    abas['Checklist_Unidades'].loc[::7, 'Status'] = 'N/A'
+    abas['Checklist_Unidades'].loc[::11, 'Observações'] = '#N/A'
+    caminho = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dados', 'verificar_leitura.xlsx')
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    salvar_planilha(abas, caminho)
+    with open(caminho, 'rb') as arquivo:
+        return arquivo.read()
+
+
+def comparar(conteudo):
+    """Nomes das abas em que a leitura em streaming diverge do pd.read_excel"""
+    divergentes = []
+    livro = load_workbook(io.BytesIO(conteudo), read_only=True, data_only=True, keep_links=False)
+    for aba in livro.sheetnames:
+        esperado = pd.read_excel(io.BytesIO(conteudo), sheet_name=aba)
+        obtido = carga_abas.ler_aba_em_streaming(livro[aba], tamanho_lote=7)
+        try:
+            pd.testing.assert_frame_equal(obtido, esperado, check_dtype=False)
+        except AssertionError as e:
+            divergentes.append(aba)
+            print(f"❌ {aba}: {e}")
+        else:
+            print(f"✅ {aba}: {len(obtido)} linhas iguais ao pd.read_excel")
+    livro.close()
+    return divergentes
+
+
+def main():
+    divergentes = comparar(planilha_com_vazios()) + comparar(planilha_sintetica())
+    if divergentes:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,652 @@
+"""Leitura e normalização das abas da planilha (ver processar_planilha em app.py).
+
+Fica fora do app.py de propósito: os filhos da carga paralela (spawn) importam só
+este módulo, sem o Dash, o Plotly e o restante do app, e o pool serializa a tarefa
+pelo nome do módulo, o que travaria na trava de import se a tarefa fosse do app
+ainda sendo importado na carga inicial. Nada aqui importa o app.
+"""
+import contextlib
+import io
+import logging
+import os
+import re
+import sys
+import time
+import unicodedata
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+from openpyxl.cell.cell import ERROR_CODES
+from pandas._libs.parsers import STR_NA_VALUES
+
+try:
+    # Leitor de Excel em Rust (opcional): mais rápido e com pico de memória menor que o openpyxl
+    import python_calamine  # noqa: F401
+    # O engine 'calamine' do pandas só existe a partir da 2.2
+    CALAMINE_DISPONIVEL = tuple(int(parte) for parte in pd.__version__.split('.')[:2]) >= (2, 2)
+except ImportError:
+    CALAMINE_DISPONIVEL = False
+
+# O mesmo logger do app: no processo do servidor os handlers e o nível são os dele
+logger = logging.getLogger('dashboard_auditoria')
+
+# ========== DICIONÁRIO DE SIGLAS FORNECIDAS PELO USUÁRIO ==========
+DICIONARIO_SIGLAS = {
+    'BM': 'Baixas Manuais',
+    'BO': 'Bonificações',
+    'FF': 'Faturamento sem Financeiro',
+    'PR': 'Prorrogação',
+    'PM': 'Pagamento Manual',
+    'TM': 'Títulos Pagos a Menor',
+    'RJ': 'Recebimento sem Juros',
+    'VD': 'Vendas',
+    'DC': 'Descontos Concedidos',
+    
+    # SIGLAS ADICIONAIS PARA COMPLETAR
+    'CL': 'Checklist',
+    'AU': 'Auditoria',
+    'NC': 'Não Conformidade',
+    'MT': 'Monitoramento',
+    'AD': 'Análise Documental',
+    'RE': 'Relatório',
+    'CH': 'Check',
+    'IN': 'Inspeção',
+    'VI': 'Visita',
+    'RA': 'Risco Alto',
+    'RM': 'Risco Médio',
+    'RB': 'Risco Baixo',
+    'RP': 'Risco Potencial',
+    'RC': 'Risco Crítico',
+    'RV': 'Risco Vulnerabilidade'
+}
+
+# ========== COLUNAS E STATUS ==========
+def normalize_colname(name: str) -> str:
+    if not isinstance(name, str):
+        return name
+    nfkd = unicodedata.normalize('NFKD', name)
+    only_ascii = ''.join([c for c in nfkd if not unicodedata.combining(c)])
+    clean = only_ascii.replace(' ', '').replace('-', '').replace('.', '').strip()
+    return clean
+
+def normalize_df_columns(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
+    mapping = {col: normalize_colname(col) for col in df.columns}
+    df.rename(columns=mapping, inplace=True)
+    return df
+
+STATUS_CANONICOS = [
+    "Conforme",
+    "Conforme Parcialmente",
+    "Não Conforme",
+    "Finalizado",
+    "Pendente",
+    "Não Iniciado"
+]
+
+# Grafias aceitas (já em minúsculas e sem espaços nas pontas) -> status canônico
+ALIASES_STATUS = {
+    **dict.fromkeys(['conforme', 'c'], "Conforme"),
+    **dict.fromkeys(['conforme parcialmente', 'parcialmente', 'parcial', 'conforme parcial'], "Conforme Parcialmente"),
+    **dict.fromkeys(['não conforme', 'nao conforme', 'não', 'nao', 'nc', 'não conf', 'nao conf'], "Não Conforme"),
+    **dict.fromkeys(['finalizado', 'finalizada', 'fim'], "Finalizado"),
+    **dict.fromkeys(['pendente', 'pendencia', 'pend'], "Pendente"),
+    **dict.fromkeys(['não iniciado', 'nao iniciado', ''], "Não Iniciado")
+}
+
+def canonical_status(s):
+    if pd.isna(s):
+        return "Não Iniciado"
+    
+    s = str(s).strip()
+    return ALIASES_STATUS.get(s.lower(), s.title())
+
+def canonicalizar_status(serie):
+    """Versão vetorizada de canonical_status para uma coluna inteira.
+
+    Resolve apenas os valores distintos e devolve uma coluna categórica
+    (status canônicos primeiro, demais valores em ordem alfabética).
+    """
+    codigos, unicos = pd.factorize(serie)
+    canonicos_unicos = [canonical_status(valor) for valor in unicos]
+
+    extras = sorted(set(canonicos_unicos) - set(STATUS_CANONICOS))
+    categorias = STATUS_CANONICOS + extras
+    posicao = {categoria: i for i, categoria in enumerate(categorias)}
+
+    # Última posição da tabela atende os nulos (código -1 do factorize)
+    tabela = np.array(
+        [posicao[c] for c in canonicos_unicos] + [posicao["Não Iniciado"]],
+        dtype=np.int16 if len(categorias) > 127 else np.int8
+    )
+    return pd.Series(
+        pd.Categorical.from_codes(tabela[codigos], categories=categorias),
+        index=serie.index,
+        name=serie.name
+    )
+
+# ========== PRAZOS E DATAS ==========
+# Palavras-chave para localizar as colunas de prazo e de finalização (testadas em ordem)
+PALAVRAS_COLUNA_PRAZO = ['prazo', 'prazo_final', 'data_prazo', 'data_limite', 'limite']
+PALAVRAS_COLUNA_FINALIZACAO = ['data_finalizacao', 'data_conclusao', 'finalizacao', 'conclusao',
+                               'data_encerramento', 'data_termino']
+
+# Colunas derivadas criadas na carga do checklist (não entram na busca acima)
+COLUNAS_PRAZO_DERIVADAS = ['Status_Prazo', 'Prazo_Formatado', 'Finalizacao_Formatada']
+
+def _procurar_coluna(colunas, palavras_chave):
+    colunas_lower = [str(col).lower() for col in colunas]
+    for palavra in palavras_chave:
+        for idx, col_lower in enumerate(colunas_lower):
+            if palavra in col_lower:
+                return colunas[idx]
+    return None
+
+def encontrar_colunas_prazo(colunas):
+    """Retorna (coluna_prazo, coluna_finalizacao); qualquer uma pode ser None"""
+    colunas = [col for col in colunas if col not in COLUNAS_PRAZO_DERIVADAS]
+    return _procurar_coluna(colunas, PALAVRAS_COLUNA_PRAZO), _procurar_coluna(colunas, PALAVRAS_COLUNA_FINALIZACAO)
+
+def para_datetime(serie):
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie
+    return pd.to_datetime(serie, errors='coerce', dayfirst=True, format='mixed')
+
+def calcular_status_prazo_em_lote(prazo, finalizacao):
+    """Calcula o status do prazo de cada linha comparando as colunas inteiras de uma vez"""
+    prazo = para_datetime(prazo)
+    finalizacao = para_datetime(finalizacao)
+    status = np.select(
+        [prazo.isna() | finalizacao.isna(), finalizacao <= prazo],
+        ["Não Concluído", "Concluído no Prazo"],
+        default="Concluído Fora do Prazo"
+    )
+    return pd.Series(status, index=prazo.index)
+
+# Formatos testados em ordem; exact=False procura a data em qualquer parte do texto,
+# como o re.search do conversor antigo fazia
+FORMATOS_DATA = ['%d/%m/%Y', '%d-%m-%Y', '%d.%m.%Y', '%Y-%m-%d']
+
+def converter_datas_em_lote(serie):
+    """Converte uma coluna de datas testando cada formato sobre a coluna inteira.
+
+    Só as linhas que nenhum formato reconheceu passam pela inferência genérica do pandas.
+    Retorna (datas, acertos), onde acertos conta quantas linhas cada etapa converteu.
+    """
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        # O Excel já entregou a coluna como data
+        return serie, {'nativo': int(serie.notna().sum())}
+
+    datas = pd.Series(pd.NaT, index=serie.index, dtype='datetime64[ns]')
+    texto = serie.astype(str).str.strip()
+    pendentes = ~texto.isin(['nan', 'NaT', 'None', ''])
+    acertos = {}
+
+    for formato in FORMATOS_DATA:
+        if not pendentes.any():
+            break
+        convertidas = pd.to_datetime(texto[pendentes], format=formato, exact=False, errors='coerce')
+        convertidas = convertidas[convertidas.notna()]
+        datas[convertidas.index] = convertidas
+        pendentes[convertidas.index] = False
+        acertos[formato] = len(convertidas)
+
+    if pendentes.any():
+        convertidas = pd.to_datetime(texto[pendentes], format='mixed', dayfirst=True, errors='coerce')
+        convertidas = convertidas[convertidas.notna()]
+        datas[convertidas.index] = convertidas
+        acertos['inferido'] = len(convertidas)
+
+    return datas, acertos
+
+# Palavra-chave -> sigla, em ordem de prioridade: vence a primeira da lista presente no nome.
+# 'MANUAL' aponta para PM: o dicionário antigo tinha a chave repetida (BM e PM) e só a última valia.
+PALAVRAS_CHAVE_SIGLA = (
+    ('BAIXA', 'BM'),
+    ('MANUAL', 'PM'),
+    ('BONIF', 'BO'),
+    ('BONIFICA', 'BO'),
+    ('FATURAMENTO', 'FF'),
+    ('FINANCEIRO', 'FF'),
+    ('PRORROGA', 'PR'),
+    ('PAGAMENTO', 'PM'),
+    ('TITULO', 'TM'),
+    ('MENOR', 'TM'),
+    ('RECEBIMENTO', 'RJ'),
+    ('JUROS', 'RJ'),
+    ('VENDA', 'VD'),
+    ('DESCONTO', 'DC'),
+    ('CONCEDIDO', 'DC'),
+    ('CHECKLIST', 'CL'),
+    ('AUDITORIA', 'AU'),
+    ('NÃO CONFORME', 'NC'),
+    ('NAO CONFORME', 'NC'),
+    ('MONITORAMENTO', 'MT'),
+    ('ANALISE', 'AD'),
+    ('ANÁLISE', 'AD'),
+    ('RELATORIO', 'RE'),
+    ('RELATÓRIO', 'RE'),
+    ('CHECK', 'CH'),
+    ('INSPECAO', 'IN'),
+    ('INSPEÇÃO', 'IN'),
+    ('VISITA', 'VI')
+)
+
+# Uma alternação ancorada no início: cada ramo procura a sua palavra no nome inteiro
+# (lookahead) e os ramos são tentados na ordem da lista, então o grupo que casa
+# é sempre o da palavra de maior prioridade, não o da que aparece primeiro no texto
+_REGEX_PALAVRAS_SIGLA = re.compile(
+    '^(?:' + '|'.join(f"(?=.*?({re.escape(palavra)}))" for palavra, _ in PALAVRAS_CHAVE_SIGLA) + ')',
+    re.DOTALL
+)
+
+def _sigla_do_nome(relatorio_str):
+    """Sigla de um nome de relatório já sem espaços nas pontas e em maiúsculas (None se vazio)"""
+    if relatorio_str == '':
+        return None
+
+    # Verifica se alguma palavra-chave está no nome do relatório
+    encontrado = _REGEX_PALAVRAS_SIGLA.match(relatorio_str)
+    if encontrado:
+        return PALAVRAS_CHAVE_SIGLA[encontrado.lastindex - 1][1]
+    
+    # Se não encontrou palavra-chave, tenta extrair sigla do início do nome
+    palavras = relatorio_str.split()
+    if palavras:
+        # Tenta combinar primeiras letras com siglas conhecidas
+        primeira_palavra = palavras[0]
+        if len(primeira_palavra) >= 2:
+            sigla_tentativa = primeira_palavra[:2].upper()
+            if sigla_tentativa in DICIONARIO_SIGLAS:
+                return sigla_tentativa
+        
+        # Tenta criar sigla com iniciais
+        if len(palavras) >= 2:
+            sigla_tentativa = ''.join([p[0] for p in palavras[:2]])
+            if sigla_tentativa in DICIONARIO_SIGLAS:
+                return sigla_tentativa
+    
+    # Se nada funcionou, usa as 2 primeiras letras da primeira palavra
+    if palavras:
+        return palavras[0][:2].upper()
+    return None
+
+def criar_sigla_relatorio(relatorio, index):
+    """Cria uma sigla para o relatório - versão simplificada para usar siglas do dicionário"""
+    if pd.isna(relatorio):
+        return f"R{index:03d}"
+    sigla = _sigla_do_nome(str(relatorio).strip().upper())
+    # Último recurso
+    return sigla if sigla is not None else f"R{index:03d}"
+
+def criar_siglas_em_lote(relatorios):
+    """Siglas de uma coluna inteira: cada nome distinto é resolvido uma vez e mapeado de volta.
+
+    Linhas sem nome recebem R<posição>, como em criar_sigla_relatorio.
+    """
+    texto = relatorios.astype(object).where(relatorios.notna(), '').astype(str).str.strip().str.upper()
+    codigos, nomes = pd.factorize(texto)
+    siglas_nomes = np.array([_sigla_do_nome(nome) for nome in nomes] + [None], dtype=object)
+    siglas = siglas_nomes[codigos]
+    for posicao in np.flatnonzero(pd.isna(siglas)):
+        siglas[posicao] = f"R{posicao:03d}"
+    return pd.Series(siglas, index=relatorios.index)
+
+# ========== NORMALIZAÇÃO DAS ABAS ==========
+def normalizar_colunas_filtro(df):
+    """Deixa Ano/Mes numéricos e Unidade sem espaços, uma única vez na carga"""
+    for coluna in ('Ano', 'Mes'):
+        if coluna in df.columns:
+            df[coluna] = pd.to_numeric(df[coluna], errors='coerce')
+    if 'Unidade' in df.columns:
+        unidade = df['Unidade']
+        df['Unidade'] = unidade.where(unidade.isna(), unidade.astype(str).str.strip())
+    return df
+
+def normalizar_checklist(df):
+    """Status canônico, Ano/Mes a partir da Data e status dos prazos"""
+    logger.debug('📋 Processando CHECKLIST...')
+    
+    # Normalizar Status
+    if 'Status' in df.columns:
+        df['Status'] = df['Status'].astype(str)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('  Status únicos antes: %s', df['Status'].unique()[:10])
+        df['Status'] = canonicalizar_status(df['Status'])
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('  Status únicos depois: %s', df['Status'].unique()[:10])
+    
+    # Processar datas
+    if 'Data' in df.columns:
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('  Processando coluna Data...')
+            logger.debug('  Tipo da coluna Data: %s', df['Data'].dtype)
+            logger.debug('  Amostra de datas: %s', df['Data'].head(5).tolist())
+        
+        # Converter a coluna Data para datetime
+        df['Data_DT'] = pd.to_datetime(df['Data'], errors='coerce', dayfirst=True)
+        
+        falhas = df['Data_DT'].isna().sum()
+        if falhas > 0:
+            logger.warning('  ⚠️ %s datas não puderam ser convertidas', falhas)
+        
+        # Extrair Ano e Mes
+        df['Ano'] = df['Data_DT'].dt.year
+        df['Mes'] = df['Data_DT'].dt.month
+        
+        df['Ano'] = df['Ano'].fillna(0).astype(int)
+        df['Mes'] = df['Mes'].fillna(0).astype(int)
+        df['Ano'] = df['Ano'].replace(0, pd.NA)
+        df['Mes'] = df['Mes'].replace(0, pd.NA)
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('  Ano únicos: %s', df['Ano'].dropna().unique())
+            logger.debug('  Mês únicos: %s', df['Mes'].dropna().unique())
+        
+        # Data fica como datetime64; o texto DD/MM/YYYY só é gerado na tabela de exibição
+        df['Data'] = df['Data_DT']
+        df = df.drop(columns=['Data_DT'])
+    
+    # Status dos prazos calculado uma vez, na carga (as datas são formatadas na exibição)
+    coluna_prazo, coluna_finalizacao = encontrar_colunas_prazo(df.columns.tolist())
+    if coluna_prazo and coluna_finalizacao:
+        logger.debug("  ✅ Calculando status de prazo: '%s' x '%s'", coluna_prazo, coluna_finalizacao)
+        df['Status_Prazo'] = calcular_status_prazo_em_lote(df[coluna_prazo], df[coluna_finalizacao])
+
+    # Ano/Mes/Unidade prontos para o índice de filtros
+    return normalizar_colunas_filtro(df)
+
+def normalizar_politicas(df):
+    logger.debug('📑 Processando POLÍTICAS...')
+    if 'Status' in df.columns:
+        df['Status'] = canonicalizar_status(df['Status'])
+    return df
+
+def normalizar_risco(df):
+    """Status, datas, siglas dos relatórios e unidade da aba de risco"""
+    logger.debug('🔄 Processando dados de RISCO...')
+    logger.debug('  🔍 Colunas disponíveis: %s', df.columns.tolist())
+    
+    # 1. Encontrar e processar coluna de Status
+    coluna_status = None
+    for col in df.columns:
+        if 'status' in col.lower():
+            coluna_status = col
+            break
+    
+    if coluna_status:
+        logger.debug("  ✅ Coluna de Status encontrada: '%s'", coluna_status)
+        df[coluna_status] = df[coluna_status].astype(str).str.strip()
+        df['Status'] = canonicalizar_status(df[coluna_status])
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('  Status únicos: %s', df['Status'].unique()[:10])
+    else:
+        logger.warning('  ⚠️ Coluna de Status não encontrada')
+        df['Status'] = "Não Iniciado"
+    
+    # 2. Encontrar e processar coluna de Data
+    coluna_data = None
+    for col in df.columns:
+        if col.lower() == 'data':
+            coluna_data = col
+            break
+    
+    if coluna_data:
+        logger.debug("  ✅ Coluna de Data encontrada: '%s'", coluna_data)
+        logger.debug('  Tipo da coluna Data: %s', df[coluna_data].dtype)
+        
+        # Converter datas para datetime
+        logger.debug('  🔍 Convertendo datas para datetime...')
+        
+        # Conversão em lote: cada formato é testado sobre a coluna inteira
+        df['Data_DT'], acertos_formatos = converter_datas_em_lote(df[coluna_data])
+        
+        # Verificar resultados
+        total = len(df)
+        sucesso = df['Data_DT'].notna().sum()
+        falhas = total - sucesso
+        
+        logger.debug('  ✅ Resultado da conversão:')
+        logger.debug('     Total de registros: %s', total)
+        logger.debug('     Conversões bem-sucedidas: %s (%.1f%%)', sucesso, sucesso / total * 100)
+        logger.debug('     Falhas: %s', falhas)
+        logger.debug('     Acertos por formato: %s', acertos_formatos)
+        
+        if falhas > 0:
+            logger.warning('  ⚠️ Exemplos de datas que falharam:')
+            falhas_df = df[df['Data_DT'].isna()]
+            for j, data in enumerate(falhas_df[coluna_data].astype(str).head(5).tolist()):
+                logger.debug("      %s. '%s'", j + 1, data)
+        
+        # Extrair mês e ano
+        df['Mes'] = df['Data_DT'].dt.month
+        df['Ano'] = df['Data_DT'].dt.year
+        
+        # Converter para inteiros
+        df['Mes'] = df['Mes'].fillna(0).astype(int)
+        df['Ano'] = df['Ano'].fillna(0).astype(int)
+        df['Mes'] = df['Mes'].replace(0, pd.NA)
+        df['Ano'] = df['Ano'].replace(0, pd.NA)
+        
+        # Remover colunas temporárias. Mes_Ano e Data_Formatada (texto) não são mais criadas:
+        # nenhuma seção as lia. Para exibir a data, formate a coluna de Data original na exibição
+        df = df.drop(columns=['Data_DT'])
+    else:
+        logger.warning('  ❌ Coluna de Data não encontrada!')
+        df['Mes'] = pd.NA
+        df['Ano'] = pd.NA
+    
+    # 3. Encontrar coluna de Relatório
+    coluna_relatorio = None
+    for col in df.columns:
+        if 'relatorio' in col.lower():
+            coluna_relatorio = col
+            break
+    
+    if coluna_relatorio:
+        logger.debug("  ✅ Coluna de Relatório encontrada: '%s'", coluna_relatorio)
+        df['Relatorio'] = df[coluna_relatorio].astype(str)
+        
+        # Criar siglas para os relatórios usando o dicionário (uma vez por nome distinto)
+        logger.debug('  🔤 Criando siglas para TODOS os relatórios...')
+        df['Sigla'] = criar_siglas_em_lote(df['Relatorio'])
+        
+        # DEBUG: Mostrar alguns exemplos de relatórios e siglas
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('  🔤 Exemplos de relatórios e siglas:')
+            for idx, (relatorio, sigla) in enumerate(zip(df['Relatorio'].head(10), df['Sigla'].head(10))):
+                logger.debug("     %s. '%s...' -> %s", idx + 1, relatorio[:50], sigla)
+        
+        # Contar siglas únicas
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('  📊 Total de siglas únicas criadas: %s', df['Sigla'].nunique())
+            logger.debug('  ✅ Exemplos de siglas: %s', df['Sigla'].unique()[:20])
+        
+    else:
+        logger.warning('  ⚠️ Coluna de Relatório não encontrada')
+        df['Relatorio'] = df.get('ID', 'Sem Relatório').astype(str)
+        # Criar siglas padrão
+        df['Sigla'] = [f"R{idx:03d}" for idx in range(len(df))]
+    
+    # 4. Garantir coluna Unidade
+    if 'Unidade' not in df.columns:
+        for col in df.columns:
+            if 'unidade' in col.lower():
+                df['Unidade'] = df[col].astype(str)
+                logger.debug("  ✅ Coluna Unidade mapeada de: '%s'", col)
+                break
+        else:
+            logger.warning('  ⚠️ Coluna Unidade não encontrada, criando padrão')
+            df['Unidade'] = "Sem Unidade"
+    
+    # DEBUG: Mostrar estrutura final
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug('  📊 ESTRUTURA FINAL DO DATAFRAME DE RISCO:')
+        logger.debug('     Colunas: %s', df.columns.tolist())
+        logger.debug('     Total de registros: %s', len(df))
+        logger.debug('     Unidades únicas: %s', df['Unidade'].nunique())
+        logger.debug('     Meses com dados: %s', df['Mes'].dropna().nunique())
+        logger.debug('     Anos com dados: %s', df['Ano'].dropna().nunique())
+        logger.debug('     Siglas únicas: %s', df['Sigla'].nunique())
+
+    # Ano/Mes/Unidade prontos para o índice de filtros
+    return normalizar_colunas_filtro(df)
+
+def normalizar_melhorias(df):
+    logger.debug('📈 Processando MELHORIAS...')
+    if 'Status' in df.columns:
+        df['Status'] = canonicalizar_status(df['Status'])
+    return df
+
+NORMALIZADORES_ABA = {
+    'Checklist_Unidades': normalizar_checklist,
+    'Politicas': normalizar_politicas,
+    'Auditoria_Risco': normalizar_risco,
+    'Melhorias_Logistica': normalizar_melhorias
+}
+
+# ========== LEITURA DA PLANILHA ==========
+# 'auto' usa o calamine se instalado e, senão, a leitura em streaming do openpyxl;
+# 'pandas' volta ao pd.read_excel com openpyxl (monta a aba inteira como objetos Python)
+LEITOR_EXCEL = os.environ.get('DASHBOARD_LEITOR_EXCEL', 'auto').lower()
+# Linhas convertidas em colunas tipadas por vez na leitura em streaming
+TAMANHO_LOTE_LEITURA = int(os.environ.get('DASHBOARD_LOTE_LEITURA', '50000'))
+
+# Textos que o pd.read_excel lê como NaN ('N/A', 'NA', 'NULL', 'nan', ''...), mais as células
+# de erro do Excel (#N/A, #DIV/0!...), que o openpyxl entrega como texto e o pandas como NaN
+VALORES_NA_PLANILHA = frozenset(STR_NA_VALUES) | frozenset(ERROR_CODES)
+
+def abrir_planilha(conteudo):
+    """Abre a planilha (bytes) com o leitor configurado; o objeto retornado é usado por ler_aba"""
+    leitor = LEITOR_EXCEL
+    if leitor == 'auto':
+        leitor = 'calamine' if CALAMINE_DISPONIVEL else 'streaming'
+    if leitor == 'streaming':
+        return load_workbook(io.BytesIO(conteudo), read_only=True, data_only=True, keep_links=False)
+    return pd.ExcelFile(io.BytesIO(conteudo), engine='calamine' if leitor == 'calamine' else 'openpyxl')
+
+def ler_aba(livro, aba):
+    if isinstance(livro, pd.ExcelFile):
+        return livro.parse(sheet_name=aba)
+    return ler_aba_em_streaming(livro[aba])
+
+def _nomes_colunas(cabecalho):
+    """Mesmos nomes que o pd.read_excel daria: 'Unnamed: i' para vazios e '.1', '.2' em repetidos"""
+    nomes = []
+    vistos = {}
+    for i, nome in enumerate(cabecalho):
+        if nome is None or nome == '':
+            nome = f"Unnamed: {i}"
+        if nome in vistos:
+            vistos[nome] += 1
+            nome = f"{nome}.{vistos[nome]}"
+        else:
+            vistos[nome] = 0
+        nomes.append(nome)
+    return nomes
+
+def _coluna_tipada(valores):
+    """Converte os valores de um lote em um array tipado (datetime64, numérico, bool ou object)"""
+    serie = pd.Series(valores, dtype=object)
+    nulos = serie.isna() | serie.isin(VALORES_NA_PLANILHA)
+    if nulos.all():
+        return serie.where(~nulos, np.nan)
+    serie = serie.where(~nulos, None)
+    tipos = set(map(type, serie[~nulos]))
+    if tipos <= {datetime}:
+        return pd.to_datetime(serie)
+    if tipos <= {int, float}:
+        return serie.astype('float64' if nulos.any() or float in tipos else 'int64')
+    if tipos == {bool} and not nulos.any():
+        return serie.astype(bool)
+    return serie.where(~nulos, np.nan)
+
+def _juntar_lotes(lotes):
+    """Concatena os lotes de uma coluna; lotes só com vazios assumem o tipo dos demais"""
+    if not lotes:
+        return pd.Series(dtype=object)
+    preenchidos = [lote for lote in lotes if not (lote.dtype == object and lote.isna().all())]
+    tipos = {lote.dtype for lote in preenchidos}
+    if not preenchidos:
+        tipo = np.dtype('float64')
+    elif len(tipos) == 1:
+        tipo = tipos.pop()
+    elif all(pd.api.types.is_numeric_dtype(t) and not pd.api.types.is_bool_dtype(t) for t in tipos):
+        tipo = np.dtype('float64')
+    else:
+        tipo = np.dtype(object)
+    if len(preenchidos) < len(lotes) and (tipo.kind in 'ib'):
+        tipo = np.dtype('float64') if tipo.kind == 'i' else np.dtype(object)
+    return pd.concat([lote.astype(tipo) for lote in lotes], ignore_index=True)
+
+def ler_aba_em_streaming(planilha, tamanho_lote=None):
+    """DataFrame de uma aba do openpyxl em modo read_only, montado lote a lote.
+
+    Só um lote de linhas existe como tuplas Python por vez: cada lote vira arrays
+    tipados por coluna antes do próximo ser lido, então o pico de memória acompanha
+    o tamanho do lote e não o da aba. Linhas totalmente vazias são ignoradas, como
+    no pd.read_excel.
+    """
+    tamanho_lote = tamanho_lote or TAMANHO_LOTE_LEITURA
+    # A dimensão declarada pode ir até a linha 1.048.576 em abas formatadas:
+    # sem ela, a iteração segue só as linhas realmente gravadas no XML
+    planilha.reset_dimensions()
+    linhas = planilha.iter_rows(values_only=True)
+
+    cabecalho = next(linhas, None)
+    if cabecalho is None:
+        return pd.DataFrame()
+    while cabecalho and cabecalho[-1] is None:
+        cabecalho = cabecalho[:-1]
+    colunas = _nomes_colunas(cabecalho)
+    largura = len(colunas)
+    lotes_por_coluna = [[] for _ in colunas]
+
+    def converter_lote(lote):
+        for j, lotes in enumerate(lotes_por_coluna):
+            lotes.append(_coluna_tipada([linha[j] if j < len(linha) else None for linha in lote]))
+
+    lote = []
+    for linha in linhas:
+        if all(valor is None or valor == '' for valor in linha[:largura]):
+            continue
+        lote.append(linha)
+        if len(lote) >= tamanho_lote:
+            converter_lote(lote)
+            lote = []
+    if lote:
+        converter_lote(lote)
+
+    return pd.DataFrame({nome: _juntar_lotes(lotes) for nome, lotes in zip(colunas, lotes_por_coluna)},
+                        columns=colunas)
+
+def carregar_aba(livro, aba):
+    """Lê uma aba da planilha já aberta e normaliza; retorna (df, tempos)"""
+    inicio = time.perf_counter()
+    df = ler_aba(livro, aba)
+    leitura_s = time.perf_counter() - inicio
+    logger.debug("Processando aba '%s':", aba)
+    logger.debug('Colunas originais: %s', df.columns.tolist())
+    logger.debug('Total de registros: %s', len(df))
+
+    df = normalize_df_columns(df)
+    logger.debug('Colunas após normalização: %s', df.columns.tolist())
+    df = NORMALIZADORES_ABA[aba](df)
+    logger.debug('Colunas finais: %s', df.columns.tolist())
+    return df, {'leitura_s': leitura_s, 'normalizacao_s': time.perf_counter() - inicio - leitura_s}
+
+def configurar_log_filho(nivel, formato):
+    """Inicializador dos filhos da carga paralela: avisos da normalização saem no mesmo formato do app"""
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter(formato))
+        logger.addHandler(handler)
+        logger.propagate = False
+    logger.setLevel(nivel)
+
+def carregar_aba_de_bytes(conteudo, aba):
+    """Tarefa da carga paralela: abre a planilha a partir dos bytes e carrega uma aba; retorna (df, tempos)"""
+    with contextlib.closing(abrir_planilha(conteudo)) as livro:
+        return carregar_aba(livro, aba)
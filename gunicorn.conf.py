@@ -0,0 +1,101 @@
+"""Configuração do gunicorn para produção (Render, plano de 512 MB).
+
+Uso:
+    gunicorn -c gunicorn.conf.py app:server
+
+O app é importado uma vez no master (preload_app) e os workers nascem por fork,
+compartilhando por copy-on-write as páginas dos DataFrames já carregados: a
+planilha não é lida de novo em cada worker. Para as páginas continuarem
+compartilhadas:
+  - as colunas de texto repetitivas já são categóricas (compactar_dados), então
+    quase tudo são arrays NumPy que os workers só leem;
+  - gc.freeze() antes do fork tira os objetos do master das varreduras do coletor,
+    que de outra forma escreveriam nos cabeçalhos e copiariam as páginas;
+  - o observador da planilha e o pré-cálculo não rodam na importação (threads não
+    sobrevivem ao fork): o pré-cálculo roda no master antes dos forks e o observador
+    é iniciado em cada worker.
+
+Medições com base_auditoria.xlsx (Python 3.11, 2 workers x 4 threads), com e sem preload:
+                                   preload          sem preload
+  boot até responder (cache frio)  3,3 s            6,0 s
+  boot até responder (cache ok)    2,0 s            3,2 s
+  RSS master / cada worker         130 / 115 MB     26 / 130 MB
+  memória privada (USS) por worker ~20 MB           ~95 MB
+  total real (soma do PSS)         ~170 MB          ~235 MB
+Cada worker a mais custa ~20 MB em vez de ~95 MB: no plano de 512 MB cabem 2 a 4
+workers com folga para as recargas da planilha.
+
+Com o pré-cálculo (DASHBOARD_PRECOMPUTAR=1) as visões também ficam no master e são
+compartilhadas.
+
+Dados compartilhados (DASHBOARD_DADOS_COMPARTILHADOS, ligado aqui): as colunas e os
+índices de filtro vivem em arquivos .npy mapeados somente leitura por todos os
+processos. Quando a planilha muda, só um worker reprocessa e publica a nova versão; os
+outros anexam a versão publicada em vez de processar de novo, e os dados continuam numa
+cópia só. Com 4 workers e uma planilha sintética de 100 mil linhas:
+                                   compartilhado    cada worker com a sua cópia
+  boot (soma do PSS)               ~190 MB          ~180 MB
+  recarga da planilha              21 s, 1 leitura  93 s, 4 leituras disputando a CPU
+  depois da recarga (soma do PSS)  ~460 MB          ~630 MB (acima do plano de 512 MB)
+Sem preload o ganho é pequeno (~6 MB por worker): lá o grosso é a importação do Dash.
+
+Variáveis de ambiente:
+    WEB_CONCURRENCY                 workers (padrão 2)
+    DASHBOARD_GUNICORN_THREADS      threads por worker (padrão 4)
+    DASHBOARD_GUNICORN_TIMEOUT      segundos sem resposta até o worker ser reiniciado (padrão 120)
+    DASHBOARD_GUNICORN_MAX_REQ      requisições até reciclar o worker (padrão 1000, 0 desliga)
+"""
+import gc
+import os
+
+# O app lê isto na importação: nada de threads no master, e DataFrames sobre os
+# arquivos publicados em .cache_planilha/compartilhado (ver DADOS COMPARTILHADOS em app.py)
+os.environ.setdefault('DASHBOARD_THREADS_NA_IMPORTACAO', '0')
+os.environ.setdefault('DASHBOARD_DADOS_COMPARTILHADOS', '1')
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8050')}"
+preload_app = True
+
+# Os callbacks são presos ao GIL (pandas): poucos processos, e threads para não
+# travar nas esperas de rede (autenticação, compressão, assets, clientes lentos)
+workers = int(os.environ.get('WEB_CONCURRENCY', '2'))
+worker_class = 'gthread'
+threads = int(os.environ.get('DASHBOARD_GUNICORN_THREADS', '4'))
+
+timeout = int(os.environ.get('DASHBOARD_GUNICORN_TIMEOUT', '120'))
+graceful_timeout = 30
+keepalive = 5
+
+# Recicla os workers aos poucos (o jitter evita que todos reiniciem juntos); o novo
+# worker nasce do master, já com os dados carregados (e atualiza em post_fork se a
+# planilha mudou depois do boot)
+max_requests = int(os.environ.get('DASHBOARD_GUNICORN_MAX_REQ', '1000'))
+max_requests_jitter = max_requests // 10
+
+# Heartbeat dos workers em memória: disco lento no container não mata worker por engano
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+errorlog = '-'
+loglevel = os.environ.get('DASHBOARD_LOG_LEVEL', 'INFO').lower()
+
+
+def when_ready(server):
+    """Roda no master depois do preload e antes do primeiro fork"""
+    import app
+
+    if app.PRECOMPUTAR_VISOES:
+        app.aplicar_visoes_materializadas()
+    gc.collect()
+    gc.freeze()
+    server.log.info('🧊 Dados carregados no master (%s objetos congelados para o fork)', gc.get_freeze_count())
+
+
+def post_fork(server, worker):
+    import app
+
+    # Um worker reciclado nasce do master, que guarda os dados do boot: se a planilha
+    # mudou desde então, recarrega (ou anexa a versão já publicada) antes de atender
+    if app.dados_desatualizados():
+        app.recarregar_dados('fork')
+    app.iniciar_observador_planilha()
@@ -0,0 +1,56 @@
+"""filter_query das tabelas paginadas no servidor (consultar_pagina).
+
+Uso (a partir da raiz do repositório, onde fica base_auditoria.xlsx):
+    python -m pytest -q tests
+"""
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DASHBOARD_RELOAD_INTERVALO', '0')
+os.environ.setdefault('DASHBOARD_LOG_LEVEL', 'WARNING')
+
+import app
+
+DF = pd.DataFrame({
+    'Nome': ['Ana && Bia', 'ana', "O'Neil", 'Carlos'],
+    'Qtd': [1, 5, 3, 7],
+})
+
+
+def nomes(consulta):
+    registros, _ = app.consultar_pagina(DF, 0, 10, None, consulta)
+    return [registro['Nome'] for registro in registros]
+
+
+def test_dividir_consulta_ignora_e_dentro_de_aspas_e_chaves():
+    assert app.dividir_consulta_filtro('{A && B} eq 1 && {C} contains "x && y"') == [
+        '{A && B} eq 1', '{C} contains "x && y"']
+
+
+@pytest.mark.parametrize('consulta, esperado', [
+    ('{Nome} contains "Ana && Bia"', ['Ana && Bia']),
+    ('{Nome} contains "ana" && {Qtd} >= 5', ['ana']),
+    ('{Qtd} > 2 && {Qtd} < 7', ['ana', "O'Neil"]),
+    ("{Nome} contains 'O\\'Neil'", ["O'Neil"]),
+    ('{Nome} icontains ANA', ['Ana && Bia', 'ana']),
+    ('{Nome} scontains ana', ['ana']),
+    ('{Nome} s= ana', ['ana']),
+    ('{Nome} i= ANA', ['ana']),
+])
+def test_consultas_reconhecidas(consulta, esperado):
+    assert nomes(consulta) == esperado
+
+
+@pytest.mark.parametrize('consulta', [
+    '{Nome} is blank',
+    '{Nome} foo 1',
+    'sem coluna',
+    '{Inexistente} eq 1',
+    '{Nome} contains "a" && ',
+])
+def test_trecho_nao_reconhecido_nao_devolve_linhas(consulta):
+    assert nomes(consulta) == []
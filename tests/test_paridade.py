@@ -0,0 +1,61 @@
+"""Paridade das versões vetorizadas com as implementações legadas, em frames pequenos.
+
+As versões legadas são as mesmas dos benchmarks (benchmarks/bench_*.py).
+
+Uso (a partir da raiz do repositório, onde fica base_auditoria.xlsx):
+    python -m pytest -q tests
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.join(RAIZ, 'benchmarks'))
+os.environ.setdefault('DASHBOARD_RELOAD_INTERVALO', '0')
+os.environ.setdefault('DASHBOARD_LOG_LEVEL', 'WARNING')
+
+import app
+import carga_abas
+from bench_kpis import PRAZOS, STATUS, kpis_legado
+from bench_matriz_risco import agrupar_legado, gerar_risco
+from bench_status import VALORES
+
+
+def _celulas_comparaveis(celulas):
+    """Células com o estilo como dict comum e o status como texto, para comparar com o legado"""
+    return {
+        chave: [{**item, 'status': str(item['status']), 'cor': dict(item['cor'])} for item in itens]
+        for chave, itens in celulas.items()
+    }
+
+
+def test_canonicalizar_status_igual_ao_canonical_status():
+    serie = pd.Series(np.array(VALORES * 3, dtype=object), name='Status')
+    obtido = carga_abas.canonicalizar_status(serie)
+    assert obtido.astype(str).equals(serie.apply(carga_abas.canonical_status))
+
+
+def test_calcular_kpis_igual_as_contagens_legadas():
+    rng = np.random.default_rng(7)
+    df = pd.DataFrame({
+        'Status': carga_abas.canonicalizar_status(pd.Series(np.array(STATUS)[rng.integers(0, len(STATUS), 500)])),
+        'Status_Prazo': np.array(PRAZOS)[rng.integers(0, len(PRAZOS), 500)],
+    })
+    obtido = app.calcular_kpis(df)
+    for nome, valor in kpis_legado(df).items():
+        assert obtido[nome] == valor, nome
+
+
+def test_agrupar_siglas_por_celula_igual_ao_laco_legado():
+    df = gerar_risco(300, unidades=8)
+    df.loc[::17, 'Mes'] = np.nan
+    assert _celulas_comparaveis(app.agrupar_siglas_por_celula(df)) == _celulas_comparaveis(agrupar_legado(df))
+
+
+def test_agrupar_siglas_por_celula_sem_status_igual_ao_laco_legado():
+    df = gerar_risco(120, unidades=4).drop(columns=['Status'])
+    obtido = _celulas_comparaveis(app.agrupar_siglas_por_celula(df))
+    assert obtido and obtido == _celulas_comparaveis(agrupar_legado(df))